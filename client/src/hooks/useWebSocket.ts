@@ -7,6 +7,9 @@ export function useWebSocket(onMessage: (data: any) => void) {
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const reconnectAttemptsRef = useRef(0);
   const maxReconnectAttempts = 5;
+  // Son görülen olay: yeniden bağlanınca sunucu aradaki olayları gönderir (?since=<seq>).
+  // Sunucu bu konumdan devam edemezse RESYNC gönderir; ekran listelerini yeniden çeker.
+  const cursorRef = useRef<{ branchId: string; epoch: string; seq: number } | null>(null);
 
   useEffect(() => {
     onMessageRef.current = onMessage;
@@ -20,7 +23,10 @@ export function useWebSocket(onMessage: (data: any) => void) {
         const wsUrl = getWebSocketUrl();
         // WebSocket URL'ine branchId query parametresi ekle
         const separator = wsUrl.includes('?') ? '&' : '?';
-        const ws = new WebSocket(`${wsUrl}${separator}branchId=${branchId}`);
+        const cursor = cursorRef.current;
+        const resume =
+          cursor && cursor.branchId === branchId ? `&epoch=${cursor.epoch}&since=${cursor.seq}` : '';
+        const ws = new WebSocket(`${wsUrl}${separator}branchId=${branchId}${resume}`);
         wsRef.current = ws;
 
         ws.onopen = () => {
@@ -34,8 +40,17 @@ export function useWebSocket(onMessage: (data: any) => void) {
 
         ws.onmessage = (event) => {
           try {
-            const data = JSON.parse(event.data);
-            onMessageRef.current(data);
+            const frame = JSON.parse(event.data);
+            // Aynı anda yayımlanan olaylar tek çerçevede (BATCH) gelir; sırayla işlenir
+            const events = frame.type === 'BATCH' ? frame.events : [frame];
+            events.forEach((data: any) => {
+              if (data.type === 'SYNC' || data.type === 'RESYNC') {
+                cursorRef.current = { branchId, epoch: data.epoch, seq: data.seq };
+              } else if (typeof data.seq === 'number' && cursorRef.current) {
+                cursorRef.current.seq = data.seq;
+              }
+              onMessageRef.current(data);
+            });
           } catch (error) {
             console.error('Failed to parse WebSocket message:', error);
           }
@@ -47,8 +62,9 @@ export function useWebSocket(onMessage: (data: any) => void) {
 
         ws.onclose = (event) => {
           console.log('WebSocket disconnected', event.code, event.reason);
-          // Clean close (code 1000) veya normal close durumunda reconnect yapma
-          if (event.code !== 1000 && reconnectAttemptsRef.current < maxReconnectAttempts) {
+          // Clean close (code 1000) veya normal close durumunda reconnect yapma;
+          // 1008: sunucu bağlantıyı oturum/şube uyuşmazlığı nedeniyle reddetti
+          if (event.code !== 1000 && event.code !== 1008 && reconnectAttemptsRef.current < maxReconnectAttempts) {
             reconnectAttemptsRef.current++;
             const delay = Math.min(1000 * Math.pow(2, reconnectAttemptsRef.current), 10000);
             console.log(`Reconnecting in ${delay}ms (attempt ${reconnectAttemptsRef.current}/${maxReconnectAttempts})`);
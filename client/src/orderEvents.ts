@@ -0,0 +1,81 @@
+// Sunucudan gelen sipariş olaylarını yerel listeye uygular; her olayda GET /api/orders
+// yeniden çekilmez. Olaylar sunucuda role göre izdüşürülmüş gelir (mutfak/bar yalnızca
+// kendi aktif kalemlerini, kasa yalnızca masa toplamlarını alır). project siparişin
+// listede kalıp kalmayacağına karar verir; null dönerse sipariş listeden çıkar.
+interface EventOrder {
+  id: string;
+  items?: Array<{ id: string }>;
+}
+
+export function applyOrderEvent<T extends EventOrder>(
+  orders: T[],
+  data: any,
+  project: (order: any) => T | null = (order) => order
+): T[] {
+  switch (data.type) {
+    case 'NEW_ORDER':
+    case 'ORDER_UPDATED':
+      return upsertOrders(orders, [data.order], project);
+    case 'PAYMENT_COMPLETED':
+      return markPaid(orders, new Set(data.orderIds || []), data.payment, project);
+    case 'ORDERS_MOVED_TO_COMPLETED':
+      return removeMovedItems(orders, data.moves || [], data.removed || [], project);
+    default:
+      return orders;
+  }
+}
+
+function upsertOrders<T extends EventOrder>(orders: T[], incoming: any[], project: (order: any) => T | null): T[] {
+  const next = [...orders];
+  incoming.forEach((order) => {
+    const projected = project(order);
+    const index = next.findIndex((existing) => existing.id === order.id);
+    if (index === -1) {
+      if (projected) next.push(projected);
+    } else if (projected) {
+      next[index] = projected;
+    } else {
+      next.splice(index, 1);
+    }
+  });
+  return next;
+}
+
+function markPaid<T extends EventOrder>(
+  orders: T[],
+  orderIds: Set<string>,
+  payment: unknown,
+  project: (order: any) => T | null
+): T[] {
+  const next: T[] = [];
+  orders.forEach((order) => {
+    const projected = orderIds.has(order.id) ? project({ ...order, isPaid: true, payment }) : order;
+    if (projected) next.push(projected);
+  });
+  return next;
+}
+
+// Sunucuyla aynı: taşınan kalemler siparişten çıkar, kalemi kalmayan sipariş listeden
+// düşer. Kalemleri tutmayan görünümler (kasa) yalnızca düşen siparişleri (removed) alır.
+function removeMovedItems<T extends EventOrder>(
+  orders: T[],
+  moves: Array<{ orderId: string; itemIds: string[] }>,
+  removed: string[],
+  project: (order: any) => T | null
+): T[] {
+  const moved = new Map(moves.map((move) => [move.orderId, new Set(move.itemIds)]));
+  const dropped = new Set(removed);
+  const next: T[] = [];
+  orders.forEach((order) => {
+    if (dropped.has(order.id)) return;
+    const itemIds = moved.get(order.id);
+    if (!itemIds || !order.items) {
+      next.push(order);
+      return;
+    }
+    const items = order.items.filter((item) => !itemIds.has(item.id));
+    const projected = items.length > 0 ? project({ ...order, items }) : null;
+    if (projected) next.push(projected);
+  });
+  return next;
+}
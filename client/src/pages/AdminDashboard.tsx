@@ -1,5 +1,6 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
+import { useWebSocket } from '../hooks/useWebSocket';
 import { useNavigate } from 'react-router-dom';
 import { getApiUrl } from '../config';
 
@@ -28,9 +29,15 @@ interface PeriodReport {
 }
 
 interface LiveReport {
+  businessDay: string;
   totalRevenue: number;
   waiterSales: Record<string, { name: string; sales: number }>;
+  paymentMethods: {
+    cash: number;
+    card: number;
+  };
   orderCount: number;
+  cancelledAmount: number;
 }
 
 interface Staff {
@@ -103,8 +110,6 @@ export default function AdminDashboard() {
   useEffect(() => {
     if (activeTab === 'live') {
       fetchLiveReport();
-      const interval = setInterval(fetchLiveReport, 5000); // Her 5 saniyede bir güncelle
-      return () => clearInterval(interval);
     } else if (activeTab === 'daily') {
       fetchDailyReport();
     } else if (activeTab === 'weekly') {
@@ -118,6 +123,15 @@ export default function AdminDashboard() {
     }
   }, [activeTab]);
 
+  // Anlık ciro ödeme/iptal olduğunda sunucudan gönderilir (polling yok)
+  const handleWebSocketMessage = useCallback((data: any) => {
+    if (data.type === 'REVENUE_UPDATED') {
+      setLiveReport(data.report);
+    }
+  }, []);
+
+  useWebSocket(handleWebSocketMessage);
+
   const fetchMenu = async () => {
     try {
       const res = await fetch(getApiUrl('/api/menu'), {
@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
 import { useWebSocket } from '../hooks/useWebSocket';
 import { getApiUrl } from '../config';
+import { applyOrderEvent } from '../orderEvents';
 
 interface OrderItem {
   id: string;
@@ -22,6 +23,12 @@ interface Order {
   completedAt?: string;
 }
 
+// Olaylar sunucuda süzülmüş gelir (yalnızca bu ekranın aktif kalemleri); kalemi
+// kalmayan sipariş listeden çıkar
+function projectOrder(order: Order): Order | null {
+  return order.items.length > 0 ? order : null;
+}
+
 export default function BarDashboard() {
   const { user, logout } = useAuth();
   const [orders, setOrders] = useState<Order[]>([]);
@@ -68,8 +75,12 @@ export default function BarDashboard() {
   }, [activeTab, fetchCompletedOrders]);
 
   const handleWebSocketMessage = useCallback((data: any) => {
-    if (data.type === 'NEW_ORDER' || data.type === 'ORDER_UPDATED' || data.type === 'ORDERS_MOVED_TO_COMPLETED') {
+    if (data.type === 'RESYNC') {
       fetchOrders();
+    } else {
+      setOrders((current) => applyOrderEvent(current, data, projectOrder));
+    }
+    if (data.type === 'ORDERS_MOVED_TO_COMPLETED' || data.type === 'RESYNC') {
       if (activeTab === 'completed') {
         setTimeout(() => fetchCompletedOrders(), 500);
       }
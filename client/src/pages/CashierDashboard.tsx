@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
 import { useWebSocket } from '../hooks/useWebSocket';
 import { getApiUrl } from '../config';
+import { applyOrderEvent } from '../orderEvents';
 
 interface Order {
   id: string;
@@ -50,13 +51,16 @@ export default function CashierDashboard() {
   }, [fetchOrders]);
 
   const handleWebSocketMessage = useCallback((data: any) => {
-    if (data.type === 'NEW_ORDER' || data.type === 'ORDER_UPDATED' || data.type === 'PAYMENT_COMPLETED') {
+    if (data.type === 'RESYNC') {
       fetchOrders();
-      if (data.type === 'PAYMENT_COMPLETED' && selectedTable === data.tableNumber) {
-        setSelectedTable(null);
-        setTableInfo(null);
-        alert('Ödeme tamamlandı!');
-      }
+    } else {
+      // Kasa yalnızca ödenmemiş siparişleri tutar
+      setOrders((current) => applyOrderEvent(current, data, (order) => (order.isPaid ? null : order)));
+    }
+    if (data.type === 'PAYMENT_COMPLETED' && selectedTable === data.tableNumber) {
+      setSelectedTable(null);
+      setTableInfo(null);
+      alert('Ödeme tamamlandı!');
     }
   }, [fetchOrders, selectedTable]);
 
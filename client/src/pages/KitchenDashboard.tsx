@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
 import { useWebSocket } from '../hooks/useWebSocket';
 import { getApiUrl } from '../config';
+import { applyOrderEvent } from '../orderEvents';
 
 interface OrderItem {
   id: string;
@@ -22,6 +23,12 @@ interface Order {
   completedAt?: string;
 }
 
+// Olaylar sunucuda süzülmüş gelir (yalnızca bu ekranın aktif kalemleri); kalemi
+// kalmayan sipariş listeden çıkar
+function projectOrder(order: Order): Order | null {
+  return order.items.length > 0 ? order : null;
+}
+
 export default function KitchenDashboard() {
   const { user, logout } = useAuth();
   const [orders, setOrders] = useState<Order[]>([]);
@@ -71,8 +78,10 @@ export default function KitchenDashboard() {
   }, [fetchOrders, fetchCompletedOrders, activeTab]);
 
   const handleWebSocketMessage = useCallback((data: any) => {
-    if (data.type === 'NEW_ORDER' || data.type === 'ORDER_UPDATED') {
+    if (data.type === 'RESYNC') {
       fetchOrders();
+    } else {
+      setOrders((current) => applyOrderEvent(current, data, projectOrder));
     }
     if (data.type === 'ORDER_COMPLETED' || data.type === 'DAY_RESET') {
       fetchCompletedOrders();
@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../hooks/useAuth';
 import { useWebSocket } from '../hooks/useWebSocket';
 import { getApiUrl } from '../config';
+import { applyOrderEvent } from '../orderEvents';
 
 interface MenuItem {
   id: string;
@@ -80,10 +81,12 @@ export default function WaiterDashboard() {
   }, [fetchOrders, fetchMenu]);
 
   const handleWebSocketMessage = useCallback((data: any) => {
-    if (data.type === 'NEW_ORDER' || data.type === 'ORDER_UPDATED' || data.type === 'PAYMENT_COMPLETED') {
+    if (data.type === 'RESYNC') {
       fetchOrders();
+    } else {
+      setOrders((current) => applyOrderEvent(current, data));
     }
-    if (data.type === 'MENU_UPDATED') {
+    if (data.type === 'MENU_UPDATED' || data.type === 'RESYNC') {
       fetchMenu();
     }
   }, [fetchOrders, fetchMenu]);
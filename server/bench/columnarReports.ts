@@ -0,0 +1,84 @@
+// Rapor toplamalarını sentetik bir yıllık veri üzerinde karşılaştırır: Order nesneleri
+// üzerinde eski döngü (tarih filtresi + toplama) ile sütun bazlı analiz deposu.
+// Kullanım: npm run bench:analytics -- [sipariş sayısı]   (varsayılan 100000)
+import { initAnalytics, summarizePaidOrders } from '../src/analytics.js';
+import type { Order } from '../src/types.js';
+import { summarizeRevenue } from './summarizeRevenue.js';
+import { DAY_MS, syntheticOrders } from './syntheticOrders.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 100_000;
+const BRANCH = '1';
+const RUNS = 20;
+
+// Eski rapor uçlarının yaptığı gibi: her siparişte Date oluşturup filtrele, sonra topla
+function rowBasedReport(orders: Order[], start: Date, end: Date, withProducts: boolean) {
+  const filtered = orders.filter((order) => {
+    const orderDate = new Date(order.createdAt);
+    return orderDate >= start && orderDate <= end && order.isPaid && !!order.payment;
+  });
+  const summary = summarizeRevenue(filtered);
+  if (withProducts) {
+    const productCounts: Record<string, { name: string; quantity: number; revenue: number }> = {};
+    let cancelledAmount = 0;
+    filtered.forEach((order) => {
+      order.items.forEach((item) => {
+        if (item.status === 'CANCELLED') {
+          cancelledAmount += item.price * item.quantity;
+          return;
+        }
+        if (!productCounts[item.menuItemId]) {
+          productCounts[item.menuItemId] = { name: item.menuItemName, quantity: 0, revenue: 0 };
+        }
+        productCounts[item.menuItemId].quantity += item.quantity;
+        productCounts[item.menuItemId].revenue += item.price * item.quantity;
+      });
+    });
+    return { ...summary, productCounts, cancelledAmount };
+  }
+  return summary;
+}
+
+function time(fn: () => unknown): number {
+  const started = performance.now();
+  for (let i = 0; i < RUNS; i++) fn();
+  return (performance.now() - started) / RUNS;
+}
+
+const orders = syntheticOrders(ORDER_COUNT)
+  .filter((order) => order.isPaid)
+  .map((order) => ({ ...order, branchId: BRANCH }));
+console.log(`${orders.length} ödenmiş sipariş, 365 gün`);
+
+let build = performance.now();
+initAnalytics(() => orders);
+summarizePaidOrders(BRANCH, new Date(0), new Date(0));
+build = performance.now() - build;
+
+const end = new Date();
+const ranges = [
+  { name: 'daily (1 gün)', days: 1, withProducts: true },
+  { name: 'monthly (30 gün)', days: 30, withProducts: false },
+  { name: 'custom (365 gün)', days: 365, withProducts: false },
+  { name: 'custom + ürünler (365 gün)', days: 365, withProducts: true },
+];
+
+const results = ranges.map(({ name, days, withProducts }) => {
+  const start = new Date(end.getTime() - days * DAY_MS);
+  const rowBased = rowBasedReport(orders, start, end, withProducts);
+  const columnar = summarizePaidOrders(BRANCH, start, end, withProducts);
+  if (rowBased.orderCount !== columnar.orderCount || Math.abs(rowBased.totalRevenue - columnar.totalRevenue) > 1e-6) {
+    throw new Error(`${name}: sonuçlar eşleşmiyor`);
+  }
+  const rowMs = time(() => rowBasedReport(orders, start, end, withProducts));
+  const columnarMs = time(() => summarizePaidOrders(BRANCH, start, end, withProducts));
+  return {
+    report: name,
+    orders: columnar.orderCount,
+    'row-based (ms)': rowMs.toFixed(2),
+    'columnar (ms)': columnarMs.toFixed(2),
+    speedup: `${(rowMs / columnarMs).toFixed(1)}x`,
+  };
+});
+
+console.log(`Sütunlar ${build.toFixed(0)} ms'de kuruldu`);
+console.table(results);
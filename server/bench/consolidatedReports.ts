@@ -0,0 +1,75 @@
+// Konsolide raporun şube sayısıyla ölçeklenmesini ölçer: şubeler tek tek (admin'in
+// şube değiştirip raporu sırayla çekmesi gibi) ve summarizeBranches ile eşzamanlı.
+// Önbellek ve günlük özetler devre dışı: her şube için aylık aralık sütunlardan taranır.
+// Kullanım: npm run bench:consolidated -- [şube başına sipariş] [şube sayıları]
+//   (varsayılan 20000 1,10,50,100)
+import { initAnalytics, summarizePaidOrders } from '../src/analytics.js';
+import type { Order } from '../src/types.js';
+import { DAY_MS, syntheticOrders } from './syntheticOrders.js';
+
+// Her tarama işçiye gitsin (küçük şubeler normalde ana iş parçacığında taranır)
+process.env.REPORT_INLINE_ROWS ??= '1';
+const { closeReportPool, summarizePaidOrdersInPool } = await import('../src/reportPool.js');
+const { summarizeBranches } = await import('../src/consolidatedReport.js');
+
+const ORDERS_PER_BRANCH = Number(process.argv[2]) || 20_000;
+const BRANCH_COUNTS = (process.argv[3] || '1,10,50,100').split(',').map(Number);
+const RUNS = 5;
+
+const maxBranches = Math.max(...BRANCH_COUNTS);
+const byBranch = new Map<string, Order[]>();
+syntheticOrders(ORDERS_PER_BRANCH * maxBranches)
+  .filter((order) => order.isPaid)
+  .forEach((order, i) => {
+    const branchId = String((i % maxBranches) + 1);
+    let orders = byBranch.get(branchId);
+    if (!orders) {
+      orders = [];
+      byBranch.set(branchId, orders);
+    }
+    orders.push({ ...order, branchId });
+  });
+initAnalytics((branchId) => byBranch.get(branchId) ?? []);
+// Sütunlar önceden yüklensin; ölçüme ilk yükleme girmesin
+byBranch.forEach((_orders, branchId) => summarizePaidOrders(branchId, new Date(0), new Date(0)));
+
+const end = new Date();
+const start = new Date(end.getTime() - 30 * DAY_MS);
+const summarize = (branchId: string) => summarizePaidOrdersInPool(branchId, start, end);
+
+async function timed(run: () => Promise<unknown>): Promise<number> {
+  await run();
+  const times: number[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    const started = performance.now();
+    await run();
+    times.push(performance.now() - started);
+  }
+  return times.sort((a, b) => a - b)[Math.floor(RUNS / 2)];
+}
+
+console.log(`şube başına ~${Math.round((ORDERS_PER_BRANCH * 0.8) / 1000)}k ödenmiş sipariş, 30 günlük aralık`);
+
+try {
+  // İşçileri önceden başlat
+  await summarize('1');
+
+  const rows = [];
+  for (const count of BRANCH_COUNTS) {
+    const branches = Array.from({ length: count }, (_, i) => ({ id: String(i + 1), name: `Şube ${i + 1}` }));
+    const sequential = await timed(async () => {
+      for (const branch of branches) await summarize(branch.id);
+    });
+    const concurrent = await timed(() => summarizeBranches(branches, summarize));
+    rows.push({
+      şube: count,
+      'sırayla (ms)': sequential.toFixed(1),
+      'eşzamanlı (ms)': concurrent.toFixed(1),
+      'şube başına (ms)': (concurrent / count).toFixed(2),
+      hızlanma: `${(sequential / concurrent).toFixed(2)}x`,
+    });
+  }
+  console.table(rows);
+} finally {
+  await closeReportPool();
+}
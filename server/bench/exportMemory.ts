@@ -0,0 +1,100 @@
+// Bir yıllık arşivin CSV dışa aktarımında RSS artışını ölçer: akış halinde (yavaş
+// okuyan bir istemciye backpressure ile) ve tüm çıktıyı bellekte toplayarak.
+// Kullanım: npm run bench:export -- [sipariş sayısı]   (varsayılan 200000)
+// Daha kararlı ölçüm için: node --expose-gc ile çalıştırın.
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { Writable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import { createOrderArchive } from '../src/orderArchive.js';
+import { createExportStream } from '../src/orderExport.js';
+import { flush } from '../src/persistence.js';
+import type { Order } from '../src/types.js';
+import { DAY_MS, syntheticOrders } from './syntheticOrders.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 200_000;
+const BRANCH = '1';
+
+function collectGarbage(): void {
+  (globalThis as any).gc?.();
+}
+
+function paymentFor(order: Order) {
+  return {
+    method: 'card' as const,
+    amount: order.totalAmount,
+    discount: 0,
+    finalAmount: order.totalAmount,
+    paidAt: order.createdAt,
+    cashierId: 'cashier1',
+    cashierName: 'Kasa',
+  };
+}
+
+// Her parçayı bir sonraki olay döngüsü turunda kabul eden (yavaş) istemci
+function slowClient(counter: { bytes: number }): Writable {
+  return new Writable({
+    highWaterMark: 16 * 1024,
+    write(chunk, _encoding, callback) {
+      counter.bytes += chunk.length;
+      setImmediate(callback);
+    },
+  });
+}
+
+async function measure(name: string, run: (counter: { bytes: number }) => Promise<void>) {
+  collectGarbage();
+  const baseline = process.memoryUsage().rss;
+  let peak = baseline;
+  const sampler = setInterval(() => {
+    peak = Math.max(peak, process.memoryUsage().rss);
+  }, 5);
+  const counter = { bytes: 0 };
+  const started = performance.now();
+  await run(counter);
+  const elapsed = performance.now() - started;
+  clearInterval(sampler);
+  peak = Math.max(peak, process.memoryUsage().rss);
+  return {
+    mode: name,
+    'output (MB)': (counter.bytes / 1024 / 1024).toFixed(1),
+    'time (ms)': elapsed.toFixed(0),
+    'peak RSS delta (MB)': ((peak - baseline) / 1024 / 1024).toFixed(1),
+  };
+}
+
+const workDir = mkdtempSync(join(tmpdir(), 'restaurant-export-bench-'));
+console.log(`${ORDER_COUNT} ödenmiş sipariş, 365 günlük arşiv (${workDir})`);
+
+try {
+  const orders = syntheticOrders(ORDER_COUNT).map(
+    (order) => ({ ...order, isPaid: true, branchId: BRANCH, payment: order.payment ?? paymentFor(order) }) as Order
+  );
+  createOrderArchive(join(workDir, BRANCH, 'archive')).add('paid', orders);
+  await flush();
+  orders.length = 0;
+
+  const end = new Date();
+  const start = new Date(end.getTime() - 365 * DAY_MS);
+  const backend = createJsonBackend(workDir);
+  backend.init();
+
+  const rows = [
+    await measure('stream', (counter) =>
+      pipeline(createExportStream(backend.streamPaidOrdersBetween(BRANCH, start, end), 'csv'), slowClient(counter))
+    ),
+    await measure('buffered', async (counter) => {
+      const chunks: string[] = [];
+      for await (const chunk of createExportStream(backend.findPaidOrdersBetween(BRANCH, start, end), 'csv')) {
+        chunks.push(String(chunk));
+      }
+      const body = chunks.join('');
+      counter.bytes = Buffer.byteLength(body);
+    }),
+  ];
+  console.table(rows);
+} finally {
+  rmSync(workDir, { recursive: true, force: true });
+}
@@ -0,0 +1,68 @@
+// Sipariş dosyası biçimlerini karşılaştırır: girintili JSON (eski orders.json),
+// girintisiz JSON ve sıkıştırılmış biçim (orderCodec.ts). Diskteki boyut, okuma
+// (JSON.parse + çözme) ve yazma (kodlama + JSON.stringify) süreleri ölçülür.
+// Kullanım: npm run bench:encoding -- [kalem sayıları]   (varsayılan 10000,100000,1000000)
+import { decodeOrders, encodeOrders } from '../src/orderCodec.js';
+import type { Order } from '../src/types.js';
+import { syntheticOrders } from './syntheticOrders.js';
+
+const ITEM_COUNTS = (process.argv[2] || '10000,100000,1000000').split(',').map(Number);
+const BRANCH = '1';
+
+// Toplam kalem sayısı hedefe ulaşana kadar sipariş
+function ordersWithItems(itemCount: number): Order[] {
+  const orders = syntheticOrders(Math.ceil(itemCount / 2)).map((order) => ({
+    ...order,
+    branchId: BRANCH,
+    items: order.items.map((item) => ({ ...item, branchId: BRANCH })),
+  }));
+  let items = 0;
+  const count = orders.findIndex((order) => (items += order.items.length) >= itemCount);
+  return count >= 0 ? orders.slice(0, count + 1) : orders;
+}
+
+function median(run: () => unknown, runs: number): number {
+  const times: number[] = [];
+  for (let i = 0; i < runs; i++) {
+    const started = performance.now();
+    run();
+    times.push(performance.now() - started);
+  }
+  return times.sort((a, b) => a - b)[Math.floor(runs / 2)];
+}
+
+const formats = [
+  {
+    name: 'girintili JSON',
+    write: (orders: Order[]) => JSON.stringify(orders, null, 2),
+    read: (text: string) => JSON.parse(text) as Order[],
+  },
+  {
+    name: 'girintisiz JSON',
+    write: (orders: Order[]) => JSON.stringify(orders),
+    read: (text: string) => JSON.parse(text) as Order[],
+  },
+  {
+    name: 'sıkıştırılmış',
+    write: (orders: Order[]) => encodeOrders(BRANCH, orders),
+    read: (text: string) => decodeOrders(JSON.parse(text)),
+  },
+];
+
+for (const itemCount of ITEM_COUNTS) {
+  const orders = ordersWithItems(itemCount);
+  const runs = itemCount >= 1_000_000 ? 3 : 7;
+  const rows = formats.map(({ name, write, read }) => {
+    const text = write(orders);
+    const decoded = read(text);
+    if (decoded.length !== orders.length) throw new Error(`${name}: sipariş sayısı eşleşmiyor`);
+    return {
+      biçim: name,
+      'boyut (MB)': (Buffer.byteLength(text) / 1024 / 1024).toFixed(2),
+      'okuma (ms)': median(() => read(text), runs).toFixed(1),
+      'yazma (ms)': median(() => write(orders), runs).toFixed(1),
+    };
+  });
+  console.log(`\n${itemCount} kalem (${orders.length} sipariş)`);
+  console.table(rows);
+}
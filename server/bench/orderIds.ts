@@ -0,0 +1,55 @@
+// Sipariş/kalem id'lerini karşılaştırır: uuidv4 ve zamana göre sıralanabilir kısa id'ler.
+// Üretim maliyeti, orders.json (girintili) ve arşiv (NDJSON) boyutu ölçülür; kısa
+// id'lerin metin sırasının oluşturulma sırasıyla aynı olduğu da kontrol edilir.
+// Kullanım: npm run bench:ids -- [sipariş sayısı]   (varsayılan 100000)
+import { v4 as uuidv4 } from 'uuid';
+import { newId } from '../src/ids.js';
+import { toNdjson } from '../src/ndjson.js';
+import type { Order } from '../src/types.js';
+import { syntheticOrders } from './syntheticOrders.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 100_000;
+const ID_COUNT = 1_000_000;
+
+function generationRate(generate: () => string): number {
+  for (let i = 0; i < 10_000; i++) generate();
+  const started = performance.now();
+  for (let i = 0; i < ID_COUNT; i++) generate();
+  return ID_COUNT / ((performance.now() - started) / 1000);
+}
+
+function withIds(orders: Order[], generate: () => string): Order[] {
+  return orders.map((order) => ({
+    ...order,
+    id: generate(),
+    items: order.items.map((item) => ({ ...item, id: generate() })),
+  }));
+}
+
+function megabytes(text: string): string {
+  return (Buffer.byteLength(text) / 1024 / 1024).toFixed(1);
+}
+
+const orders = syntheticOrders(ORDER_COUNT);
+const itemCount = orders.reduce((sum, order) => sum + order.items.length, 0);
+console.log(`${ORDER_COUNT} sipariş, ${itemCount} kalem`);
+
+const rows = [
+  { name: 'uuidv4', generate: () => uuidv4() },
+  { name: 'kısa id', generate: newId },
+].map(({ name, generate }) => {
+  const sample = withIds(orders, generate);
+  return {
+    id: name,
+    uzunluk: generate().length,
+    'üretim (milyon/sn)': (generationRate(generate) / 1e6).toFixed(2),
+    'orders.json (MB)': megabytes(JSON.stringify(sample, null, 2)),
+    'arşiv NDJSON (MB)': megabytes(toNdjson(sample)),
+  };
+});
+console.table(rows);
+
+// Sıralama: art arda üretilen id'ler kesin artan
+const ids = Array.from({ length: ID_COUNT }, newId);
+const increasing = ids.every((id, i) => i === 0 || ids[i - 1] < id);
+console.log(`kısa id'ler artan: ${increasing}`);
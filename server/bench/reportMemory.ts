@@ -0,0 +1,90 @@
+// Bir yıllık arşiv üzerinde aralık raporunun bellek kullanımını ölçer:
+// akış halinde toplama ile tüm siparişleri listeye alıp toplama karşılaştırılır.
+// Kullanım: npm run bench:reports -- [sipariş sayısı]   (varsayılan 200000)
+// Daha kararlı ölçüm için: node --expose-gc ile çalıştırın.
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import { createOrderArchive } from '../src/orderArchive.js';
+import { flush } from '../src/persistence.js';
+import type { Order } from '../src/types.js';
+import { summarizeRevenue } from './summarizeRevenue.js';
+import { DAY_MS, syntheticOrders } from './syntheticOrders.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 200_000;
+const BRANCH = '1';
+const SAMPLE_EVERY = 500;
+
+function collectGarbage(): void {
+  (globalThis as any).gc?.();
+}
+
+// Kaynağı değiştirmeden her SAMPLE_EVERY kayıtta bir heap kullanımını örnekler
+function* sampled<T>(source: Iterable<T>, peak: { heap: number }): Generator<T> {
+  let count = 0;
+  for (const row of source) {
+    if (++count % SAMPLE_EVERY === 0) {
+      peak.heap = Math.max(peak.heap, process.memoryUsage().heapUsed);
+    }
+    yield row;
+  }
+}
+
+function paymentFor(order: Order) {
+  return {
+    method: 'cash' as const,
+    amount: order.totalAmount,
+    discount: 0,
+    finalAmount: order.totalAmount,
+    paidAt: order.createdAt,
+    cashierId: 'cashier1',
+    cashierName: 'Kasa',
+  };
+}
+
+function measure(name: string, run: (peak: { heap: number }) => number) {
+  collectGarbage();
+  const baseline = process.memoryUsage().heapUsed;
+  const peak = { heap: baseline };
+  const started = performance.now();
+  const orderCount = run(peak);
+  const elapsed = performance.now() - started;
+  peak.heap = Math.max(peak.heap, process.memoryUsage().heapUsed);
+  return {
+    mode: name,
+    orders: orderCount,
+    'time (ms)': elapsed.toFixed(0),
+    'peak heap delta (MB)': ((peak.heap - baseline) / 1024 / 1024).toFixed(1),
+  };
+}
+
+const workDir = mkdtempSync(join(tmpdir(), 'restaurant-report-bench-'));
+console.log(`${ORDER_COUNT} ödenmiş sipariş, 365 günlük arşiv (${workDir})`);
+
+try {
+  const orders = syntheticOrders(ORDER_COUNT).map(
+    (order) => ({ ...order, isPaid: true, branchId: BRANCH, payment: order.payment ?? paymentFor(order) }) as Order
+  );
+  createOrderArchive(join(workDir, BRANCH, 'archive')).add('paid', orders);
+  await flush();
+  orders.length = 0;
+
+  const end = new Date();
+  const start = new Date(end.getTime() - 365 * DAY_MS);
+  const backend = createJsonBackend(workDir);
+  backend.init();
+
+  console.table([
+    measure('stream', (peak) =>
+      summarizeRevenue(sampled(backend.streamPaidOrdersBetween(BRANCH, start, end), peak)).orderCount
+    ),
+    measure('materialized', (peak) => {
+      const all = backend.findPaidOrdersBetween(BRANCH, start, end);
+      peak.heap = Math.max(peak.heap, process.memoryUsage().heapUsed);
+      return summarizeRevenue(all).orderCount;
+    }),
+  ]);
+} finally {
+  rmSync(workDir, { recursive: true, force: true });
+}
@@ -0,0 +1,128 @@
+// Yıllık rapor taramaları sürerken sipariş oluşturma gecikmesini ölçer: tarama ana
+// iş parçacığında (eski davranış) ve rapor işçi havuzunda. Her 1 ms'de bir sipariş
+// JSON deposuna eklenir; gecikme, siparişin planlanan zamanından eklenmesinin bitişine
+// kadar geçen süredir (olay döngüsü bloklanırsa bekleyen siparişler birikir).
+// Kullanım: npm run bench:workers -- [sipariş sayısı] [eşzamanlı rapor]   (varsayılan 1000000 8)
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { initAnalytics, summarizePaidOrders } from '../src/analytics.js';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import type { Order } from '../src/types.js';
+import { DAY_MS, syntheticOrders } from './syntheticOrders.js';
+
+// Havuz küçük şubeleri ana iş parçacığında tarar; burada her tarama işçiye gitsin
+process.env.REPORT_INLINE_ROWS ??= '1';
+const { closeReportPool, getReportPoolMetrics, summarizePaidOrdersInPool } = await import(
+  '../src/reportPool.js'
+);
+
+const ORDER_COUNT = Number(process.argv[2]) || 1_000_000;
+const CONCURRENT_REPORTS = Number(process.argv[3]) || 8;
+const BRANCH = '1';
+const ORDER_INTERVAL_MS = 1;
+
+const orders = syntheticOrders(ORDER_COUNT)
+  .filter((order) => order.isPaid)
+  .map((order) => ({ ...order, branchId: BRANCH }));
+initAnalytics(() => orders);
+summarizePaidOrders(BRANCH, new Date(0), new Date(0));
+console.log(`${orders.length} ödenmiş sipariş, ${CONCURRENT_REPORTS} eşzamanlı yıllık rapor (ürün kırılımıyla)`);
+
+const workDir = mkdtempSync(join(tmpdir(), 'restaurant-worker-bench-'));
+const backend = createJsonBackend(workDir);
+backend.init();
+
+let nextOrderId = 0;
+function newOrder(): Order {
+  const id = `bench-${nextOrderId++}`;
+  return {
+    id,
+    waiterId: 'w1',
+    waiterName: 'Garson',
+    tableNumber: 1 + (nextOrderId % 30),
+    items: [
+      {
+        id: `${id}-i0`,
+        menuItemId: '1',
+        menuItemName: 'Ürün',
+        quantity: 1,
+        price: 100,
+        category: 'kitchen',
+        status: 'PENDING',
+        branchId: BRANCH,
+      },
+    ],
+    createdAt: new Date().toISOString(),
+    totalAmount: 100,
+    isPaid: false,
+    branchId: BRANCH,
+  };
+}
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor((sorted.length * p) / 100))] ?? 0;
+}
+
+async function measure(label: string, report: () => Promise<unknown>) {
+  const latencies: number[] = [];
+  let running = true;
+  let next = performance.now();
+
+  // Zamanı gelmiş (ve olay döngüsü bloklandığı için birikmiş) siparişlerin hepsi eklenir
+  const createOrders = () => {
+    while (next <= performance.now()) {
+      const scheduled = next;
+      backend.appendOrder(BRANCH, newOrder());
+      latencies.push(performance.now() - scheduled);
+      next += ORDER_INTERVAL_MS;
+    }
+    if (running) setTimeout(createOrders, Math.max(0, next - performance.now()));
+  };
+  createOrders();
+  await new Promise((resolve) => setTimeout(resolve, 50));
+
+  // Her rapor ayrı bir HTTP isteği gibi kendi makro görevinde başlar
+  const started = performance.now();
+  await Promise.all(
+    Array.from(
+      { length: CONCURRENT_REPORTS },
+      () => new Promise((resolve, reject) => setImmediate(() => report().then(resolve, reject)))
+    )
+  );
+  const reportMs = performance.now() - started;
+  // Rapor sırasında biriken siparişler de işlensin
+  await new Promise((resolve) => setTimeout(resolve, 20));
+  running = false;
+
+  const sorted = [...latencies].sort((a, b) => a - b);
+  return {
+    mod: label,
+    'raporlar (ms)': reportMs.toFixed(0),
+    sipariş: latencies.length,
+    'p50 (ms)': percentile(sorted, 50).toFixed(2),
+    'p99 (ms)': percentile(sorted, 99).toFixed(2),
+    'max (ms)': (sorted[sorted.length - 1] ?? 0).toFixed(2),
+  };
+}
+
+const end = new Date();
+const start = new Date(end.getTime() - 365 * DAY_MS);
+
+try {
+  // İşçileri önceden başlat
+  await Promise.all(
+    Array.from({ length: CONCURRENT_REPORTS }, () => summarizePaidOrdersInPool(BRANCH, start, start, false))
+  );
+
+  const rows = [
+    await measure('ana iş parçacığı', async () => summarizePaidOrders(BRANCH, start, end, true)),
+    await measure('işçi havuzu', () => summarizePaidOrdersInPool(BRANCH, start, end, true)),
+  ];
+  console.table(rows);
+  console.log('havuz:', getReportPoolMetrics());
+} finally {
+  await closeReportPool();
+  await backend.flush();
+  rmSync(workDir, { recursive: true, force: true });
+}
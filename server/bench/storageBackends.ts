@@ -0,0 +1,83 @@
+// JSON ve SQLite arka uçlarını sentetik veriyle karşılaştırır.
+// Kullanım: npm run bench:storage -- [sipariş sayısı]   (varsayılan 100000)
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import { createSqliteBackend } from '../src/sqliteBackend.js';
+import type { StorageBackend } from '../src/storageBackend.js';
+import type { Order } from '../src/types.js';
+import { BRANCHES, DAY_MS, syntheticOrders, TABLES } from './syntheticOrders.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 100_000;
+
+async function time(fn: () => unknown | Promise<unknown>): Promise<number> {
+  const started = performance.now();
+  await fn();
+  return performance.now() - started;
+}
+
+async function measure(name: string, backend: StorageBackend, reopen: () => StorageBackend, orders: Order[]) {
+  backend.init();
+  const load = await time(async () => {
+    backend.write('orders', orders);
+    await backend.flush();
+  });
+
+  const coldStart = await time(() => reopen().init());
+
+  const tableLookups = 1000;
+  const tableLookup = await time(() => {
+    for (let i = 0; i < tableLookups; i++) {
+      backend.findUnpaidOrdersByTable(BRANCHES[i % BRANCHES.length], 1 + (i % TABLES));
+    }
+  });
+
+  const rangeQueries = 20;
+  const now = new Date();
+  const monthAgo = new Date(now.getTime() - 30 * DAY_MS);
+  const rangeQuery = await time(() => {
+    for (let i = 0; i < rangeQueries; i++) {
+      backend.findPaidOrdersBetween(BRANCHES[i % BRANCHES.length], monthAgo, now);
+    }
+  });
+
+  const appends = 1000;
+  const fresh = syntheticOrders(appends).map((order, i) => ({ ...order, id: `new${i}`, isPaid: false, payment: undefined }));
+  const append = await time(async () => {
+    fresh.forEach((order) => backend.appendOrder(order.branchId, order));
+    await backend.flush();
+  });
+
+  return {
+    backend: name,
+    'bulk load (ms)': load.toFixed(0),
+    'cold start (ms)': coldStart.toFixed(0),
+    'table lookup (µs/op)': ((tableLookup / tableLookups) * 1000).toFixed(1),
+    '30-day paid range (ms/op)': (rangeQuery / rangeQueries).toFixed(2),
+    'append (µs/op)': ((append / appends) * 1000).toFixed(1),
+  };
+}
+
+const orders = syntheticOrders(ORDER_COUNT);
+const workDir = mkdtempSync(join(tmpdir(), 'restaurant-bench-'));
+console.log(`${ORDER_COUNT} sipariş, ${BRANCHES.length} şube (${workDir})`);
+
+try {
+  const results = [];
+  const jsonDir = join(workDir, 'json');
+  results.push(
+    await measure('json', createJsonBackend(jsonDir), () => createJsonBackend(jsonDir), orders)
+  );
+  const dbPath = join(workDir, 'bench.db');
+  try {
+    results.push(
+      await measure('sqlite', createSqliteBackend(dbPath), () => createSqliteBackend(dbPath), orders)
+    );
+  } catch (error: any) {
+    console.warn(`SQLite atlandı: ${error.message}`);
+  }
+  console.table(results);
+} finally {
+  rmSync(workDir, { recursive: true, force: true });
+}
@@ -0,0 +1,39 @@
+import type { RevenueSummary } from '../src/reports.js';
+import type { Order } from '../src/types.js';
+
+// Karşılaştırma ölçütü: Order nesneleri üzerinde tek geçişte toplama. Kaynak bir
+// generator olabilir; liste oluşturulmadığı için bellek kullanımı aralığın uzunluğundan bağımsızdır
+export function summarizeRevenue(orders: Iterable<Order>): RevenueSummary {
+  const summary: RevenueSummary = {
+    totalRevenue: 0,
+    waiterSales: {},
+    paymentMethods: { cash: 0, card: 0 },
+    orderCount: 0,
+  };
+
+  for (const order of orders) {
+    summary.orderCount++;
+    if (!order.payment) continue;
+
+    const amount = order.payment.finalAmount;
+    summary.totalRevenue += amount;
+
+    if (order.payment.method === 'cash') {
+      summary.paymentMethods.cash += amount;
+    } else {
+      summary.paymentMethods.card += amount;
+    }
+
+    if (order.waiterId && order.waiterName) {
+      if (!summary.waiterSales[order.waiterId]) {
+        summary.waiterSales[order.waiterId] = {
+          name: order.waiterName,
+          sales: 0,
+        };
+      }
+      summary.waiterSales[order.waiterId].sales += amount;
+    }
+  }
+
+  return summary;
+}
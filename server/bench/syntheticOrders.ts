@@ -0,0 +1,62 @@
+import type { Order, OrderItem } from '../src/types.js';
+
+export const BRANCHES = ['1', '2', '3', '4'];
+export const TABLES = 30;
+export const DAY_MS = 24 * 60 * 60 * 1000;
+
+let seed = 42;
+function random(): number {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+// Son bir yıla yayılmış sentetik siparişler; seed sabit olduğu için her çalıştırmada aynı veri
+export function syntheticOrders(count: number): Order[] {
+  const now = Date.now();
+  const orders: Order[] = [];
+  for (let i = 0; i < count; i++) {
+    const branchId = BRANCHES[i % BRANCHES.length];
+    const createdAt = new Date(now - Math.floor(random() * 365 * DAY_MS)).toISOString();
+    const items: OrderItem[] = [];
+    const itemCount = 1 + Math.floor(random() * 4);
+    for (let j = 0; j < itemCount; j++) {
+      items.push({
+        id: `i${i}-${j}`,
+        menuItemId: String(1 + Math.floor(random() * 40)),
+        menuItemName: `Ürün ${j}`,
+        quantity: 1 + Math.floor(random() * 3),
+        price: 50 + Math.floor(random() * 200),
+        category: random() < 0.7 ? 'kitchen' : 'bar',
+        status: 'SERVED',
+        branchId,
+      });
+    }
+    const totalAmount = items.reduce((sum, item) => sum + item.price * item.quantity, 0);
+    const isPaid = random() < 0.8;
+    orders.push({
+      id: `o${i}`,
+      waiterId: `waiter${i % 6}`,
+      waiterName: `Garson ${i % 6}`,
+      tableNumber: 1 + Math.floor(random() * TABLES),
+      items,
+      createdAt,
+      totalAmount,
+      isPaid,
+      ...(isPaid
+        ? {
+            payment: {
+              method: random() < 0.5 ? 'cash' : 'card',
+              amount: totalAmount,
+              discount: 0,
+              finalAmount: totalAmount,
+              paidAt: createdAt,
+              cashierId: 'cashier1',
+              cashierName: 'Kasa',
+            },
+          }
+        : {}),
+      branchId,
+    } as Order);
+  }
+  return orders;
+}
@@ -0,0 +1,210 @@
+// WebSocket olay yayınını ölçer: yoğun bir serviste bir şubenin ekranlarına giden
+// çerçeve ve bayt sayısı. Aynı iş yükü (sipariş, mutfak/bar dokunuşları, hazır +
+// tamamlananlara taşıma, ödeme) sanal zamanda oynatılır ve bekleyen olaylar
+// farklı anlarda boşaltılır:
+//   olay başına  her olay ayrı çerçeve (birleştirme yok, önceki davranış)
+//   tik          aynı istekte yayımlananlar tek çerçeve (WS_COALESCE_MS=0)
+//   N ms         N ms içindeki istekler tek çerçeve (WS_COALESCE_MS=N)
+// permessage-deflate için eşiği aşan çerçevelerin deflate boyutu da hesaplanır
+// (bağlam devri olmadan; gerçek bağlantıda daha da küçük olur).
+// Kullanım: npm run bench:ws -- [sipariş sayısı] [deflate eşiği]   (varsayılan 600 1024)
+import { deflateRawSync } from 'zlib';
+import { movedEvent, orderEvent } from '../src/eventProjection.js';
+import type { Order, OrderItem, OrderStatus } from '../src/types.js';
+import {
+  type Topic,
+  flushEvents,
+  orderTopics,
+  ORDER_TOPICS,
+  publish,
+  subscribe,
+  topicsForRole,
+  unsubscribe,
+} from '../src/wsRegistry.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 600;
+const DEFLATE_THRESHOLD = Number(process.argv[3]) || 1024;
+const BRANCH = '1';
+// Siparişler bu süreye yayılır (yoğun iki saat)
+const DURATION_MS = 2 * 60 * 60 * 1000;
+const SCREENS: Record<string, number> = { kitchen: 2, bar: 1, cashier: 2, waiter: 8, admin: 1 };
+
+interface Operation {
+  time: number;
+  run: () => void;
+}
+
+interface Screen {
+  readyState: number;
+  bufferedAmount: number;
+  frames: number;
+  bytes: number;
+  deflated: number;
+  send(text: string): void;
+}
+
+function createScreen(): Screen {
+  return {
+    readyState: 1,
+    bufferedAmount: 0,
+    frames: 0,
+    bytes: 0,
+    deflated: 0,
+    send(text) {
+      const bytes = Buffer.byteLength(text);
+      this.frames++;
+      this.bytes += bytes;
+      this.deflated += bytes >= DEFLATE_THRESHOLD ? deflateRawSync(text).length : bytes;
+    },
+  };
+}
+
+// Seed sabit: her kipte aynı iş yükü
+function createRandom(): () => number {
+  let seed = 7;
+  return () => {
+    seed = (seed * 1103515245 + 12345) % 2147483648;
+    return seed / 2147483648;
+  };
+}
+
+// Her işlem bir HTTP isteğidir; index.ts'deki işleyicilerin yayımladığı olayları yayımlar
+function buildWorkload(emit: (topics: Topic | Topic[], data: any, key?: string) => void): Operation[] {
+  const random = createRandom();
+  const between = (min: number, max: number) => min + Math.floor(random() * (max - min));
+  const operations: Operation[] = [];
+  let revenue = 0;
+  const revenueEvent = () => ({
+    type: 'REVENUE_UPDATED',
+    report: { date: '2024-01-01', totalRevenue: revenue, orderCount: 0, cancelledAmount: 0, paymentMethods: {} },
+  });
+
+  for (let i = 0; i < ORDER_COUNT; i++) {
+    const createdAt = Math.floor((i / ORDER_COUNT) * DURATION_MS) + between(0, 5000);
+    const items: OrderItem[] = Array.from({ length: between(1, 7) }, (_, j) => ({
+      id: `i${i}-${j}`,
+      menuItemId: String(between(1, 40)),
+      menuItemName: `Ürün ${j}`,
+      quantity: between(1, 4),
+      price: between(50, 250),
+      category: random() < 0.6 ? 'kitchen' : random() < 0.7 ? 'bar' : 'dessert',
+      status: 'PENDING',
+      branchId: BRANCH,
+    }));
+    const order: Order = {
+      id: `o${i}`,
+      waiterId: `waiter${i % 8}`,
+      waiterName: `Garson ${i % 8}`,
+      tableNumber: between(1, 31),
+      items,
+      createdAt: new Date(createdAt).toISOString(),
+      totalAmount: items.reduce((sum, item) => sum + item.price * item.quantity, 0),
+      isPaid: false,
+      branchId: BRANCH,
+    };
+    const setStatus = (item: OrderItem, status: OrderStatus) => {
+      item.status = status;
+      emit(orderTopics(order), orderEvent('ORDER_UPDATED', order), order.id);
+    };
+
+    operations.push({ time: createdAt, run: () => emit(orderTopics(order), orderEvent('NEW_ORDER', order), order.id) });
+    for (const station of ['kitchen', 'bar']) {
+      const stationItems = items.filter((item) => item.category === station);
+      if (stationItems.length === 0) continue;
+      // Aşçı siparişin kalemlerini art arda başlatır, sonra tek tek hazır işaretler;
+      // her "Hazır" dokunuşunu tamamlananlara taşıma isteği izler
+      let time = createdAt + between(20_000, 120_000);
+      for (const item of stationItems) {
+        operations.push({ time, run: () => setStatus(item, 'IN_PROGRESS') });
+        time += between(200, 800);
+      }
+      time += between(120_000, 600_000);
+      for (const item of stationItems) {
+        const readyAt = time;
+        operations.push({ time: readyAt, run: () => setStatus(item, 'READY') });
+        operations.push({
+          time: readyAt + between(5, 40),
+          run: () => {
+            if (!order.items.includes(item)) return;
+            order.items = order.items.filter((candidate) => candidate !== item);
+            const moves = [{ orderId: order.id, itemIds: [item.id] }];
+            emit(ORDER_TOPICS, movedEvent(moves, order.items.length === 0 ? [order.id] : []));
+          },
+        });
+        time += between(1000, 30_000);
+      }
+    }
+    // Ödeme: kasa ödemesi ve admin'e anlık ciro aynı istekte
+    operations.push({
+      time: createdAt + between(900_000, 2_400_000),
+      run: () => {
+        order.isPaid = true;
+        revenue += order.totalAmount;
+        emit('payments', { type: 'PAYMENT_COMPLETED', tableNumber: order.tableNumber, orderIds: [order.id] });
+        emit('reports', revenueEvent());
+      },
+    });
+  }
+  return operations.sort((a, b) => a.time - b.time);
+}
+
+interface Mode {
+  name: string;
+  perEvent?: boolean;
+  windowMs?: number;
+}
+
+function run(mode: Mode) {
+  const screens: Screen[] = [];
+  for (const [role, count] of Object.entries(SCREENS)) {
+    for (let i = 0; i < count; i++) {
+      const screen = createScreen();
+      subscribe(screen, BRANCH, topicsForRole(role));
+      screens.push(screen);
+    }
+  }
+  let events = 0;
+  const operations = buildWorkload((topics, data, key) => {
+    events++;
+    publish(BRANCH, topics, data, key);
+    if (mode.perEvent) flushEvents();
+  });
+
+  let windowStart: number | null = null;
+  for (const operation of operations) {
+    if (mode.windowMs !== undefined && windowStart !== null && operation.time - windowStart >= mode.windowMs) {
+      flushEvents();
+      windowStart = null;
+    }
+    operation.run();
+    if (mode.windowMs === undefined) flushEvents();
+    else windowStart ??= operation.time;
+  }
+  flushEvents();
+  screens.forEach((screen) => unsubscribe(screen));
+
+  const seconds = DURATION_MS / 1000;
+  const frames = screens.reduce((sum, screen) => sum + screen.frames, 0);
+  const bytes = screens.reduce((sum, screen) => sum + screen.bytes, 0);
+  const deflated = screens.reduce((sum, screen) => sum + screen.deflated, 0);
+  return {
+    kip: mode.name,
+    olay: events,
+    çerçeve: frames,
+    'çerçeve/sn': (frames / seconds).toFixed(2),
+    'bayt/sn': Math.round(bytes / seconds),
+    [`deflate ≥${DEFLATE_THRESHOLD} bayt/sn`]: Math.round(deflated / seconds),
+  };
+}
+
+const screenCount = Object.values(SCREENS).reduce((sum, count) => sum + count, 0);
+console.log(`${ORDER_COUNT} sipariş, ${DURATION_MS / 3_600_000} saat, ${screenCount} ekran`);
+console.table(
+  [
+    { name: 'olay başına', perEvent: true },
+    { name: 'tik' },
+    { name: '10 ms', windowMs: 10 },
+    { name: '50 ms', windowMs: 50 },
+    { name: '250 ms', windowMs: 250 },
+  ].map(run)
+);
@@ -0,0 +1,92 @@
+// Sipariş kodlamasının (orderCodec.ts) kayıpsız olduğunu doğrular: rastgele siparişler
+// orders.json ve arşiv segmenti biçimlerine yazılıp geri okunur, sonuç girdiyle aynı
+// olmalıdır. Eski biçimdeki (düz Order[] / başlıksız NDJSON) dosyaların okunması da kontrol edilir.
+// Kullanım: npm run check:codec -- [sipariş sayısı]   (varsayılan 5000)
+import { isDeepStrictEqual } from 'util';
+import { decodeOrderLines, decodeOrders, encodeOrderLines, encodeOrders } from '../src/orderCodec.js';
+import type { Order, OrderStatus } from '../src/types.js';
+
+const ORDER_COUNT = Number(process.argv[2]) || 5000;
+const BRANCH = '1';
+const STATUSES: OrderStatus[] = ['PENDING', 'PREPARING', 'READY', 'SERVED', 'CANCELLED'];
+const NAMES = ['Ahmet', 'Mehmet', 'Ayşe', 'Çağrı'];
+
+let seed = 11;
+function random(): number {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+function pick<T>(values: T[]): T {
+  return values[Math.floor(random() * values.length)];
+}
+
+// İsteğe bağlı alanlar (masa, ödeme, indirim, iptal nedeni) rastgele eksik bırakılır
+function randomOrder(i: number): Order {
+  const id = `o${i}`;
+  const items = Array.from({ length: 1 + Math.floor(random() * 4) }, (_, j) => {
+    const status = pick(STATUSES);
+    return {
+      id: `${id}-i${j}`,
+      menuItemId: String(1 + Math.floor(random() * 20)),
+      menuItemName: `Ürün ${Math.floor(random() * 20)}`,
+      quantity: 1 + Math.floor(random() * 3),
+      price: Math.round(random() * 50000) / 100,
+      category: (random() < 0.5 ? 'kitchen' : 'bar') as 'kitchen' | 'bar',
+      status,
+      ...(status === 'CANCELLED' && random() < 0.5 ? { cancelledReason: 'müşteri vazgeçti' } : {}),
+      branchId: BRANCH,
+    };
+  });
+  const waiter = pick(NAMES);
+  const isPaid = random() < 0.6;
+  const order: Order = {
+    id,
+    waiterId: `w-${waiter}`,
+    waiterName: waiter,
+    ...(random() < 0.9 ? { tableNumber: 1 + Math.floor(random() * 30) } : {}),
+    items,
+    createdAt: new Date(Date.UTC(2025, 0, 1) + Math.floor(random() * 365 * 24 * 60 * 60 * 1000)).toISOString(),
+    totalAmount: items.reduce((sum, item) => sum + item.price * item.quantity, 0),
+    isPaid,
+    branchId: BRANCH,
+  };
+  if (isPaid) {
+    const discount = random() < 0.3 ? 10 : undefined;
+    order.payment = {
+      method: random() < 0.5 ? 'cash' : 'card',
+      amount: order.totalAmount,
+      ...(discount !== undefined ? { discount } : {}),
+      finalAmount: order.totalAmount - (discount ?? 0),
+      paidAt: order.createdAt,
+      cashierId: 'c1',
+      cashierName: 'Kasa',
+    };
+  }
+  return order;
+}
+
+function check(label: string, decoded: Order[], orders: Order[]): void {
+  if (decoded.length !== orders.length) {
+    console.error(`${label}: ${orders.length} sipariş yazıldı, ${decoded.length} okundu`);
+    process.exit(1);
+  }
+  const index = orders.findIndex((order, i) => !isDeepStrictEqual(decoded[i], order));
+  if (index >= 0) {
+    console.error(`${label}: sipariş ${orders[index].id} farklı okundu`);
+    console.error('  yazılan:', JSON.stringify(orders[index]));
+    console.error('  okunan: ', JSON.stringify(decoded[index]));
+    process.exit(1);
+  }
+}
+
+const orders = Array.from({ length: ORDER_COUNT }, (_, i) => randomOrder(i));
+const lines = (text: string) => text.split('\n').filter((line) => line.trim());
+
+check('orders.json', decodeOrders(JSON.parse(encodeOrders(BRANCH, orders))), orders);
+check('arşiv segmenti', [...decodeOrderLines(lines(encodeOrderLines(orders)), 'segment')], orders);
+check('eski orders.json', decodeOrders(JSON.parse(JSON.stringify(orders))), orders);
+check('eski arşiv segmenti', [...decodeOrderLines(orders.map((order) => JSON.stringify(order)), 'segment')], orders);
+check('boş liste', decodeOrders(JSON.parse(encodeOrders(BRANCH, []))), []);
+
+console.log(`${ORDER_COUNT} sipariş kodlanıp geri okundu, fark yok`);
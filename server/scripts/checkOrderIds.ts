@@ -0,0 +1,40 @@
+// Sipariş/kalem id'lerinin (ids.ts) sırasını doğrular: art arda üretilen id'ler sabit
+// uzunlukta ve kesin artan olmalı; aynı milisaniyede (sayaç) ve saat geri gittiğinde de.
+// Kullanım: npm run check:ids -- [id sayısı]   (varsayılan 200000)
+import { newId } from '../src/ids.js';
+
+const ID_COUNT = Number(process.argv[2]) || 200_000;
+const ID_LENGTH = 18;
+
+function fail(message: string): never {
+  console.error(message);
+  process.exit(1);
+}
+
+function checkIncreasing(label: string, ids: string[]): void {
+  ids.forEach((id, i) => {
+    if (id.length !== ID_LENGTH) fail(`${label}: ${id} ${ID_LENGTH} karakter değil`);
+    if (i > 0 && ids[i - 1] >= id) fail(`${label}: ${ids[i - 1]} >= ${id} (adım ${i})`);
+  });
+}
+
+// Date.now yerine verilen saatle üretim (saatin geri gitmesi ve aynı milisaniye için)
+function withClock(times: number[]): string[] {
+  const realNow = Date.now;
+  let i = 0;
+  Date.now = () => times[Math.min(i++, times.length - 1)];
+  try {
+    return times.map(() => newId());
+  } finally {
+    Date.now = realNow;
+  }
+}
+
+checkIncreasing('gerçek saat', Array.from({ length: ID_COUNT }, newId));
+
+const base = Date.now() + 60_000;
+// Sayaç (32^4) dolunca sonraki milisaniyeden ödünç alınır
+checkIncreasing('aynı milisaniye', withClock(Array.from({ length: 32 ** 4 + 10 }, () => base)));
+checkIncreasing('geri giden saat', withClock([base + 10, base + 5, base, base - 1000, base + 11]));
+
+console.log(`${ID_COUNT} id sıralı ve ${ID_LENGTH} karakter`);
@@ -0,0 +1,192 @@
+// Sipariş indekslerinin veriden sapmadığını doğrular: geçici bir JSON deposunda
+// rastgele sipariş mutasyonları uygulanır ve her adımdan sonra verifyIndexes()
+// çalıştırılır. Sonunda depo diskten yeniden açılıp (günlük yeniden oynatma) tekrar kontrol edilir.
+// better-sqlite3 kuruluysa aynı mutasyonlar SQLite deposuna da uygulanır ve iki deponun
+// siparişleri karşılaştırılır (JSON-SQLite eşitliği); kurulu değilse bu kısım atlanır.
+// Tutarsızlıkta sıfırdan farklı kodla çıkar.
+// Kullanım: npm run check:indexes -- [adım sayısı]   (varsayılan 5000)
+import { mkdtempSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import { join } from 'path';
+import { isDeepStrictEqual } from 'util';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import { createSqliteBackend } from '../src/sqliteBackend.js';
+import type { StorageBackend } from '../src/storageBackend.js';
+import type { Order, OrderStatus } from '../src/types.js';
+
+const STEPS = Number(process.argv[2]) || 5000;
+const BRANCHES = ['1', '2'];
+const TABLES = 12;
+const STATUSES: OrderStatus[] = ['PENDING', 'PREPARING', 'READY', 'SERVED', 'CANCELLED'];
+
+let seed = 7;
+function random(): number {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+}
+
+function pick<T>(values: T[]): T {
+  return values[Math.floor(random() * values.length)];
+}
+
+let nextId = 0;
+function newOrder(branchId: string): Order {
+  const id = `o${nextId++}`;
+  const items = Array.from({ length: 1 + Math.floor(random() * 3) }, (_, i) => ({
+    id: `${id}-i${i}`,
+    menuItemId: String(1 + Math.floor(random() * 10)),
+    menuItemName: 'Ürün',
+    quantity: 1,
+    price: 100,
+    category: (random() < 0.5 ? 'kitchen' : 'bar') as 'kitchen' | 'bar',
+    status: 'PENDING' as OrderStatus,
+    branchId,
+  }));
+  return {
+    id,
+    waiterId: 'w1',
+    waiterName: 'Garson',
+    tableNumber: 1 + Math.floor(random() * TABLES),
+    items,
+    // Son iki saate dağılmış: zaman indeksine sıra dışı eklemeler de yapılır
+    createdAt: new Date(Date.now() - Math.floor(random() * 2 * 60 * 60 * 1000)).toISOString(),
+    totalAmount: items.length * 100,
+    isPaid: false,
+    branchId,
+  };
+}
+
+// Mutasyon ilk depodaki duruma göre seçilir ve her depoya aynen uygulanır
+function step(backends: StorageBackend[]): string {
+  const [backend] = backends;
+  const apply = (mutate: (target: StorageBackend) => void) => backends.forEach(mutate);
+  const branchId = pick(BRANCHES);
+  const orders = backend.read('orders', branchId);
+  const roll = random();
+
+  if (orders.length === 0 || roll < 0.3) {
+    const order = newOrder(branchId);
+    apply((target) => target.appendOrder(branchId, structuredClone(order)));
+    return 'appendOrder';
+  }
+  const order = pick(orders);
+  if (roll < 0.55 && order.items.length > 0) {
+    const itemId = pick(order.items).id;
+    const status = pick(STATUSES);
+    apply((target) => target.updateOrderItemStatus(branchId, order.id, itemId, status, 'test'));
+    return 'updateOrderItemStatus';
+  }
+  if (roll < 0.65) {
+    const tableNumber = 1 + Math.floor(random() * TABLES);
+    apply((target) => target.moveOrderTable(branchId, order.id, tableNumber));
+    return 'moveOrderTable';
+  }
+  if (roll < 0.75 && order.tableNumber !== undefined) {
+    const unpaid = backend.findUnpaidOrdersByTable(branchId, order.tableNumber).map((o) => o.id);
+    const payment = {
+      method: 'cash' as const,
+      amount: 100,
+      finalAmount: 100,
+      paidAt: new Date().toISOString(),
+      cashierId: 'c1',
+      cashierName: 'Kasa',
+    };
+    apply((target) => target.markOrdersPaid(branchId, unpaid, { ...payment }));
+    return 'markOrdersPaid';
+  }
+  if (roll < 0.9) {
+    const moves = orders
+      .filter((o) => !o.isPaid)
+      .map((o) => ({ orderId: o.id, itemIds: o.items.filter((i) => i.status === 'READY').map((i) => i.id) }))
+      .filter((move) => move.itemIds.length > 0);
+    const completedAt = new Date().toISOString();
+    apply((target) => target.moveItemsToCompleted(branchId, moves, completedAt));
+    return 'moveItemsToCompleted';
+  }
+  if (roll < 0.95) {
+    const kept = orders.filter(() => random() < 0.9);
+    apply((target) => target.write('orders', structuredClone(kept), branchId));
+    return 'write';
+  }
+  // keepDay boş: bugünün siparişleri de silinir. Rastgele bir saatlik pencere silinir;
+  // zaman indeksinden bulunan siparişlerin tamamen silindiği kontrol edilir.
+  const end = new Date(Date.now() - Math.floor(random() * 2 * 60 * 60 * 1000));
+  const start = new Date(end.getTime() - 60 * 60 * 1000);
+  apply((target) => {
+    target.clearRange(branchId, start, end, '');
+    const left = target
+      .read('orders', branchId)
+      .filter((o) => Date.parse(o.createdAt) >= start.getTime() && Date.parse(o.createdAt) <= end.getTime());
+    if (left.length > 0) {
+      console.error(`clearRange aralıktaki ${left.length} siparişi silmedi`);
+      process.exit(1);
+    }
+  });
+  return 'clearRange';
+}
+
+function verify(backend: StorageBackend, label: string): void {
+  const problems = backend.verifyIndexes();
+  if (problems.length > 0) {
+    console.error(`İndeks tutarsızlığı (${label}):\n  ${problems.join('\n  ')}`);
+    process.exit(1);
+  }
+}
+
+// İki depo aynı siparişleri (aktif ve geçmiş) döndürmeli; sıra depoya göre değişebilir
+function compare(json: StorageBackend, sqlite: StorageBackend, label: string): void {
+  const byId = (a: Order, b: Order) => (a.id < b.id ? -1 : a.id > b.id ? 1 : 0);
+  for (const collection of ['orders', 'completedOrders'] as const) {
+    for (const branchId of BRANCHES) {
+      const expected = json.read(collection, branchId).sort(byId);
+      const actual = sqlite.read(collection, branchId).sort(byId);
+      const index = expected.findIndex((order, i) => !isDeepStrictEqual(actual[i], order));
+      if (expected.length !== actual.length || index >= 0) {
+        console.error(`JSON ve SQLite farklı (${label}, ${collection}, şube ${branchId}):`);
+        console.error(`  sipariş sayısı ${expected.length} / ${actual.length}`);
+        if (index >= 0) {
+          console.error('  JSON:  ', JSON.stringify(expected[index]));
+          console.error('  SQLite:', JSON.stringify(actual[index]));
+        }
+        process.exit(1);
+      }
+    }
+  }
+}
+
+function openSqlite(path: string): StorageBackend | null {
+  const backend = createSqliteBackend(path);
+  try {
+    backend.init();
+  } catch (error: any) {
+    console.log(`JSON-SQLite eşitlik kontrolü atlandı: ${error.message}`);
+    return null;
+  }
+  return backend;
+}
+
+const workDir = mkdtempSync(join(tmpdir(), 'restaurant-index-check-'));
+try {
+  const backend = createJsonBackend(workDir);
+  backend.init();
+  const sqlite = openSqlite(join(workDir, 'restaurant.db'));
+  const backends = sqlite ? [backend, sqlite] : [backend];
+  const counts: Record<string, number> = {};
+  for (let i = 0; i < STEPS; i++) {
+    const operation = step(backends);
+    counts[operation] = (counts[operation] ?? 0) + 1;
+    const label = `adım ${i + 1}: ${operation}`;
+    backends.forEach((target) => verify(target, label));
+    if (sqlite) compare(backend, sqlite, label);
+  }
+  await Promise.all(backends.map((target) => target.flush()));
+
+  const reopened = createJsonBackend(workDir);
+  reopened.init();
+  verify(reopened, 'yeniden açılış');
+  if (sqlite) compare(reopened, sqlite, 'yeniden açılış');
+
+  console.log(`${STEPS} adım sonrası indeksler tutarlı${sqlite ? ', JSON ve SQLite eşit' : ''}`, counts);
+} finally {
+  rmSync(workDir, { recursive: true, force: true });
+}
@@ -0,0 +1,55 @@
+// data/<branchId>/*.json dosyalarını SQLite veritabanına aktarır.
+// Kullanım: npm run import:sqlite -- [veri klasörü] [veritabanı yolu]
+import { join } from 'path';
+import { fileURLToPath } from 'url';
+import { dirname } from 'path';
+import { createJsonBackend } from '../src/jsonBackend.js';
+import { createSqliteBackend } from '../src/sqliteBackend.js';
+import type { Collection } from '../src/storageBackend.js';
+import type { Order } from '../src/types.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+
+const dataDir = process.argv[2] || join(__dirname, '../data');
+const dbPath = process.argv[3] || process.env.SQLITE_PATH || join(dataDir, 'restaurant.db');
+
+const source = createJsonBackend(dataDir);
+const target = createSqliteBackend(dbPath);
+source.init();
+target.init();
+
+// Önceki günlerin ödenmiş siparişleri JSON deposunda aktif listede değil 'paid' arşivindedir;
+// SQLite'ta hepsi orders tablosundadır. read('orders') yalnızca aktif listeyi döndürdüğü
+// için arşivdekiler tüm zaman aralığı akışından (aktiflerle tekrarlananlar hariç) eklenir.
+let archivedPaid = 0;
+
+function readAllOrders(): Order[] {
+  const orders = source.read('orders');
+  const liveIds = new Set(orders.map((order) => order.id));
+  const branchIds = new Set(
+    (['users', 'menu', 'orders', 'completedOrders'] as Collection[]).flatMap((collection) =>
+      source.read(collection).map((row) => row.branchId)
+    )
+  );
+  branchIds.forEach((branchId) => {
+    for (const order of source.streamPaidOrdersBetween(branchId, new Date(0), new Date('9999-12-31T23:59:59.999Z'))) {
+      if (liveIds.has(order.id)) continue;
+      orders.push(order);
+      archivedPaid++;
+    }
+  });
+  return orders;
+}
+
+const collections: Collection[] = ['users', 'menu', 'orders', 'completedOrders'];
+for (const collection of collections) {
+  const rows = collection === 'orders' ? readAllOrders() : source.read(collection);
+  target.write(collection, rows);
+  const note = collection === 'orders' ? ` (${archivedPaid} arşivlenmiş ödenmiş sipariş dahil)` : '';
+  console.log(`${collection}: ${rows.length} kayıt aktarıldı${note}`);
+}
+
+await source.flush();
+await target.flush();
+console.log(`✅ SQLite veritabanı hazır: ${dbPath}`);
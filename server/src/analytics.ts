@@ -0,0 +1,448 @@
+import type { Order, OrderStatus } from './types.js';
+import {
+  emptySummary,
+  lowerBound,
+  METHOD_CARD,
+  METHOD_CASH,
+  summarizeColumns,
+  type ColumnSnapshot,
+  type DailySummary,
+} from './columnScan.js';
+import { dayEnd, dayOf, dayStart } from './businessDay.js';
+
+export type { DailySummary } from './columnScan.js';
+
+// Ödenmiş siparişlerin sütun bazlı (columnar) bellek içi kopyası. Rapor uçları iç içe
+// Order nesnelerini dolaşmak yerine bu tipli dizileri tarar. Garson ve menü ürünü
+// id'leri sözlükle sayıya çevrilir; tarih epoch-ms olarak tutulur.
+// Her şube ilk erişimde kalıcı depodan bir kez yüklenir, sonra /api/cashier/pay ile büyür.
+// Sütunlar SharedArrayBuffer üzerindedir; rapor işçileri kopyalamadan tarar.
+// Satırlar createdAt'e göre sıralı tutulur (ödemeler geldikçe eklenen kısa bir sırasız
+// kuyruk hariç); aralık sorguları sınırları ikili aramayla bulur.
+
+const INITIAL_CAPACITY = 1024;
+// Sırasız kuyruk bu kadar satırı geçince sütunlar yeniden sıralanır
+const SORT_TAIL_ROWS = 4096;
+
+interface Dictionary {
+  codes: Map<string, number>;
+  ids: string[];
+  names: string[];
+}
+
+interface BranchColumns {
+  orderIds: Map<string, number>;
+  rowCount: number;
+  // [0, sortedCount) createdAt'e göre sıralı; sonrası ödeme sırasında eklenmiş kuyruk
+  sortedCount: number;
+  createdAt: Float64Array;
+  amount: Float64Array;
+  discount: Float64Array;
+  method: Uint8Array;
+  // -1: garson bilgisi yok
+  waiter: Int32Array;
+  // Siparişin kalemleri item* sütunlarında [itemStart[row], itemStart[row + 1]) aralığında
+  itemStart: Uint32Array;
+  itemCount: number;
+  itemMenu: Uint32Array;
+  itemQuantity: Float64Array;
+  itemPrice: Float64Array;
+  itemCancelled: Uint8Array;
+  waiters: Dictionary;
+  menuItems: Dictionary;
+}
+
+export type PaidOrderSource = (branchId: string) => Iterable<Order>;
+// Bir iş gününün (businessDay.ts) ödenmiş siparişleri değiştiğinde çağrılır
+export type PaidDayListener = (branchId: string, day: string) => void;
+
+const branches = new Map<string, BranchColumns>();
+let loadSource: PaidOrderSource = () => [];
+const dayListeners: PaidDayListener[] = [];
+
+function notifyDay(branchId: string, day: string): void {
+  dayListeners.forEach((listener) => listener(branchId, day));
+}
+
+function createDictionary(): Dictionary {
+  return { codes: new Map(), ids: [], names: [] };
+}
+
+function encode(dictionary: Dictionary, id: string, name: string): number {
+  let code = dictionary.codes.get(id);
+  if (code === undefined) {
+    code = dictionary.ids.length;
+    dictionary.codes.set(id, code);
+    dictionary.ids.push(id);
+    dictionary.names.push(name);
+  }
+  return code;
+}
+
+type Column = Float64Array | Uint32Array | Int32Array | Uint8Array;
+type ColumnConstructor<T extends Column> = {
+  new (buffer: SharedArrayBuffer): T;
+  BYTES_PER_ELEMENT: number;
+};
+
+function sharedColumn<T extends Column>(Type: ColumnConstructor<T>, length: number): T {
+  return new Type(new SharedArrayBuffer(length * Type.BYTES_PER_ELEMENT));
+}
+
+// Büyüyen sütun yeni bir tampona kopyalanır; eski tamponu tarayan işçi etkilenmez
+function grow<T extends Column>(column: T, capacity: number): T {
+  if (column.length >= capacity) return column;
+  let size = Math.max(column.length, INITIAL_CAPACITY);
+  while (size < capacity) size *= 2;
+  const grown = sharedColumn(column.constructor as unknown as ColumnConstructor<T>, size);
+  grown.set(column);
+  return grown;
+}
+
+function createColumns(): BranchColumns {
+  return {
+    orderIds: new Map(),
+    rowCount: 0,
+    sortedCount: 0,
+    createdAt: sharedColumn(Float64Array, INITIAL_CAPACITY),
+    amount: sharedColumn(Float64Array, INITIAL_CAPACITY),
+    discount: sharedColumn(Float64Array, INITIAL_CAPACITY),
+    method: sharedColumn(Uint8Array, INITIAL_CAPACITY),
+    waiter: sharedColumn(Int32Array, INITIAL_CAPACITY),
+    itemStart: sharedColumn(Uint32Array, INITIAL_CAPACITY + 1),
+    itemCount: 0,
+    itemMenu: sharedColumn(Uint32Array, INITIAL_CAPACITY),
+    itemQuantity: sharedColumn(Float64Array, INITIAL_CAPACITY),
+    itemPrice: sharedColumn(Float64Array, INITIAL_CAPACITY),
+    itemCancelled: sharedColumn(Uint8Array, INITIAL_CAPACITY),
+    waiters: createDictionary(),
+    menuItems: createDictionary(),
+  };
+}
+
+// Eklenmezse (ödeme yok veya zaten var) false
+function appendOrder(columns: BranchColumns, order: Order): boolean {
+  if (!order.payment || columns.orderIds.has(order.id)) return false;
+
+  const row = columns.rowCount;
+  const rows = row + 1;
+  columns.createdAt = grow(columns.createdAt, rows);
+  columns.amount = grow(columns.amount, rows);
+  columns.discount = grow(columns.discount, rows);
+  columns.method = grow(columns.method, rows);
+  columns.waiter = grow(columns.waiter, rows);
+  columns.itemStart = grow(columns.itemStart, rows + 1);
+
+  columns.createdAt[row] = Date.parse(order.createdAt);
+  columns.amount[row] = order.payment.finalAmount;
+  columns.discount[row] = order.payment.discount ?? 0;
+  columns.method[row] = order.payment.method === 'cash' ? METHOD_CASH : METHOD_CARD;
+  columns.waiter[row] =
+    order.waiterId && order.waiterName ? encode(columns.waiters, order.waiterId, order.waiterName) : -1;
+
+  const items = columns.itemCount + order.items.length;
+  columns.itemMenu = grow(columns.itemMenu, items);
+  columns.itemQuantity = grow(columns.itemQuantity, items);
+  columns.itemPrice = grow(columns.itemPrice, items);
+  columns.itemCancelled = grow(columns.itemCancelled, items);
+  order.items.forEach((item, index) => {
+    const itemRow = columns.itemCount + index;
+    columns.itemMenu[itemRow] = encode(columns.menuItems, item.menuItemId, item.menuItemName);
+    columns.itemQuantity[itemRow] = item.quantity;
+    columns.itemPrice[itemRow] = item.price;
+    columns.itemCancelled[itemRow] = item.status === 'CANCELLED' ? 1 : 0;
+  });
+
+  columns.itemStart[row] = columns.itemCount;
+  columns.itemCount = items;
+  columns.itemStart[rows] = items;
+  columns.orderIds.set(order.id, row);
+  columns.rowCount = rows;
+  return true;
+}
+
+// Verilen satırları bu sırayla yeni tamponlara kopyalar (sözlükler paylaşılır).
+// Eski sütunları tarayan işçiler etkilenmez.
+function copyRows(columns: BranchColumns, rows: ArrayLike<number>, sortedCount: number): BranchColumns {
+  const copy = createColumns();
+  copy.waiters = columns.waiters;
+  copy.menuItems = columns.menuItems;
+  const { itemStart } = columns;
+  let items = 0;
+  for (let i = 0; i < rows.length; i++) items += itemStart[rows[i] + 1] - itemStart[rows[i]];
+  copy.createdAt = grow(copy.createdAt, rows.length);
+  copy.amount = grow(copy.amount, rows.length);
+  copy.discount = grow(copy.discount, rows.length);
+  copy.method = grow(copy.method, rows.length);
+  copy.waiter = grow(copy.waiter, rows.length);
+  copy.itemStart = grow(copy.itemStart, rows.length + 1);
+  copy.itemMenu = grow(copy.itemMenu, items);
+  copy.itemQuantity = grow(copy.itemQuantity, items);
+  copy.itemPrice = grow(copy.itemPrice, items);
+  copy.itemCancelled = grow(copy.itemCancelled, items);
+
+  const rowOrderIds: string[] = new Array(columns.rowCount);
+  columns.orderIds.forEach((row, orderId) => {
+    rowOrderIds[row] = orderId;
+  });
+
+  for (let target = 0; target < rows.length; target++) {
+    const row = rows[target];
+    copy.createdAt[target] = columns.createdAt[row];
+    copy.amount[target] = columns.amount[row];
+    copy.discount[target] = columns.discount[row];
+    copy.method[target] = columns.method[row];
+    copy.waiter[target] = columns.waiter[row];
+    copy.itemStart[target] = copy.itemCount;
+    for (let itemRow = itemStart[row]; itemRow < itemStart[row + 1]; itemRow++) {
+      copy.itemMenu[copy.itemCount] = columns.itemMenu[itemRow];
+      copy.itemQuantity[copy.itemCount] = columns.itemQuantity[itemRow];
+      copy.itemPrice[copy.itemCount] = columns.itemPrice[itemRow];
+      copy.itemCancelled[copy.itemCount] = columns.itemCancelled[itemRow];
+      copy.itemCount++;
+    }
+    copy.orderIds.set(rowOrderIds[row], target);
+  }
+  copy.itemStart[rows.length] = copy.itemCount;
+  copy.rowCount = rows.length;
+  copy.sortedCount = sortedCount;
+  return copy;
+}
+
+// Sırasız kuyruk sıralanıp sıralı bölgeyle birleştirilir. Kuyruk zaten sıradaysa
+// (siparişler oluşturulma sırasıyla ödendiyse) kopyalamaya gerek yoktur.
+function sortColumns(columns: BranchColumns): BranchColumns {
+  const { createdAt, sortedCount, rowCount } = columns;
+  let inOrder = true;
+  for (let row = Math.max(1, sortedCount); row < rowCount && inOrder; row++) {
+    inOrder = createdAt[row - 1] <= createdAt[row];
+  }
+  if (inOrder) {
+    columns.sortedCount = rowCount;
+    return columns;
+  }
+
+  const tail = Array.from({ length: rowCount - sortedCount }, (_, i) => sortedCount + i);
+  tail.sort((a, b) => createdAt[a] - createdAt[b] || a - b);
+  const rows = new Uint32Array(rowCount);
+  let sorted = 0;
+  let next = 0;
+  for (let target = 0; target < rowCount; target++) {
+    const takeSorted =
+      next >= tail.length || (sorted < sortedCount && createdAt[sorted] <= createdAt[tail[next]]);
+    rows[target] = takeSorted ? sorted++ : tail[next++];
+  }
+  return copyRows(columns, rows, rowCount);
+}
+
+function getColumns(branchId: string): BranchColumns {
+  let columns = branches.get(branchId);
+  if (!columns) {
+    columns = createColumns();
+    for (const order of loadSource(branchId)) {
+      appendOrder(columns, order);
+    }
+    columns = sortColumns(columns);
+    branches.set(branchId, columns);
+  }
+  return columns;
+}
+
+// Şubenin o anki sütun görünümü (tarama ana iş parçacığında veya işçide yapılabilir)
+export function snapshotColumns(branchId: string): ColumnSnapshot {
+  const columns = getColumns(branchId);
+  return {
+    rowCount: columns.rowCount,
+    sortedCount: columns.sortedCount,
+    createdAt: columns.createdAt,
+    amount: columns.amount,
+    method: columns.method,
+    waiter: columns.waiter,
+    itemStart: columns.itemStart,
+    itemMenu: columns.itemMenu,
+    itemQuantity: columns.itemQuantity,
+    itemPrice: columns.itemPrice,
+    itemCancelled: columns.itemCancelled,
+    waiterIds: columns.waiters.ids,
+    waiterNames: columns.waiters.names,
+    menuIds: columns.menuItems.ids,
+    menuNames: columns.menuItems.names,
+  };
+}
+
+// Sunucu başlarken kalıcı depodaki ödenmiş siparişlerin kaynağı verilir
+export function initAnalytics(source: PaidOrderSource): void {
+  loadSource = source;
+  branches.clear();
+}
+
+// /api/cashier/pay sonrası çağrılır; aynı sipariş ikinci kez eklenmez
+export function recordPaidOrders(branchId: string, orders: Order[]): void {
+  const columns = getColumns(branchId);
+  orders.forEach((order) => {
+    if (appendOrder(columns, order)) notifyDay(branchId, dayOf(columns.createdAt[columns.rowCount - 1]));
+  });
+  if (columns.rowCount - columns.sortedCount > SORT_TAIL_ROWS) {
+    branches.set(branchId, sortColumns(columns));
+  }
+}
+
+// Geç gelen ödeme, ödenmiş kalem iptali ve clear-range'de değişen günler bildirilir
+export function onPaidDayChanged(listener: PaidDayListener): void {
+  dayListeners.push(listener);
+}
+
+// Ödenmiş bir siparişin kalemi sonradan iptal edilirse rapor buna göre değişir.
+// itemIndex, kalemin sipariş içindeki sırasıdır (ödemeden sonra kalem listesi değişmez).
+export function updatePaidItemStatus(
+  branchId: string,
+  orderId: string,
+  itemIndex: number,
+  status: OrderStatus
+): void {
+  const columns = branches.get(branchId);
+  const row = columns?.orderIds.get(orderId);
+  if (!columns || row === undefined) return;
+  const itemRow = columns.itemStart[row] + itemIndex;
+  if (itemRow < columns.itemStart[row + 1]) {
+    columns.itemCancelled[itemRow] = status === 'CANCELLED' ? 1 : 0;
+    notifyDay(branchId, dayOf(columns.createdAt[row]));
+  }
+}
+
+// clear-range sonrası: aralıktaki satırlar (keepDay hariç) atılır ve sütunlar sıkıştırılır.
+// Sıralı bölgede yalnızca aralığın ikili aramayla bulunan satırlarına bakılır.
+export function removeAnalyticsBetween(branchId: string, start: Date, end: Date, keepDay: string): void {
+  const columns = branches.get(branchId);
+  if (!columns) return;
+  const startMs = start.getTime();
+  const endMs = end.getTime();
+  const keepStart = dayStart(keepDay);
+  const keepEnd = dayEnd(keepDay);
+  const { createdAt, sortedCount, rowCount } = columns;
+
+  const first = lowerBound(createdAt, 0, sortedCount, startMs);
+  const last = lowerBound(createdAt, first, sortedCount, endMs + 1);
+  const kept: number[] = [];
+  const removedDays = new Set<string>();
+  let keptSorted = 0;
+  for (let row = 0; row < rowCount; row++) {
+    // Sıralı bölgede aralık dışı satırlar kontrol edilmeden korunur
+    if (row >= sortedCount || (row >= first && row < last)) {
+      const time = createdAt[row];
+      const inRange = time >= startMs && time <= endMs;
+      const isKeepDay = time >= keepStart && time <= keepEnd;
+      if (inRange && !isKeepDay) {
+        removedDays.add(dayOf(time));
+        continue;
+      }
+    }
+    kept.push(row);
+    if (row < sortedCount) keptSorted++;
+  }
+  if (removedDays.size === 0) return;
+
+  branches.set(branchId, copyRows(columns, kept, keptSorted));
+  removedDays.forEach((day) => notifyDay(branchId, day));
+}
+
+// createdAt'i [start, end] aralığındaki siparişlerin özeti. withProducts verilmezse
+// ürün kırılımı çıkarılmaz. Büyük şubelerde reportPool.ts aynı taramayı işçide yapar.
+export function summarizePaidOrders(
+  branchId: string,
+  start: Date,
+  end: Date,
+  withProducts = false
+): DailySummary {
+  return summarizeColumns(snapshotColumns(branchId), start.getTime(), end.getTime(), withProducts);
+}
+
+interface DayTotals {
+  summary: DailySummary;
+  waiters: Map<number, number>;
+  products: Map<number, { quantity: number; revenue: number }>;
+}
+
+// Günlük rollup'lar için: verilen günlerin (days null ise `before` gününden önceki
+// tüm günlerin) özetleri tek geçişte, ürün kırılımıyla birlikte hesaplanır.
+// Sonuçta yalnızca siparişi olan günler bulunur.
+export function summarizePaidOrdersByDay(
+  branchId: string,
+  days: Set<string> | null,
+  before: string
+): Map<string, DailySummary> {
+  const columns = getColumns(branchId);
+  const beforeMs = dayStart(before);
+  const totals = new Map<string, DayTotals>();
+
+  const { createdAt, amount, method, waiter, itemStart, itemMenu, itemQuantity, itemPrice, itemCancelled } =
+    columns;
+
+  const addRow = (row: number) => {
+    const time = createdAt[row];
+    if (time >= beforeMs) return;
+    const dayKey = dayOf(time);
+    if (days && !days.has(dayKey)) return;
+
+    let day = totals.get(dayKey);
+    if (!day) {
+      day = { summary: emptySummary(), waiters: new Map(), products: new Map() };
+      totals.set(dayKey, day);
+    }
+    const { summary } = day;
+    const value = amount[row];
+    summary.orderCount++;
+    summary.totalRevenue += value;
+    if (method[row] === METHOD_CASH) summary.paymentMethods.cash += value;
+    else summary.paymentMethods.card += value;
+
+    const waiterCode = waiter[row];
+    if (waiterCode >= 0) {
+      day.waiters.set(waiterCode, (day.waiters.get(waiterCode) ?? 0) + value);
+    }
+
+    for (let itemRow = itemStart[row]; itemRow < itemStart[row + 1]; itemRow++) {
+      const itemTotal = itemPrice[itemRow] * itemQuantity[itemRow];
+      if (itemCancelled[itemRow]) {
+        summary.cancelledAmount += itemTotal;
+        continue;
+      }
+      const menuCode = itemMenu[itemRow];
+      let product = day.products.get(menuCode);
+      if (!product) {
+        product = { quantity: 0, revenue: 0 };
+        day.products.set(menuCode, product);
+      }
+      product.quantity += itemQuantity[itemRow];
+      product.revenue += itemTotal;
+    }
+  };
+
+  // Sıralı bölgede yalnızca istenen günlerin (veya `before`dan önceki) satırları
+  const { sortedCount } = columns;
+  const ranges: Array<[number, number]> = days
+    ? [...days].map((day) => [
+        lowerBound(createdAt, 0, sortedCount, dayStart(day)),
+        lowerBound(createdAt, 0, sortedCount, dayEnd(day) + 1),
+      ])
+    : [[0, lowerBound(createdAt, 0, sortedCount, beforeMs)]];
+  ranges.forEach(([from, to]) => {
+    for (let row = from; row < to; row++) addRow(row);
+  });
+  for (let row = sortedCount; row < columns.rowCount; row++) addRow(row);
+
+  const result = new Map<string, DailySummary>();
+  totals.forEach((day, dayKey) => {
+    day.waiters.forEach((sales, code) => {
+      day.summary.waiterSales[columns.waiters.ids[code]] = { name: columns.waiters.names[code], sales };
+    });
+    day.products.forEach((product, code) => {
+      day.summary.productCounts[columns.menuItems.ids[code]] = {
+        name: columns.menuItems.names[code],
+        ...product,
+      };
+    });
+    result.set(dayKey, day.summary);
+  });
+  return result;
+}
@@ -1,49 +1,83 @@
 import type { User } from './types.js';
-import { readUsers, writeUsers } from './dataManager.js';
+import { readUsers, readUsersByBranch, writeUsersByBranch } from './dataManager.js';
 
 const DEFAULT_BRANCH = "default";
 
-function readUsersForBranch(branchId: string) {
-  const all = readUsers();
-  return all.filter(u => (u.branchId || DEFAULT_BRANCH) === branchId);
+// Giriş aramaları için bellek içi indeksler. Kullanıcılar yalnızca createUser/deleteUser
+// ile değiştiği için indeks orada yeniden kurulur ve tek atamayla değiştirilir;
+// login isteği ne dosya okur ne de kullanıcı listesini tarar.
+interface UserIndex {
+  byPin: Map<string, User>;
+  byBranchRole: Map<string, User>;
+  byBranchUsername: Map<string, User>;
+}
+
+let userIndex: UserIndex | null = null;
+
+function userBranch(user: User): string {
+  return user.branchId || DEFAULT_BRANCH;
+}
+
+function branchKey(branchId: string, value: string): string {
+  return `${branchId}\u0000${value}`;
+}
+
+// Aynı anahtara sahip birden fazla kullanıcı varsa ilki kazanır (eski find() davranışı);
+// PIN'i olmayan kullanıcılar PIN indeksine girmez
+function buildUserIndex(users: User[]): UserIndex {
+  const index: UserIndex = {
+    byPin: new Map(),
+    byBranchRole: new Map(),
+    byBranchUsername: new Map(),
+  };
+  users.forEach(user => {
+    const branchId = userBranch(user);
+    if (user.pin != null && !index.byPin.has(user.pin)) index.byPin.set(user.pin, user);
+    const roleKey = branchKey(branchId, user.role);
+    if (!index.byBranchRole.has(roleKey)) index.byBranchRole.set(roleKey, user);
+    const usernameKey = branchKey(branchId, user.username);
+    if (!index.byBranchUsername.has(usernameKey)) index.byBranchUsername.set(usernameKey, user);
+  });
+  return index;
+}
+
+function getUserIndex(): UserIndex {
+  if (!userIndex) {
+    userIndex = buildUserIndex(readUsers());
+  }
+  return userIndex;
 }
 
 function writeUsersForBranch(branchId: string, users: User[]) {
-  const all = readUsers();
-  const filtered = all.filter(u => (u.branchId || DEFAULT_BRANCH) !== branchId);
-  const merged = [...filtered, ...users];
-  writeUsers(merged);
+  writeUsersByBranch(branchId, users);
+  userIndex = buildUserIndex(readUsers());
 }
 
 // PIN'in tüm sistemde benzersiz olup olmadığını kontrol et
 export function isPinUnique(pin: string): boolean {
-  const all = readUsers();
-  return !all.some(u => u.pin === pin);
+  return !getUserIndex().byPin.has(pin);
 }
 
 // PIN ve branchId ile kullanıcı bul
 export function getUserByPin(pin: string, branchId: string): User | null {
-  const all = readUsers();
-  const user = all.find(u => u.pin === pin);
+  const user = getUserIndex().byPin.get(pin);
   // PIN doğru olsa bile branchId eşleşmiyorsa null döndür
-  if (user && (user.branchId || DEFAULT_BRANCH) === branchId) {
+  if (user && userBranch(user) === branchId) {
     return user;
   }
   return null;
 }
 
 export function getUserByUsername(username: string, branchId: string): User | null {
-  const users = readUsersForBranch(branchId);
-  return users.find(u => u.username === username) || null;
+  return getUserIndex().byBranchUsername.get(branchKey(branchId, username)) || null;
 }
 
 export function getUserByRole(role: string, branchId: string): User | null {
-  const users = readUsersForBranch(branchId);
-  return users.find(u => u.role === role) || null;
+  return getUserIndex().byBranchRole.get(branchKey(branchId, role)) || null;
 }
 
 export function getAllUsers(branchId: string): User[] {
-  return readUsersForBranch(branchId);
+  return readUsersByBranch(branchId);
 }
 
 export function createUser(username: string, pin: string, role: 'waiter' | 'cashier', branchId: string): User {
@@ -51,8 +85,8 @@ export function createUser(username: string, pin: string, role: 'waiter' | 'cash
   if (!isPinUnique(pin)) {
     throw new Error('PIN already in use');
   }
-  
-  const users = readUsersForBranch(branchId);
+
+  const users = readUsersByBranch(branchId);
   const newUser: User = {
     id: `${role}_${Date.now()}`,
     username,
@@ -70,7 +104,7 @@ export function createWaiter(username: string, pin: string, branchId: string): U
 }
 
 export function deleteUser(userId: string, role: 'waiter' | 'cashier', branchId: string): boolean {
-  const users = readUsersForBranch(branchId);
+  const users = readUsersByBranch(branchId);
   const index = users.findIndex(u => u.id === userId && u.role === role);
   if (index === -1) return false;
   users.splice(index, 1);
@@ -0,0 +1,77 @@
+// İş günü: createdAt'in BUSINESS_TZ saat dilimindeki tarihi (YYYY-MM-DD). Günlük özetler,
+// anlık ciro, arşiv segmentleri, clear-range ve rapor aralıkları gün sınırını buradan
+// alır; sınır modüller arasında farklılaşmamalı. Varsayılan UTC (önceki davranış).
+// Yaz saati geçişlerinde gün 23 veya 25 saat sürer; gün uzunluğu sabit varsayılmaz.
+export const BUSINESS_TZ = process.env.BUSINESS_TZ || 'UTC';
+
+// Yalnızca günlük dilimleme gibi takvimden bağımsız işler için
+export const DAY_MS = 24 * 60 * 60 * 1000;
+
+const DAY_PATTERN = /^\d{4}-\d{2}-\d{2}$/;
+const isUtc = BUSINESS_TZ === 'UTC';
+const partsFormat = new Intl.DateTimeFormat('en-US', {
+  timeZone: BUSINESS_TZ,
+  hourCycle: 'h23',
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit',
+  hour: '2-digit',
+  minute: '2-digit',
+  second: '2-digit',
+});
+
+// Zaman diliminin time anındaki UTC farkı (ms)
+function offsetAt(time: number): number {
+  const parts: Record<string, number> = {};
+  partsFormat.formatToParts(time).forEach(({ type, value }) => {
+    if (type !== 'literal') parts[type] = Number(value);
+  });
+  const local = Date.UTC(parts.year, parts.month - 1, parts.day, parts.hour, parts.minute, parts.second);
+  return local - Math.floor(time / 1000) * 1000;
+}
+
+// Satırlar çoğunlukla createdAt sırasıyla gelir; son bulunan günün sınırları saklanır
+let lastDay = { start: 0, end: 0, day: '' };
+
+export function dayOf(time: number): string {
+  if (time >= lastDay.start && time < lastDay.end) return lastDay.day;
+  const day = isUtc
+    ? new Date(time).toISOString().split('T')[0]
+    : new Date(time + offsetAt(time)).toISOString().split('T')[0];
+  lastDay = { start: dayStart(day), end: dayStart(addDays(day, 1)), day };
+  return day;
+}
+
+export function currentBusinessDay(): string {
+  return dayOf(Date.now());
+}
+
+// Günün başlangıcı (epoch-ms, iş saat dilimindeki gece yarısı). Geçersiz gün için
+// (ör. boş keepDay: hiçbir gün korunmaz) NaN; hiçbir zamanla eşleşmez.
+export function dayStart(day: string): number {
+  const midnight = Date.parse(`${day}T00:00:00.000Z`);
+  if (isUtc || isNaN(midnight)) return midnight;
+  // Fark gece yarısının kendisine göre; yaz saati geçişi için bir kez düzeltilir
+  const guess = midnight - offsetAt(midnight);
+  return midnight - offsetAt(guess);
+}
+
+// Günün son milisaniyesi
+export function dayEnd(day: string): number {
+  return dayStart(addDays(day, 1)) - 1;
+}
+
+// Geçersiz gün için boş metin
+export function addDays(day: string, days: number): string {
+  const time = Date.parse(`${day}T00:00:00.000Z`);
+  return isNaN(time) ? '' : new Date(time + days * DAY_MS).toISOString().split('T')[0];
+}
+
+// Pazar = 0 (Date.getDay ile aynı)
+export function weekday(day: string): number {
+  return new Date(`${day}T00:00:00.000Z`).getUTCDay();
+}
+
+export function isDay(text: string): boolean {
+  return DAY_PATTERN.test(text) && !isNaN(Date.parse(`${text}T00:00:00.000Z`));
+}
@@ -0,0 +1,138 @@
+import type { RevenueSummary } from './reports.js';
+
+// Sütun bazlı analiz deposunun tarama çekirdeği. Hem ana iş parçacığında (analytics.ts)
+// hem de rapor işçilerinde (reportWorker.ts) çalışır; bu yüzden yalnızca tipli diziler
+// ve düz sözlük dizileriyle çalışır, modül durumu tutmaz.
+
+export const METHOD_CASH = 0;
+export const METHOD_CARD = 1;
+
+export interface DailySummary extends RevenueSummary {
+  cancelledAmount: number;
+  productCounts: Record<string, { name: string; quantity: number; revenue: number }>;
+}
+
+// Bir şubenin sütunlarının belirli bir andaki görünümü. Diziler SharedArrayBuffer
+// üzerinde olduğundan işçiye kopyalanmadan gönderilir; ana iş parçacığı yalnızca
+// rowCount'un ötesine yazar (kalem iptal bayrağı hariç).
+export interface ColumnSnapshot {
+  rowCount: number;
+  // [0, sortedCount) satırları createdAt'e göre sıralı; kalanlar ekleme sırasında
+  sortedCount: number;
+  createdAt: Float64Array;
+  amount: Float64Array;
+  method: Uint8Array;
+  waiter: Int32Array;
+  itemStart: Uint32Array;
+  itemMenu: Uint32Array;
+  itemQuantity: Float64Array;
+  itemPrice: Float64Array;
+  itemCancelled: Uint8Array;
+  waiterIds: string[];
+  waiterNames: string[];
+  menuIds: string[];
+  menuNames: string[];
+}
+
+export function emptySummary(): DailySummary {
+  return {
+    totalRevenue: 0,
+    waiterSales: {},
+    paymentMethods: { cash: 0, card: 0 },
+    orderCount: 0,
+    cancelledAmount: 0,
+    productCounts: {},
+  };
+}
+
+// createdAt[from, to) sıralı bölgesinde değeri time'dan küçük olmayan ilk satır
+export function lowerBound(createdAt: Float64Array, from: number, to: number, time: number): number {
+  let low = from;
+  let high = to;
+  while (low < high) {
+    const middle = (low + high) >>> 1;
+    if (createdAt[middle] < time) low = middle + 1;
+    else high = middle;
+  }
+  return low;
+}
+
+// createdAt'i [startMs, endMs] aralığındaki siparişlerin özeti. Sıralı bölgede aralığın
+// sınırları ikili aramayla bulunur; yalnızca henüz sıralanmamış son satırlar taranır.
+// withProducts verilmezse ürün kırılımı çıkarılmaz; kalemlerden yalnızca iptal tutarı okunur.
+export function summarizeColumns(
+  columns: ColumnSnapshot,
+  startMs: number,
+  endMs: number,
+  withProducts: boolean
+): DailySummary {
+  const summary = emptySummary();
+  const waiterTotals = new Float64Array(columns.waiterIds.length);
+  const waiterSeen = new Uint8Array(columns.waiterIds.length);
+  const productQuantity = withProducts ? new Float64Array(columns.menuIds.length) : null;
+  const productRevenue = withProducts ? new Float64Array(columns.menuIds.length) : null;
+  const productSeen = withProducts ? new Uint8Array(columns.menuIds.length) : null;
+
+  const { createdAt, amount, method, waiter, itemStart, itemMenu, itemQuantity, itemPrice, itemCancelled } =
+    columns;
+
+  const addRow = (row: number) => {
+    const value = amount[row];
+    summary.orderCount++;
+    summary.totalRevenue += value;
+    if (method[row] === METHOD_CASH) summary.paymentMethods.cash += value;
+    else summary.paymentMethods.card += value;
+
+    const waiterCode = waiter[row];
+    if (waiterCode >= 0) {
+      waiterTotals[waiterCode] += value;
+      waiterSeen[waiterCode] = 1;
+    }
+
+    // İptal tutarı her zaman toplanır (rapor dilimleri ürünsüz taranır)
+    for (let itemRow = itemStart[row]; itemRow < itemStart[row + 1]; itemRow++) {
+      if (itemCancelled[itemRow]) {
+        summary.cancelledAmount += itemPrice[itemRow] * itemQuantity[itemRow];
+        continue;
+      }
+      if (productQuantity && productRevenue && productSeen) {
+        const menuCode = itemMenu[itemRow];
+        productQuantity[menuCode] += itemQuantity[itemRow];
+        productRevenue[menuCode] += itemPrice[itemRow] * itemQuantity[itemRow];
+        productSeen[menuCode] = 1;
+      }
+    }
+  };
+
+  const first = lowerBound(createdAt, 0, columns.sortedCount, startMs);
+  // createdAt tam sayı milisaniye: endMs'yi de kapsayan üst sınır
+  const last = lowerBound(createdAt, first, columns.sortedCount, endMs + 1);
+  for (let row = first; row < last; row++) addRow(row);
+  for (let row = columns.sortedCount; row < columns.rowCount; row++) {
+    const time = createdAt[row];
+    if (time >= startMs && time <= endMs) addRow(row);
+  }
+
+  // Sözlük kodları yalnızca sonuç nesnesi oluşturulurken id/isim'e çevrilir
+  for (let code = 0; code < waiterSeen.length; code++) {
+    if (waiterSeen[code]) {
+      summary.waiterSales[columns.waiterIds[code]] = {
+        name: columns.waiterNames[code],
+        sales: waiterTotals[code],
+      };
+    }
+  }
+  if (productQuantity && productRevenue && productSeen) {
+    for (let code = 0; code < productSeen.length; code++) {
+      if (productSeen[code]) {
+        summary.productCounts[columns.menuIds[code]] = {
+          name: columns.menuNames[code],
+          quantity: productQuantity[code],
+          revenue: productRevenue[code],
+        };
+      }
+    }
+  }
+
+  return summary;
+}
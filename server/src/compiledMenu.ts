@@ -0,0 +1,78 @@
+import type { MenuItem } from './types.js';
+import { readMenuByBranch } from './dataManager.js';
+
+// Şube menüsünün sipariş oluşturmaya hazır hali: her menü ürünü için, siparişe
+// eklenecek kalemlerin şablonları (kampanyalar bileşenlerine açılmış, mutfak/bar
+// yönlendirmesi, isim ve fiyat hesaplanmış). Yalnızca admin menüyü değiştirdiğinde
+// yeniden derlenir; POST /api/orders satır başına tek Map araması yapar.
+export interface OrderItemTemplate {
+  menuItemId: string;
+  menuItemName: string;
+  price: number;
+  category: 'kitchen' | 'bar';
+}
+
+export type CompiledMenu = Map<string, OrderItemTemplate[]>;
+
+const compiledMenus = new Map<string, CompiledMenu>();
+
+// Normal ürün veya tatlı: bar ürünleri bara, diğer her şey (tatlılar dahil) mutfağa
+function routeCategory(menuItem: MenuItem): 'kitchen' | 'bar' {
+  return menuItem.category === 'bar' ? 'bar' : 'kitchen';
+}
+
+export function compileMenu(menu: MenuItem[]): CompiledMenu {
+  // Aynı id birden fazla kez geçerse ilki kullanılır (eski menu.find davranışı)
+  const byId = new Map<string, MenuItem>();
+  menu.forEach((menuItem) => {
+    if (!byId.has(menuItem.id)) byId.set(menuItem.id, menuItem);
+  });
+  const compiled: CompiledMenu = new Map();
+
+  byId.forEach((menuItem) => {
+    const campaignItems = (menuItem as any).items;
+
+    // Kampanya menüsü ise içindeki ürünler ayrı kalemler olur
+    if (menuItem.category === 'campaign' && campaignItems) {
+      const templates: OrderItemTemplate[] = [];
+      campaignItems.forEach((campaignItem: any) => {
+        const fullMenuItem = byId.get(campaignItem.id);
+        if (fullMenuItem) {
+          templates.push({
+            menuItemId: fullMenuItem.id,
+            menuItemName: `${menuItem.name} - ${fullMenuItem.name}`,
+            price: fullMenuItem.price,
+            category: campaignItem.category as 'kitchen' | 'bar',
+          });
+        }
+      });
+      compiled.set(menuItem.id, templates);
+      return;
+    }
+
+    compiled.set(menuItem.id, [
+      {
+        menuItemId: menuItem.id,
+        menuItemName: menuItem.name,
+        price: menuItem.price,
+        category: routeCategory(menuItem),
+      },
+    ]);
+  });
+
+  return compiled;
+}
+
+export function getCompiledMenu(branchId: string): CompiledMenu {
+  let compiled = compiledMenus.get(branchId);
+  if (!compiled) {
+    compiled = compileMenu(readMenuByBranch(branchId));
+    compiledMenus.set(branchId, compiled);
+  }
+  return compiled;
+}
+
+// Admin menü uçları (POST/PUT/DELETE) menüyü yazdıktan sonra çağırır
+export function recompileMenu(branchId: string, menu: MenuItem[]): void {
+  compiledMenus.set(branchId, compileMenu(menu));
+}
@@ -0,0 +1,83 @@
+import type { DailySummary } from './columnScan.js';
+import { poolError } from './workerPool.js';
+
+// Şubeler arası (konsolide) rapor: her şubenin özeti aynı anda hesaplanır ve genel
+// toplamla birlikte döner. Aynı anda en fazla CONSOLIDATED_REPORT_CONCURRENCY şube
+// işlenir; 50+ şubede rapor işçi kuyruğu (REPORT_QUEUE_LIMIT) tek istekle dolmasın.
+const CONSOLIDATED_REPORT_CONCURRENCY = Number(process.env.CONSOLIDATED_REPORT_CONCURRENCY) || 8;
+
+export interface BranchReport {
+  branchId: string;
+  branchName: string;
+  totalRevenue: number;
+  orderCount: number;
+  cancelledAmount: number;
+  paymentMethods: { cash: number; card: number };
+  waiterSales: DailySummary['waiterSales'];
+}
+
+// Garson id'leri şubeye özgü olduğundan genel toplamda garson kırılımı yoktur
+export type ConsolidatedTotal = Omit<BranchReport, 'branchId' | 'branchName' | 'waiterSales'> & {
+  branchCount: number;
+};
+
+export interface ConsolidatedReport {
+  branches: BranchReport[];
+  total: ConsolidatedTotal;
+}
+
+export async function summarizeBranches(
+  branches: Array<{ id: string; name: string }>,
+  summarize: (branchId: string) => Promise<DailySummary>,
+  signal?: AbortSignal
+): Promise<ConsolidatedReport> {
+  const reports: BranchReport[] = new Array(branches.length);
+  let next = 0;
+
+  // Sabit sayıda döngü sıradaki şubeyi alır; biri hata verirse Promise.all reddedilir
+  // ve diğerleri yeni şube almadan durur
+  let failed = false;
+  const run = async () => {
+    while (next < branches.length && !failed && !signal?.aborted) {
+      const index = next++;
+      const branch = branches[index];
+      try {
+        const summary = await summarize(branch.id);
+        reports[index] = {
+          branchId: branch.id,
+          branchName: branch.name,
+          totalRevenue: summary.totalRevenue,
+          orderCount: summary.orderCount,
+          cancelledAmount: summary.cancelledAmount,
+          paymentMethods: summary.paymentMethods,
+          waiterSales: summary.waiterSales,
+        };
+      } catch (error) {
+        failed = true;
+        throw error;
+      }
+    }
+  };
+  await Promise.all(
+    Array.from({ length: Math.min(CONSOLIDATED_REPORT_CONCURRENCY, branches.length) }, run)
+  );
+  if (signal?.aborted) {
+    throw poolError('ABORTED', 'Rapor iptal edildi');
+  }
+
+  const total: ConsolidatedTotal = {
+    branchCount: reports.length,
+    totalRevenue: 0,
+    orderCount: 0,
+    cancelledAmount: 0,
+    paymentMethods: { cash: 0, card: 0 },
+  };
+  reports.forEach((report) => {
+    total.totalRevenue += report.totalRevenue;
+    total.orderCount += report.orderCount;
+    total.cancelledAmount += report.cancelledAmount;
+    total.paymentMethods.cash += report.paymentMethods.cash;
+    total.paymentMethods.card += report.paymentMethods.card;
+  });
+  return { branches: reports, total };
+}
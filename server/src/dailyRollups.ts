@@ -0,0 +1,196 @@
+import { onPaidDayChanged, summarizePaidOrdersByDay, type DailySummary } from './analytics.js';
+import { addDays, BUSINESS_TZ, currentBusinessDay, dayEnd, dayOf, dayStart } from './businessDay.js';
+import { emptySummary } from './columnScan.js';
+import { readBranches, readDailyRollups, saveDailyRollups } from './dataManager.js';
+import { getLiveRevenue } from './liveRevenue.js';
+import { summarizePaidOrdersInPool } from './reportPool.js';
+import type { DailyRollup } from './storageBackend.js';
+
+// Şube ve iş günü (businessDay.ts) başına kalıcı rapor özetleri. Kapanan günler bir kez
+// hesaplanıp depoya yazılır; haftalık/aylık/özel aralık raporları ham siparişleri
+// taramak yerine en fazla aralıktaki gün sayısı kadar kaydı ve bugünün anlık
+// toplamlarını birleştirir. Kapanmış bir gün sonradan değişirse (geç ödeme, ödenmiş
+// kalem iptali, clear-range) o gün yeniden hesaplanır.
+
+const CLOSE_CHECK_INTERVAL_MS = 60 * 1000;
+// Uç noktalar bitişi `new Date()` ile verir; bu kadar gerideki bitiş "şu an" sayılır
+const NOW_TOLERANCE_MS = 1000;
+
+const rollups = new Map<string, Map<string, DailyRollup>>();
+// Şubenin en son hangi iş gününde kapanış (eksik günlerin doldurulması) yaptığı
+const closedOn = new Map<string, string>();
+// Yeniden hesaplanacak günler. Bellekteki küme yeniden başlatmada kaybolur; bu yüzden
+// değişen günün kaydı depoda da stale işaretlenir ve yüklenirken kümeye geri eklenir.
+// İşaret sipariş değişikliğiyle birlikte yazılır (JSON deposunda aynı commit penceresinde).
+const dirtyDays = new Map<string, Set<string>>();
+
+function markDirty(branchId: string, day: string): void {
+  let days = dirtyDays.get(branchId);
+  if (!days) {
+    days = new Set();
+    dirtyDays.set(branchId, days);
+  }
+  days.add(day);
+}
+
+onPaidDayChanged((branchId, day) => {
+  if (day >= currentBusinessDay()) return;
+  markDirty(branchId, day);
+  const stored = getRollups(branchId);
+  const rollup = stored.get(day);
+  if (rollup && !rollup.stale) {
+    const stale = { ...rollup, stale: true };
+    stored.set(day, stale);
+    saveDailyRollups(branchId, [stale], []);
+  }
+});
+
+function getRollups(branchId: string): Map<string, DailyRollup> {
+  let branchRollups = rollups.get(branchId);
+  if (!branchRollups) {
+    branchRollups = new Map(readDailyRollups(branchId).map((rollup) => [rollup.day, rollup]));
+    rollups.set(branchId, branchRollups);
+    // Başka bir BUSINESS_TZ ile hesaplanmış günler de yeniden hesaplanır (eski kayıtlar UTC)
+    branchRollups.forEach((rollup) => {
+      if (rollup.stale || (rollup.timeZone ?? 'UTC') !== BUSINESS_TZ) markDirty(branchId, rollup.day);
+    });
+  }
+  return branchRollups;
+}
+
+// Gün kapanışı ve geriye dönük doldurma: bugünden önceki tüm günler tek geçişte
+// özetlenir, depoda olmayanlar yazılır, artık siparişi kalmamış günler silinir.
+function closeDays(branchId: string, today: string): void {
+  const stored = getRollups(branchId);
+  const summaries = summarizePaidOrdersByDay(branchId, null, today);
+  const added: DailyRollup[] = [];
+  summaries.forEach((summary, day) => {
+    if (stored.has(day)) return;
+    const rollup = { day, ...summary, timeZone: BUSINESS_TZ };
+    stored.set(day, rollup);
+    added.push(rollup);
+  });
+  const removed = [...stored.keys()].filter((day) => day < today && !summaries.has(day));
+  removed.forEach((day) => stored.delete(day));
+  if (added.length > 0 || removed.length > 0) {
+    saveDailyRollups(branchId, added, removed);
+  }
+  closedOn.set(branchId, today);
+}
+
+function refreshDirtyDays(branchId: string): void {
+  const days = dirtyDays.get(branchId);
+  if (!days || days.size === 0) return;
+  dirtyDays.delete(branchId);
+  const stored = getRollups(branchId);
+  const summaries = summarizePaidOrdersByDay(branchId, days, currentBusinessDay());
+  const changed: DailyRollup[] = [];
+  const removed: string[] = [];
+  days.forEach((day) => {
+    const summary = summaries.get(day);
+    if (summary) {
+      const rollup = { day, ...summary, timeZone: BUSINESS_TZ };
+      stored.set(day, rollup);
+      changed.push(rollup);
+    } else if (stored.delete(day)) {
+      removed.push(day);
+    }
+  });
+  saveDailyRollups(branchId, changed, removed);
+}
+
+function ensureRollups(branchId: string): Map<string, DailyRollup> {
+  const today = currentBusinessDay();
+  if (closedOn.get(branchId) !== today) {
+    closeDays(branchId, today);
+  }
+  refreshDirtyDays(branchId);
+  return getRollups(branchId);
+}
+
+type SummaryPart = Omit<DailySummary, 'productCounts'> & { productCounts?: DailySummary['productCounts'] };
+
+function addSummary(target: DailySummary, source: SummaryPart, withProducts: boolean): void {
+  target.totalRevenue += source.totalRevenue;
+  target.orderCount += source.orderCount;
+  target.paymentMethods.cash += source.paymentMethods.cash;
+  target.paymentMethods.card += source.paymentMethods.card;
+  target.cancelledAmount += source.cancelledAmount;
+  Object.entries(source.waiterSales).forEach(([waiterId, { name, sales }]) => {
+    if (!target.waiterSales[waiterId]) {
+      target.waiterSales[waiterId] = { name, sales: 0 };
+    }
+    target.waiterSales[waiterId].sales += sales;
+  });
+  if (!withProducts) return;
+  Object.entries(source.productCounts ?? {}).forEach(([menuItemId, { name, quantity, revenue }]) => {
+    if (!target.productCounts[menuItemId]) {
+      target.productCounts[menuItemId] = { name, quantity: 0, revenue: 0 };
+    }
+    target.productCounts[menuItemId].quantity += quantity;
+    target.productCounts[menuItemId].revenue += revenue;
+  });
+}
+
+// createdAt'i [start, end] aralığındaki ödenmiş siparişlerin özeti. Tamamı aralıkta
+// kalan geçmiş günler rollup'tan, bugün anlık toplamlardan gelir; yalnızca aralığın
+// gün ortasında başlayıp biten uçları sütunlardan (rapor işçilerinde) taranır.
+// withProducts verilmezse bugünün ürün kırılımı eklenmez (anlık toplamlarda ürün yoktur).
+export async function summarizeRange(
+  branchId: string,
+  start: Date,
+  end: Date,
+  withProducts = false,
+  signal?: AbortSignal
+): Promise<DailySummary> {
+  const stored = ensureRollups(branchId);
+  const summary = emptySummary();
+  const now = Date.now();
+  const today = currentBusinessDay();
+  const startMs = start.getTime();
+  const endMs = Math.min(end.getTime(), now);
+  const scans: Promise<DailySummary>[] = [];
+
+  for (let day = dayOf(startMs); dayStart(day) <= endMs; day = addDays(day, 1)) {
+    const firstMs = dayStart(day);
+    const lastMs = dayEnd(day);
+    const fromDayStart = startMs <= firstMs;
+
+    if (day < today && fromDayStart && endMs >= lastMs) {
+      const rollup = stored.get(day);
+      if (rollup) addSummary(summary, rollup, withProducts);
+    } else if (day === today && fromDayStart && endMs >= now - NOW_TOLERANCE_MS && !withProducts) {
+      addSummary(summary, getLiveRevenue(branchId), false);
+    } else {
+      const sliceStart = new Date(Math.max(startMs, firstMs));
+      const sliceEnd = new Date(Math.min(endMs, lastMs));
+      scans.push(summarizePaidOrdersInPool(branchId, sliceStart, sliceEnd, withProducts, signal));
+    }
+  }
+
+  (await Promise.all(scans)).forEach((scan) => addSummary(summary, scan, withProducts));
+  return summary;
+}
+
+// Sunucu açılışında eksik günler doldurulur; sonra gün dönümü ve değişen günler
+// periyodik olarak işlenir
+export function startDailyRollups(): void {
+  const run = () => {
+    const branchIds = new Set([...readBranches().map((branch) => branch.id), ...rollups.keys()]);
+    branchIds.forEach((branchId) => {
+      try {
+        ensureRollups(branchId);
+      } catch (error) {
+        console.error(`Günlük rapor özetleri güncellenemedi (şube ${branchId}):`, error);
+      }
+    });
+  };
+  run();
+  const timer = setInterval(run, CLOSE_CHECK_INTERVAL_MS);
+  timer.unref();
+}
+
+// Kapanıştan önce değişen günlerin özetlerini yaz
+export function flushDailyRollups(): void {
+  [...dirtyDays.keys()].forEach(refreshDirtyDays);
+}
@@ -1,111 +1,202 @@
-import { readFileSync, writeFileSync } from 'fs';
+import { readFileSync } from 'fs';
 import { join } from 'path';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
-import type { User, MenuItem, Order } from './types.js';
+import type { User, MenuItem, Order, OrderStatus, Payment } from './types.js';
+import type { ClearRangeResult, CompletedMove, DailyRollup, StorageBackend } from './storageBackend.js';
+import type { ItemRef } from './orderIndex.js';
+import { createJsonBackend } from './jsonBackend.js';
+import { createSqliteBackend } from './sqliteBackend.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const dataDir = join(__dirname, '../data');
 
-export function readUsers(): User[] {
-  try {
-    const data = readFileSync(join(dataDir, 'users.json'), 'utf-8');
-    return JSON.parse(data);
-  } catch (error) {
-    return [];
+// Depolama arka ucu: 'json' (varsayılan, data/<branchId>/*.json) veya 'sqlite'
+const STORAGE_BACKEND = process.env.STORAGE_BACKEND || 'json';
+const SQLITE_PATH = process.env.SQLITE_PATH || join(dataDir, 'restaurant.db');
+
+function createBackend(): StorageBackend {
+  if (STORAGE_BACKEND === 'sqlite') {
+    return createSqliteBackend(SQLITE_PATH);
+  }
+  if (STORAGE_BACKEND !== 'json') {
+    throw new Error(`Bilinmeyen STORAGE_BACKEND: ${STORAGE_BACKEND}`);
+  }
+  return createJsonBackend(dataDir);
+}
+
+const backend = createBackend();
+
+// Şube başına veri sürümü: her sipariş değişikliği artırır. Rapor önbelleği ve
+// ETag'ler bu sayıyla anahtarlanır; sayı değişmediyse rapor sonucu da değişmemiştir.
+// Tüm şubeleri etkileyen yazmalar (branchId'siz) ortak sayacı artırır.
+const dataVersions = new Map<string, number>();
+let allBranchesVersion = 0;
+
+function bumpDataVersion(branchId?: string): void {
+  if (branchId === undefined) {
+    allBranchesVersion++;
+    return;
   }
+  dataVersions.set(branchId, (dataVersions.get(branchId) ?? 0) + 1);
+}
+
+export function getDataVersion(branchId: string): number {
+  return allBranchesVersion + (dataVersions.get(branchId) ?? 0);
+}
+
+// Sunucu başlarken çağrılır; JSON arka ucunda sonraki okumalar bellekten yapılır
+export function initDataStore(): void {
+  backend.init();
+  console.log(`💾 Storage backend: ${backend.name}`);
+}
+
+// Periyodik bakım (JSON: günlük sıkıştırma, SQLite: optimize)
+export function startDataStoreMaintenance(): void {
+  backend.startMaintenance();
+}
+
+// Bekleyen yazmaları tamamla (kapanış ve testler için)
+export function flushDataStore(): Promise<void> {
+  return backend.flush();
+}
+
+export function readUsers(): User[] {
+  return backend.read('users');
 }
 
 export function readUsersByBranch(branchId: string): User[] {
-  const users = readUsers();
-  return users.filter(user => user.branchId === branchId);
+  return backend.read('users', branchId);
 }
 
 export function writeUsersByBranch(branchId: string, updatedUsers: User[]): void {
-  const allUsers = readUsers();
-  const filtered = allUsers.filter(user => user.branchId !== branchId);
-  const merged = [...filtered, ...updatedUsers];
-  writeUsers(merged);
+  backend.write('users', updatedUsers, branchId);
 }
 
 export function readMenu(): MenuItem[] {
-  try {
-    const data = readFileSync(join(dataDir, 'menu.json'), 'utf-8');
-    return JSON.parse(data);
-  } catch (error) {
-    return [];
-  }
+  return backend.read('menu');
 }
 
 export function readMenuByBranch(branchId: string): MenuItem[] {
-  const menu = readMenu();
-  return menu.filter(item => item.branchId === branchId);
+  return backend.read('menu', branchId);
 }
 
 export function writeMenuByBranch(branchId: string, updatedMenu: MenuItem[]): void {
-  const allMenu = readMenu();
-  const filtered = allMenu.filter(item => item.branchId !== branchId);
-  const merged = [...filtered, ...updatedMenu];
-  writeMenu(merged);
+  backend.write('menu', updatedMenu, branchId);
 }
 
 export function readOrders(): Order[] {
-  try {
-    const data = readFileSync(join(dataDir, 'orders.json'), 'utf-8');
-    return JSON.parse(data);
-  } catch (error) {
-    return [];
-  }
+  return backend.read('orders');
 }
 
 export function readOrdersByBranch(branchId: string): Order[] {
-  const orders = readOrders();
-  return orders.filter(order => order.branchId === branchId);
+  return backend.read('orders', branchId);
 }
 
 export function writeOrdersByBranch(branchId: string, updatedOrders: Order[]): void {
-  const allOrders = readOrders();
-  const filtered = allOrders.filter(order => order.branchId !== branchId);
-  const merged = [...filtered, ...updatedOrders];
-  writeOrders(merged);
+  backend.write('orders', updatedOrders, branchId);
+  bumpDataVersion(branchId);
+}
+
+// Tekil sipariş değişiklikleri: tüm dosyayı yeniden yazmak yerine günlüğe eklenir
+export function appendOrder(branchId: string, order: Order): void {
+  backend.appendOrder(branchId, order);
+  bumpDataVersion(branchId);
+}
+
+export function updateOrderItemStatus(
+  branchId: string,
+  orderId: string,
+  itemId: string,
+  status: OrderStatus,
+  cancelledReason?: string
+): void {
+  backend.updateOrderItemStatus(branchId, orderId, itemId, status, cancelledReason);
+  bumpDataVersion(branchId);
+}
+
+export function moveOrderTable(branchId: string, orderId: string, tableNumber: number): void {
+  backend.moveOrderTable(branchId, orderId, tableNumber);
+  bumpDataVersion(branchId);
+}
+
+export function markOrdersPaid(branchId: string, orderIds: string[], payment: Payment): void {
+  backend.markOrdersPaid(branchId, orderIds, payment);
+  bumpDataVersion(branchId);
+}
+
+export function moveItemsToCompleted(branchId: string, moves: CompletedMove[], completedAt: string): void {
+  backend.moveItemsToCompleted(branchId, moves, completedAt);
+  bumpDataVersion(branchId);
+}
+
+// Aktif sipariş (orderId indeksinden)
+export function findOrder(branchId: string, orderId: string): Order | undefined {
+  return backend.findOrder(branchId, orderId);
+}
+
+// Aktif siparişin kalemi (itemId indeksinden); kalem başka siparişe aitse undefined
+export function findOrderItem(branchId: string, orderId: string, itemId: string): ItemRef | undefined {
+  return backend.findOrderItem(branchId, orderId, itemId);
+}
+
+// Masadaki ödenmemiş siparişler (kasa ekranı ve ödeme)
+export function findUnpaidOrdersByTable(branchId: string, tableNumber: number): Order[] {
+  return backend.findUnpaidOrdersByTable(branchId, tableNumber);
+}
+
+// createdAt'i [start, end] aralığında olan ödenmiş siparişler (aktif + geçmiş), akış
+// halinde: uzun aralıklı raporlar siparişleri tek tek tüketir
+export function streamPaidOrdersBetween(branchId: string, start: Date, end: Date): Iterable<Order> {
+  return backend.streamPaidOrdersBetween(branchId, start, end);
+}
+
+// Aralıktaki aktif ve geçmiş siparişleri sil (keepDay günü hariç). JSON arka ucunda
+// tamamen aralıkta kalan arşiv segmentleri dosya açılmadan silinir.
+export function clearOrdersBetween(branchId: string, start: Date, end: Date, keepDay: string): ClearRangeResult {
+  const result = backend.clearRange(branchId, start, end, keepDay);
+  bumpDataVersion(branchId);
+  return result;
+}
+
+export function readDailyRollups(branchId: string): DailyRollup[] {
+  return backend.readDailyRollups(branchId);
+}
+
+export function saveDailyRollups(branchId: string, rollups: DailyRollup[], removedDays: string[]): void {
+  backend.saveDailyRollups(branchId, rollups, removedDays);
 }
 
 export function writeOrders(orders: Order[]): void {
-  writeFileSync(join(dataDir, 'orders.json'), JSON.stringify(orders, null, 2));
+  backend.write('orders', orders);
+  bumpDataVersion();
 }
 
 export function writeUsers(users: User[]): void {
-  writeFileSync(join(dataDir, 'users.json'), JSON.stringify(users, null, 2));
+  backend.write('users', users);
 }
 
 export function readCompletedOrders(): Order[] {
-  try {
-    const data = readFileSync(join(dataDir, 'completed-orders.json'), 'utf-8');
-    return JSON.parse(data);
-  } catch (error) {
-    return [];
-  }
+  return backend.read('completedOrders');
 }
 
 export function readCompletedOrdersByBranch(branchId: string): Order[] {
-  const orders = readCompletedOrders();
-  return orders.filter(order => order.branchId === branchId);
+  return backend.read('completedOrders', branchId);
 }
 
 export function writeCompletedOrdersByBranch(branchId: string, updatedOrders: Order[]): void {
-  const allOrders = readCompletedOrders();
-  const filtered = allOrders.filter(order => order.branchId !== branchId);
-  const merged = [...filtered, ...updatedOrders];
-  writeCompletedOrders(merged);
+  backend.write('completedOrders', updatedOrders, branchId);
+  bumpDataVersion(branchId);
 }
 
 export function writeCompletedOrders(orders: Order[]): void {
-  writeFileSync(join(dataDir, 'completed-orders.json'), JSON.stringify(orders, null, 2));
+  backend.write('completedOrders', orders);
+  bumpDataVersion();
 }
 
 export function writeMenu(menu: MenuItem[]): void {
-  writeFileSync(join(dataDir, 'menu.json'), JSON.stringify(menu, null, 2));
+  backend.write('menu', menu);
 }
 
 export interface Branch {
@@ -121,4 +212,3 @@ export function readBranches(): Branch[] {
     return [];
   }
 }
-
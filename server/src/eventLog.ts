@@ -0,0 +1,77 @@
+import type { Topic } from './wsRegistry.js';
+
+// Şube olaylarının sıra numaraları ve sınırlı tekrar tamponu. Her olay şube içinde
+// artan bir seq ile damgalanır; yeniden bağlanan istemci son gördüğü seq'i gönderir ve
+// aradaki olayları alır. Tampon halka dizidir (seq % kapasite): eski olaylar üzerine
+// yazılır, bu kadar geride kalan istemci anlık görüntüyü (GET /api/orders) yeniden çeker.
+const REPLAY_EVENTS = Number(process.env.WS_REPLAY_EVENTS) || 1000;
+
+// Sunucu her başladığında değişir; başka bir çalıştırmanın seq'i tekrar için geçersizdir
+export const EVENT_EPOCH = Date.now().toString(36);
+
+// Olay verisi ya tüm konulara aynıdır ya da konu başına izdüşürülür (eventProjection.ts)
+export type EventData = object | ((topic: Topic) => object);
+
+export interface LoggedEvent {
+  seq: number;
+  // Konu başına gönderilecek mesaj; izdüşüm yoksa hepsi aynı metindir
+  messages: Map<Topic, string>;
+  // Aynı anahtarlı (sipariş) sonraki olay bunu geçersiz kılar
+  key?: string;
+}
+
+interface BranchLog {
+  seq: number;
+  ring: Array<LoggedEvent | undefined>;
+}
+
+const logs = new Map<string, BranchLog>();
+
+function getLog(branchId: string): BranchLog {
+  let log = logs.get(branchId);
+  if (!log) {
+    log = { seq: 0, ring: new Array(REPLAY_EVENTS) };
+    logs.set(branchId, log);
+  }
+  return log;
+}
+
+// Olaya seq eklenir ve konu başına bir kez serileştirilir (izdüşüm yoksa bir kez).
+// Mesajlar hemen üretilir: bellekteki sipariş sonradan değişse de tekrar aynı olayı gönderir.
+export function appendEvent(branchId: string, topics: Topic[], data: EventData, key?: string): LoggedEvent {
+  const log = getLog(branchId);
+  const seq = ++log.seq;
+  const messages = new Map<Topic, string>();
+  if (typeof data === 'function') {
+    topics.forEach((topic) => messages.set(topic, JSON.stringify({ ...data(topic), seq })));
+  } else {
+    const message = JSON.stringify({ ...data, seq });
+    topics.forEach((topic) => messages.set(topic, message));
+  }
+  const event: LoggedEvent = { seq, messages, key };
+  log.ring[seq % REPLAY_EVENTS] = event;
+  return event;
+}
+
+export function currentSeq(branchId: string): number {
+  return logs.get(branchId)?.seq ?? 0;
+}
+
+export function loggedBranches(): IterableIterator<string> {
+  return logs.keys();
+}
+
+// since'ten sonraki olaylar (sırayla); aradaki olaylar tampondan düşmüşse null
+export function eventsSince(branchId: string, since: number): LoggedEvent[] | null {
+  const log = getLog(branchId);
+  if (!Number.isInteger(since) || since < 0 || since > log.seq || log.seq - since > REPLAY_EVENTS) {
+    return null;
+  }
+  const events: LoggedEvent[] = [];
+  for (let seq = since + 1; seq <= log.seq; seq++) {
+    const event = log.ring[seq % REPLAY_EVENTS];
+    if (!event || event.seq !== seq) return null;
+    events.push(event);
+  }
+  return events;
+}
@@ -0,0 +1,64 @@
+import type { Order, OrderItem } from './types.js';
+import type { Topic } from './wsRegistry.js';
+
+// Sipariş olaylarının rol görünümleri. Her sipariş konusu tek bir role karşılık gelir;
+// olay konu başına bir kez izdüşürülür ve serileştirilir, soket başına değil.
+//   orders          tüm sipariş (garson)
+//   orders-kitchen  yalnızca mutfağın aktif kalemleri (GET /api/orders ile aynı süzme)
+//   orders-bar      yalnızca barın aktif kalemleri
+//   tables          masa toplamı için gerekenler (kasa); kalemler gönderilmez
+
+// Mutfak/bar ekranında gösterilen kalemler: kendi kategorisi, henüz hazır olmamış
+export function activeItems(order: Order, category: string): OrderItem[] {
+  return order.items.filter(
+    (item) =>
+      item.category === category &&
+      item.status !== 'SERVED' &&
+      item.status !== 'CANCELLED' &&
+      item.status !== 'READY'
+  );
+}
+
+// Mutfak/bar ekranının kullandığı alanlar; ödeme ve tutarlar gönderilmez
+function stationOrder(order: Order, category: string): object {
+  return {
+    id: order.id,
+    waiterName: order.waiterName,
+    tableNumber: order.tableNumber,
+    createdAt: order.createdAt,
+    items: activeItems(order, category),
+  };
+}
+
+// Kalemi boş kalan sipariş istemcide listeden çıkar
+export function projectOrder(order: Order, topic: Topic): object {
+  switch (topic) {
+    case 'orders-kitchen':
+      return stationOrder(order, 'kitchen');
+    case 'orders-bar':
+      return stationOrder(order, 'bar');
+    case 'tables':
+      return { id: order.id, tableNumber: order.tableNumber, totalAmount: order.totalAmount, isPaid: order.isPaid };
+    default:
+      return order;
+  }
+}
+
+// NEW_ORDER / ORDER_UPDATED
+export function orderEvent(type: string, order: Order): (topic: Topic) => object {
+  return (topic) => ({ type, order: projectOrder(order, topic) });
+}
+
+// Tamamlananlara taşıma: garson taşınan kalemleri çıkarır, kasa aktif listeden düşen
+// siparişleri siler; mutfak/bar için taşınan kalemler (hazır) zaten ekranda değildir
+export function movedEvent(
+  moves: Array<{ orderId: string; itemIds: string[] }>,
+  removed: string[]
+): (topic: Topic) => object {
+  return (topic) => {
+    const event = { type: 'ORDERS_MOVED_TO_COMPLETED', count: moves.length };
+    if (topic === 'orders') return { ...event, moves };
+    if (topic === 'tables') return { ...event, removed };
+    return event;
+  };
+}
@@ -0,0 +1,56 @@
+import { randomInt } from 'crypto';
+
+// Sipariş ve kalem id'leri: zamana göre sıralanabilir, kısa (18 karakter) id'ler.
+//   10 karakter zaman (epoch-ms) + 4 karakter sayaç + 4 karakter süreç kimliği
+// Crockford base32 ve sabit genişlik: metin sırası oluşturulma sırasıdır, yeni id'ler
+// sıralı yapılarda (indeks, dosya) sona eklenir. Aynı süreçte
+// üretilen id'ler saat geri gitse bile kesin artandır; süreç kimliği aynı milisaniyede
+// başka bir süreçte (veya yeniden başlatmada) üretilen id'lerle çakışmayı önler.
+// Eski kayıtlardaki uuidv4 id'ler bu sıralamaya uymaz.
+const ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ';
+const TIME_LENGTH = 10;
+const SEQUENCE_LENGTH = 4;
+const NODE_LENGTH = 4;
+const MAX_SEQUENCE = 32 ** SEQUENCE_LENGTH - 1;
+
+function encode(value: number, length: number): string {
+  let text = '';
+  for (let i = 0; i < length; i++) {
+    text = ALPHABET[value % 32] + text;
+    value = Math.floor(value / 32);
+  }
+  return text;
+}
+
+// Sayaç 20 bit; her çağrıda çalıştığı için döngüsüz kodlanır
+function encodeSequence(value: number): string {
+  return (
+    ALPHABET[(value >>> 15) & 31] +
+    ALPHABET[(value >>> 10) & 31] +
+    ALPHABET[(value >>> 5) & 31] +
+    ALPHABET[value & 31]
+  );
+}
+
+const node = encode(randomInt(32 ** NODE_LENGTH), NODE_LENGTH);
+let lastTime = -1;
+let lastTimeText = '';
+let sequence = 0;
+
+export function newId(): string {
+  const now = Date.now();
+  if (now > lastTime) {
+    lastTime = now;
+    lastTimeText = encode(now, TIME_LENGTH);
+    sequence = 0;
+  } else if (sequence < MAX_SEQUENCE) {
+    // Aynı milisaniye veya geri giden saat: son zaman korunur, sayaç artar
+    sequence++;
+  } else {
+    // Sayaç doldu: bir sonraki milisaniyeden ödünç alınır
+    lastTime++;
+    lastTimeText = encode(lastTime, TIME_LENGTH);
+    sequence = 0;
+  }
+  return lastTimeText + encodeSequence(sequence) + node;
+}
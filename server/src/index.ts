@@ -1,7 +1,9 @@
 import express from 'express';
 import cors from 'cors';
 import session from 'express-session';
+import { createHash } from 'crypto';
 import { createServer } from 'http';
+import { pipeline } from 'stream/promises';
 import { WebSocketServer } from 'ws';
 import {
   readMenu,
@@ -20,8 +22,54 @@ import {
   writeOrdersByBranch,
   readCompletedOrdersByBranch,
   writeCompletedOrdersByBranch,
-  readBranches
+  readBranches,
+  initDataStore,
+  startDataStoreMaintenance,
+  appendOrder,
+  updateOrderItemStatus,
+  moveOrderTable,
+  markOrdersPaid,
+  moveItemsToCompleted,
+  findOrder,
+  findOrderItem,
+  findUnpaidOrdersByTable,
+  streamPaidOrdersBetween,
+  clearOrdersBetween,
+  flushDataStore,
+  getDataVersion
 } from './dataManager.js';
+import {
+  type DailySummary,
+  initAnalytics,
+  recordPaidOrders,
+  removeAnalyticsBetween,
+  updatePaidItemStatus,
+} from './analytics.js';
+import { getCompiledMenu, recompileMenu } from './compiledMenu.js';
+import { newId } from './ids.js';
+import { activeItems, movedEvent, orderEvent } from './eventProjection.js';
+import {
+  ORDER_TOPICS,
+  type ResumeCursor,
+  getWebSocketMetrics,
+  markAlive,
+  orderTopics,
+  publish,
+  publishAll,
+  resume,
+  startHeartbeat,
+  subscribe,
+  topicsForRole,
+  unsubscribe,
+} from './wsRegistry.js';
+import { getLiveRevenue, recordLiveItemStatus, recordLivePayment } from './liveRevenue.js';
+import { flushDailyRollups, startDailyRollups, summarizeRange } from './dailyRollups.js';
+import { getPersistenceMetrics } from './persistence.js';
+import { createExportStream, isExportFormat } from './orderExport.js';
+import { summarizeBranches, type ConsolidatedReport } from './consolidatedReport.js';
+import { addDays, currentBusinessDay, dayEnd, dayStart, isDay, weekday } from './businessDay.js';
+import { closeReportPool, getReportPoolMetrics, summarizePaidOrdersInPool } from './reportPool.js';
+import { getCachedReport, getReportCacheMetrics, recordNotModified } from './reportCache.js';
 import {
   getUserByPin,
   getUserByRole,
@@ -30,7 +78,6 @@ import {
   deleteUser,
 } from './auth.js';
 import type { Order, OrderItem, OrderStatus, DailyReport } from './types.js';
-import { v4 as uuidv4 } from 'uuid';
 import { join } from 'path';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
@@ -38,9 +85,16 @@ import { dirname } from 'path';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 
+// permessage-deflate: bu boyuttan (bayt) büyük çerçeveler sıkıştırılır; 0 kapalı.
+// Sıkıştırma soket başınadır (her bağlantının kendi zlib bağlamı), CPU maliyeti vardır.
+const WS_DEFLATE_THRESHOLD = Number(process.env.WS_DEFLATE_THRESHOLD) || 0;
+
 const app = express();
 const server = createServer(app);
-const wss = new WebSocketServer({ server });
+const wss = new WebSocketServer({
+  server,
+  perMessageDeflate: WS_DEFLATE_THRESHOLD > 0 ? { threshold: WS_DEFLATE_THRESHOLD } : false,
+});
 
 // Environment variables
 const PORT = process.env.PORT || 3000;
@@ -81,66 +135,72 @@ app.use(
 );
 
 app.use(express.json());
-app.use(
-  session({
-    secret: SESSION_SECRET,
-    resave: false,
-    saveUninitialized: false,
-    cookie: {
-      secure: NODE_ENV === 'production',
-      httpOnly: true,
-      maxAge: 24 * 60 * 60 * 1000,
-      // Netlify (A domaini) -> Railway (B domaini) için cross-site cookie
-      sameSite: NODE_ENV === 'production' ? 'none' : 'lax',
-    },
-  })
-);
-
-// WebSocket clients - branchId ile eşleştirilmiş
-const clients = new Map<any, string>();
+// WebSocket bağlantılarında da kullanıcının rolünü okumak için ayrı tutulur
+const sessionParser = session({
+  secret: SESSION_SECRET,
+  resave: false,
+  saveUninitialized: false,
+  cookie: {
+    secure: NODE_ENV === 'production',
+    httpOnly: true,
+    maxAge: 24 * 60 * 60 * 1000,
+    // Netlify (A domaini) -> Railway (B domaini) için cross-site cookie
+    sameSite: NODE_ENV === 'production' ? 'none' : 'lax',
+  },
+});
+app.use(sessionParser);
 
+// WebSocket bağlantıları şube ve role göre konulara abone edilir (wsRegistry.ts)
 wss.on('connection', (ws: any, req: any) => {
-  // WebSocket bağlantısında branchId bilgisi alınmalı
-  let branchId = 'default';
+  // İstemcinin gönderdiği branchId yalnızca oturumla karşılaştırılır
+  let requestedBranchId: string | null = null;
+  // Yeniden bağlanan istemci son gördüğü olayı bildirir (?epoch=...&since=<seq>)
+  const cursor: ResumeCursor = {};
   
   try {
     if (req.url) {
       const url = new URL(req.url, `http://${req.headers.host || 'localhost'}`);
-      branchId = url.searchParams.get('branchId') || 'default';
+      requestedBranchId = url.searchParams.get('branchId');
+      const since = url.searchParams.get('since');
+      if (since !== null) {
+        cursor.since = Number(since);
+        cursor.epoch = url.searchParams.get('epoch') || undefined;
+      }
     }
   } catch (error) {
     console.error('Failed to parse WebSocket URL:', error);
   }
-  
-  clients.set(ws, branchId);
-  console.log(`WebSocket connected for branch: ${branchId}`);
 
-  ws.on('close', () => {
-    clients.delete(ws);
-  });
-});
-
-// Belirli bir branch'e mesaj gönder
-function broadcastToBranch(branchId: string, data: any) {
-  const message = JSON.stringify(data);
-  clients.forEach((clientBranchId, client) => {
-    // Map.forEach: (value, key) -> (branchId, client)
-    if (clientBranchId === branchId && (client as any).readyState === 1) {
-      (client as any).send(message);
+  // Oturum çerezi upgrade isteğiyle gelir; şube ve rol (dolayısıyla abone olunan
+  // konular) yalnızca sunucudaki oturumdan alınır. Oturumu olmayan veya başka bir
+  // şubeyi isteyen bağlantı kapatılır.
+  let closed = false;
+  sessionParser(req, {} as any, () => {
+    if (closed) return;
+    const session = req.session;
+    if (!session?.user) {
+      ws.close(1008, 'Oturum gerekli');
+      return;
     }
+    const branchId: string = session.branchId || session.user.branchId || 'default';
+    if (requestedBranchId && requestedBranchId !== branchId) {
+      ws.close(1008, 'Şube oturumla eşleşmiyor');
+      return;
+    }
+    console.log(`WebSocket connected for branch: ${branchId}`);
+    const topics = topicsForRole(session.user.role);
+    subscribe(ws, branchId, topics);
+    resume(ws, branchId, topics, cursor);
   });
-}
 
-// Tüm branch'lere mesaj gönder (eski davranış için)
-function broadcast(data: any) {
-  const message = JSON.stringify(data);
-  clients.forEach((clientBranchId, client) => {
-    // Map.forEach: (value, key) -> (branchId, client)
-    if ((client as any).readyState === 1) {
-      (client as any).send(message);
-    }
+  // Tarayıcı ping'e kendiliğinden pong ile cevap verir
+  ws.on('pong', () => markAlive(ws));
+
+  ws.on('close', () => {
+    closed = true;
+    unsubscribe(ws);
   });
-}
+});
 
 function getBranchId(req: any): string {
   // Önce session'dan al, yoksa body'den, yoksa query'den, yoksa default
@@ -155,6 +215,97 @@ function validateBranchId(branchId: string | undefined): string {
   return branchId;
 }
 
+// Rapor sürüm etiketi: şubenin veri sürümü ve iş günü (varsayılan aralıklar buna göre
+// hesaplanır) değişmedikçe aynı kalır.
+// Sürüm sayacı yeniden başlatmada sıfırlandığı için başlangıç zamanı da eklenir.
+const REPORT_TAG_PREFIX = Date.now().toString(36);
+
+function reportVersionTag(branchId: string): string {
+  return `${REPORT_TAG_PREFIX}-${branchId}-${getDataVersion(branchId)}-${currentBusinessDay()}`;
+}
+
+// ETag ayarlanır; istemcinin kopyası güncelse rapor hesaplanmadan 304 gönderilir
+function sendNotModified(req: any, res: any, tag: string): boolean {
+  res.set('Cache-Control', 'private, no-cache');
+  res.set('ETag', `W/"${tag}"`);
+  if (req.fresh) {
+    recordNotModified();
+    res.status(304).end();
+    return true;
+  }
+  return false;
+}
+
+// İstemci yanıt tamamlanmadan bağlantıyı kapatırsa işçideki rapor işi iptal edilir
+function requestAbortSignal(res: any): AbortSignal {
+  const controller = new AbortController();
+  res.on('close', () => {
+    if (!res.writableFinished) controller.abort();
+  });
+  return controller.signal;
+}
+
+// İşçi havuzu hataları: kuyruk dolu -> 503, süre aşımı -> 504, iptal -> yanıt yok
+function sendReportError(res: any, error: any) {
+  if (error?.code === 'ABORTED') return;
+  if (error?.code === 'QUEUE_FULL') {
+    return res.status(503).json({ error: 'Rapor kuyruğu dolu, lütfen tekrar deneyin' });
+  }
+  if (error?.code === 'TIMEOUT') {
+    return res.status(504).json({ error: 'Rapor zamanında hesaplanamadı' });
+  }
+  console.error('Rapor hesaplanamadı:', error);
+  return res.status(500).json({ error: 'Rapor hesaplanamadı' });
+}
+
+// Rapor aralığı: weekly/monthly için opsiyonel start/end (YYYY-MM-DD), yoksa
+// günün/haftanın/ayın başından şu ana. Tarih geçersizse null.
+// YYYY-MM-DD aralığı, iş saat diliminde (BUSINESS_TZ) günlerin başından sonuna
+function dayRange(start: string, end: string): { startDate: Date; endDate: Date } | null {
+  if (!isDay(start) || !isDay(end)) {
+    return null;
+  }
+  return { startDate: new Date(dayStart(start)), endDate: new Date(dayEnd(end)) };
+}
+
+// Varsayılan aralıklar (bugün, bu hafta pazardan, bu ay) iş gününe göre hesaplanır;
+// günlük rollup ve anlık ciroyla aynı gün sınırlarını kullanır
+function periodRange(
+  period: string,
+  start: string | undefined,
+  end: string | undefined
+): { startDate: Date; endDate: Date } | null {
+  if (start && end && (period === 'weekly' || period === 'monthly')) {
+    // Kullanıcının seçtiği aralık
+    return dayRange(start, end);
+  }
+  const today = currentBusinessDay();
+  let firstDay: string;
+  if (period === 'daily') {
+    firstDay = today;
+  } else if (period === 'weekly') {
+    firstDay = addDays(today, -weekday(today));
+  } else {
+    firstDay = `${today.slice(0, 8)}01`;
+  }
+  return { startDate: new Date(dayStart(firstDay)), endDate: new Date() };
+}
+
+// Admin'in bu oturumda PIN ile girdiği şubeler (giriş ve switch-branch); şubeler
+// arası uçlar (dışa aktarma) yalnızca bunlara erişebilir
+function adminBranchIds(req: any): string[] {
+  const adminBranches: string[] = req.session?.adminBranches ?? [];
+  return [...new Set([...adminBranches, getBranchId(req)])];
+}
+
+// ?branch=all | 1,2,3 | (yok -> fallback). Erişilemeyen bir şube istenirse null.
+function requestedBranchIds(req: any, branch: string | undefined, fallback: string[]): string[] | null {
+  const allowed = adminBranchIds(req);
+  const branchIds =
+    branch === 'all' ? allowed : branch ? branch.split(',').map((id) => id.trim()) : fallback;
+  return branchIds.every((id) => allowed.includes(id)) ? branchIds : null;
+}
+
 // Branches endpoint
 app.get('/api/branches', (req, res) => {
   const branches = readBranches();
@@ -213,6 +364,9 @@ app.post('/api/auth/login', async (req, res) => {
   // Branch attach
   (req.session as any).branchId = branchId;
   (req.session as any).user = user;
+  if (user.role === 'admin') {
+    (req.session as any).adminBranches = [branchId];
+  }
   return res.json({ user });
 });
 
@@ -264,7 +418,7 @@ app.post('/api/admin/users', (req, res) => {
 
   try {
     const newUser = createUser(username, pin, role, branchId);
-    broadcastToBranch(branchId, { type: 'USER_CREATED', user: newUser });
+    publish(branchId, 'users', { type: 'USER_CREATED', user: newUser });
     res.json(newUser);
   } catch (error: any) {
     if (error.message === 'PIN already in use') {
@@ -290,7 +444,7 @@ app.delete('/api/admin/users/:id', (req, res) => {
 
   const success = deleteUser(id, role as 'waiter' | 'cashier', branchId);
   if (success) {
-    broadcastToBranch(branchId, { type: 'USER_DELETED', userId: id });
+    publish(branchId, 'users', { type: 'USER_DELETED', userId: id });
     res.json({ success: true });
   } else {
     res.status(404).json({ error: 'Kullanıcı bulunamadı' });
@@ -346,8 +500,10 @@ app.post('/api/admin/switch-branch', async (req, res) => {
   }
 
   // Session'ı güncelle
+  const adminBranches: string[] = (req.session as any).adminBranches ?? [];
   (req.session as any).branchId = branchId;
   (req.session as any).user = adminUser;
+  (req.session as any).adminBranches = [...new Set([...adminBranches, branchId])];
   res.json({ user: adminUser, branchId });
 });
 
@@ -396,8 +552,9 @@ app.post('/api/admin/menu', (req, res) => {
 
   menu.push(newItem);
   writeMenuByBranch(branchId, menu);
+  recompileMenu(branchId, menu);
 
-  broadcastToBranch(branchId, { type: 'MENU_UPDATED', menu });
+  publish(branchId, 'menu', { type: 'MENU_UPDATED', menu });
   res.json(newItem);
 });
 
@@ -437,8 +594,9 @@ app.put('/api/admin/menu/:id', (req, res) => {
   };
 
   writeMenuByBranch(branchId, menu);
+  recompileMenu(branchId, menu);
 
-  broadcastToBranch(branchId, { type: 'MENU_UPDATED', menu });
+  publish(branchId, 'menu', { type: 'MENU_UPDATED', menu });
   res.json(menu[index]);
 });
 
@@ -458,8 +616,9 @@ app.delete('/api/admin/menu/:id', (req, res) => {
   }
 
   writeMenuByBranch(branchId, filteredMenu);
+  recompileMenu(branchId, filteredMenu);
 
-  broadcastToBranch(branchId, { type: 'MENU_UPDATED', menu: filteredMenu });
+  publish(branchId, 'menu', { type: 'MENU_UPDATED', menu: filteredMenu });
   res.json({ success: true });
 });
 
@@ -476,16 +635,7 @@ app.get('/api/orders', (req, res) => {
   // Kitchen ve Bar sadece kendi kategorilerini görür (READY ve SERVED olmayanlar)
   if (user.role === 'kitchen' || user.role === 'bar') {
     const filteredOrders = orders
-      .map((order) => ({
-        ...order,
-        items: order.items.filter(
-          (item) =>
-            item.category === user.role &&
-            item.status !== 'SERVED' &&
-            item.status !== 'CANCELLED' &&
-            item.status !== 'READY'
-        ),
-      }))
+      .map((order) => ({ ...order, items: activeItems(order, user.role) }))
       .filter((order) => order.items.length > 0);
 
     return res.json(filteredOrders);
@@ -520,61 +670,31 @@ app.post('/api/orders', (req, res) => {
       .json({ error: 'Sipariş öğeleri gerekli' });
   }
 
-  const menu = readMenuByBranch(branchId);
+  const menu = getCompiledMenu(branchId);
+  // Sipariş id'si kalemlerinkinden önce üretilir; id sırası oluşturulma sırasıdır
+  const orderId = newId();
 
   const orderItems: OrderItem[] = [];
 
   items.forEach((item: any) => {
-    const menuItem = menu.find((m) => m.id === item.menuItemId);
-    if (!menuItem) {
+    const templates = menu.get(item.menuItemId);
+    if (!templates) {
       throw new Error(`Menu item not found: ${item.menuItemId}`);
     }
 
-    // Kampanya menüsü ise içindeki ürünleri ayrı ayrı ekle
-    if (menuItem.category === 'campaign' && (menuItem as any).items) {
-      (menuItem as any).items.forEach((campaignItem: any) => {
-        const fullMenuItem = menu.find((m) => m.id === campaignItem.id);
-        if (fullMenuItem) {
-          orderItems.push({
-            id: uuidv4(),
-            menuItemId: fullMenuItem.id,
-            menuItemName: `${menuItem.name} - ${fullMenuItem.name}`,
-            quantity: item.quantity,
-            price: fullMenuItem.price,
-            category: campaignItem.category as 'kitchen' | 'bar',
-            status: 'PENDING' as OrderStatus,
-            branchId: branchId,
-          });
-        }
-      });
-    } else {
-      // Normal ürün veya tatlı
-      let category: 'kitchen' | 'bar' = 'kitchen';
-
-      const itemCategory = (menuItem as any).category;
-      const menuCat = (menuItem as any).menuCategory;
-
-      if (menuCat === 'dessert') {
-        category = itemCategory === 'bar' ? 'bar' : 'kitchen';
-      } else if (itemCategory === 'bar') {
-        category = 'bar';
-      } else if (itemCategory === 'kitchen') {
-        category = 'kitchen';
-      } else {
-        category = 'kitchen';
-      }
-
+    // Kampanyalar derlenmiş menüde bileşenlerine açılmış durumda
+    templates.forEach((template) => {
       orderItems.push({
-        id: uuidv4(),
-        menuItemId: menuItem.id,
-        menuItemName: menuItem.name,
+        id: newId(),
+        menuItemId: template.menuItemId,
+        menuItemName: template.menuItemName,
         quantity: item.quantity,
-        price: menuItem.price,
-        category,
+        price: template.price,
+        category: template.category,
         status: 'PENDING' as OrderStatus,
         branchId: branchId,
       });
-    }
+    });
   });
 
   const totalAmount = orderItems.reduce(
@@ -583,7 +703,7 @@ app.post('/api/orders', (req, res) => {
   );
 
   const order: Order = {
-    id: uuidv4(),
+    id: orderId,
     waiterId: user.id,
     waiterName: user.username,
     tableNumber: tableNumber || undefined,
@@ -594,11 +714,9 @@ app.post('/api/orders', (req, res) => {
     branchId: branchId,
   };
 
-  const orders = readOrdersByBranch(branchId);
-  orders.push(order);
-  writeOrdersByBranch(branchId, orders);
+  appendOrder(branchId, order);
 
-  broadcastToBranch(branchId, { type: 'NEW_ORDER', order });
+  publish(branchId, orderTopics(order), orderEvent('NEW_ORDER', order), order.id);
 
   res.json(order);
 });
@@ -613,17 +731,12 @@ app.patch('/api/orders/:orderId/items/:itemId', (req, res) => {
   const { orderId, itemId } = req.params;
   const { status, cancelledReason } = req.body;
 
-  const orders = readOrdersByBranch(branchId);
-  const order = orders.find((o) => o.id === orderId);
-
-  if (!order) {
-    return res.status(404).json({ error: 'Order not found' });
-  }
-
-  const item = order.items.find((i) => i.id === itemId);
-  if (!item) {
-    return res.status(404).json({ error: 'Item not found' });
+  const ref = findOrderItem(branchId, orderId, itemId);
+  if (!ref) {
+    const error = findOrder(branchId, orderId) ? 'Item not found' : 'Order not found';
+    return res.status(404).json({ error });
   }
+  const { order, item } = ref;
 
   // Kitchen ve Bar sadece kendi kategorilerini güncelleyebilir
   if (
@@ -645,16 +758,21 @@ app.patch('/api/orders/:orderId/items/:itemId', (req, res) => {
     }
   }
 
-  item.status = status;
-  if (status === 'CANCELLED' && cancelledReason) {
-    item.cancelledReason = cancelledReason;
+  const previousStatus = item.status;
+  updateOrderItemStatus(branchId, orderId, itemId, status, cancelledReason);
+  if (order.isPaid) {
+    updatePaidItemStatus(branchId, orderId, order.items.indexOf(item), status);
+    const revenue = recordLiveItemStatus(branchId, order, item, previousStatus, status);
+    if (revenue) {
+      publish(branchId, 'reports', { type: 'REVENUE_UPDATED', report: revenue });
+    }
   }
 
-  writeOrdersByBranch(branchId, orders);
-
-  broadcastToBranch(branchId, { type: 'ORDER_UPDATED', order });
+  // Olay değişiklikten sonraki halini taşır; istemciler listeyi yeniden çekmeden uygular
+  const updated = findOrder(branchId, orderId) ?? order;
+  publish(branchId, orderTopics(updated), orderEvent('ORDER_UPDATED', updated), orderId);
 
-  res.json(order);
+  res.json(updated);
 });
 
 // Masa taşıma
@@ -674,8 +792,7 @@ app.patch('/api/orders/:orderId/move-table', (req, res) => {
   }
 
   const branchId = validateBranchId(getBranchId(req));
-  const orders = readOrdersByBranch(branchId);
-  const order = orders.find((o) => o.id === orderId);
+  const order = findOrder(branchId, orderId);
 
   if (!order) {
     return res.status(404).json({ error: 'Order not found' });
@@ -689,12 +806,12 @@ app.patch('/api/orders/:orderId/move-table', (req, res) => {
     return res.status(400).json({ error: 'Ödenmiş sipariş taşınamaz' });
   }
 
-  order.tableNumber = newTableNumber;
-  writeOrdersByBranch(branchId, orders);
+  moveOrderTable(branchId, orderId, newTableNumber);
 
-  broadcastToBranch(branchId, { type: 'ORDER_UPDATED', order });
+  const updated = findOrder(branchId, orderId) ?? order;
+  publish(branchId, orderTopics(updated), orderEvent('ORDER_UPDATED', updated), orderId);
 
-  res.json(order);
+  res.json(updated);
 });
 
 // Kasa - Masa ödemesi
@@ -713,10 +830,7 @@ app.post('/api/cashier/pay', (req, res) => {
       .json({ error: 'Masa numarası ve ödeme yöntemi gerekli' });
   }
 
-  const orders = readOrdersByBranch(branchId);
-  const tableOrders = orders.filter(
-    (order) => order.tableNumber === tableNumber && !order.isPaid
-  );
+  const tableOrders = findUnpaidOrdersByTable(branchId, tableNumber);
 
   if (tableOrders.length === 0) {
     return res
@@ -741,18 +855,22 @@ app.post('/api/cashier/pay', (req, res) => {
     cashierName: user.username,
   };
 
-  tableOrders.forEach((order) => {
-    order.payment = payment;
-    order.isPaid = true;
-  });
-
-  writeOrdersByBranch(branchId, orders);
+  markOrdersPaid(
+    branchId,
+    tableOrders.map((order) => order.id),
+    payment
+  );
+  const paidOrders = tableOrders.map((order) => ({ ...order, isPaid: true, payment }));
+  recordPaidOrders(branchId, paidOrders);
+  const revenue = recordLivePayment(branchId, paidOrders);
 
-  broadcastToBranch(branchId, {
+  publish(branchId, 'payments', {
     type: 'PAYMENT_COMPLETED',
     tableNumber,
-    orders: tableOrders,
+    orderIds: paidOrders.map((order) => order.id),
+    payment,
   });
+  publish(branchId, 'reports', { type: 'REVENUE_UPDATED', report: revenue });
 
   res.json({ success: true, orders: tableOrders, payment });
 });
@@ -774,10 +892,7 @@ app.get('/api/cashier/table/:tableNumber', (req, res) => {
   }
 
   const branchId = validateBranchId(getBranchId(req));
-  const orders = readOrdersByBranch(branchId);
-  const tableOrders = orders.filter(
-    (order) => order.tableNumber === tableNum && !order.isPaid
-  );
+  const tableOrders = findUnpaidOrdersByTable(branchId, tableNum);
 
   const totalAmount = tableOrders.reduce(
     (sum, order) => sum + order.totalAmount,
@@ -829,10 +944,9 @@ app.post('/api/orders/move-to-completed', (req, res) => {
 
   const branchId = validateBranchId(getBranchId(req));
   const orders = readOrdersByBranch(branchId);
-  const completedOrders = readCompletedOrdersByBranch(branchId);
   const now = new Date().toISOString();
 
-  let movedCount = 0;
+  const moves: Array<{ orderId: string; itemIds: string[] }> = [];
 
   orders.forEach((order) => {
     const readyItems = order.items.filter(
@@ -840,31 +954,20 @@ app.post('/api/orders/move-to-completed', (req, res) => {
     );
 
     if (readyItems.length > 0 && !order.isPaid) {
-      const orderToMove = {
-        ...order,
-        items: readyItems,
-        completedAt: now,
-      };
-
-      completedOrders.push(orderToMove);
-      movedCount++;
-
-      order.items = order.items.filter(
-        (item) => !(item.category === user.role && item.status === 'READY')
-      );
+      moves.push({
+        orderId: order.id,
+        itemIds: readyItems.map((item) => item.id),
+      });
     }
   });
 
-  const remainingOrders = orders.filter((order) => order.items.length > 0);
-
-  writeOrdersByBranch(branchId, remainingOrders);
-  writeCompletedOrdersByBranch(branchId, completedOrders);
+  const movedCount = moves.length;
+  moveItemsToCompleted(branchId, moves, now);
 
   if (movedCount > 0) {
-    broadcastToBranch(branchId, {
-      type: 'ORDERS_MOVED_TO_COMPLETED',
-      count: movedCount,
-    });
+    // Tüm kalemleri taşınan siparişler aktif listeden çıkar
+    const removed = moves.filter((move) => !findOrder(branchId, move.orderId)).map((move) => move.orderId);
+    publish(branchId, ORDER_TOPICS, movedEvent(moves, removed));
   }
 
   res.json({ success: true, movedCount });
@@ -876,7 +979,7 @@ function resetDay() {
   // If you want to reset for all branches, iterate over all branch IDs.
   // Here, we'll just call for 'default' branch for backward compatibility.
   writeCompletedOrdersByBranch('default', []);
-  broadcast({ type: 'DAY_RESET' });
+  publishAll(ORDER_TOPICS, { type: 'DAY_RESET' });
   console.log('Gün sonu otomatik sıfırlandı:', new Date().toISOString());
 }
 
@@ -903,7 +1006,7 @@ app.post('/api/admin/reset-day', (req, res) => {
 
   const branchId = validateBranchId(getBranchId(req));
   writeCompletedOrdersByBranch(branchId, []);
-  broadcastToBranch(branchId, { type: 'DAY_RESET' });
+  publish(branchId, ORDER_TOPICS, { type: 'DAY_RESET' });
   res.json({
     success: true,
     message:
@@ -918,46 +1021,121 @@ app.get('/api/reports/live', (req, res) => {
     return res.status(403).json({ error: 'Unauthorized' });
   }
 
+  // Ödeme ve iptallerde güncellenen toplamlar; istekte hesaplama yapılmaz
   const branchId = validateBranchId(getBranchId(req));
-  const orders = readOrdersByBranch(branchId);
-  const completedOrders = readCompletedOrdersByBranch(branchId);
-  const allOrders = [...orders, ...completedOrders];
+  res.json(getLiveRevenue(branchId));
+});
 
-  const today = new Date().toISOString().split('T')[0];
-  const todayOrders = allOrders.filter(
-    (order) => order.createdAt.startsWith(today) && order.isPaid
-  );
+// Şubeler arası konsolide rapor: her şubenin dönem özeti ve genel toplam.
+// GET /api/reports/consolidated?period=daily|weekly|monthly&start=&end=&branch=<id,id|all>
+// branch verilmezse oturumda açılmış tüm şubeler. /:period'dan önce tanımlı olmalı.
+app.get('/api/reports/consolidated', async (req, res) => {
+  const user = (req.session as any)?.user;
+  if (!user || user.role !== 'admin') {
+    return res.status(403).json({ error: 'Unauthorized' });
+  }
 
-  let totalRevenue = 0;
-  const waiterSales: Record<string, { name: string; sales: number }> =
-    {};
-
-  todayOrders.forEach((order) => {
-    if (order.payment) {
-      totalRevenue += order.payment.finalAmount;
-
-      if (order.waiterId && order.waiterName) {
-        if (!waiterSales[order.waiterId]) {
-          waiterSales[order.waiterId] = {
-            name: order.waiterName,
-            sales: 0,
-          };
-        }
-        waiterSales[order.waiterId].sales +=
-          order.payment.finalAmount;
-      }
-    }
-  });
+  const { period = 'daily', start, end, branch } = req.query as {
+    period?: string;
+    start?: string;
+    end?: string;
+    branch?: string;
+  };
+  if (!['daily', 'weekly', 'monthly'].includes(period)) {
+    return res.status(400).json({
+      error: 'Geçersiz periyot (daily, weekly, monthly)',
+    });
+  }
+  const range = periodRange(period, start, end);
+  if (!range) {
+    return res.status(400).json({ error: 'Geçersiz tarih aralığı (YYYY-MM-DD)' });
+  }
+  const { startDate, endDate } = range;
+
+  const branchIds = requestedBranchIds(req, branch, adminBranchIds(req));
+  if (!branchIds) {
+    return res.status(403).json({ error: 'Bu şubeye erişim yok (önce şubeye geçiş yapın)' });
+  }
+  const names = new Map(readBranches().map((b) => [b.id, b.name]));
+  const branches = branchIds.map((id) => ({ id, name: names.get(id) ?? id }));
+
+  // Şube etiketleri birleşir; herhangi bir şubenin verisi değişince etiket de değişir
+  const tags = new Map(branchIds.map((id) => [id, reportVersionTag(id)]));
+  const tag = createHash('sha1').update([...tags.values()].join('|')).digest('base64url');
+  if (sendNotModified(req, res, `${REPORT_TAG_PREFIX}-consolidated-${tag}`)) return;
+
+  // Şube özetleri /:period ile aynı önbellek anahtarını kullanır
+  const signal = requestAbortSignal(res);
+  let report: ConsolidatedReport;
+  try {
+    report = await summarizeBranches(
+      branches,
+      (branchId) =>
+        getCachedReport(
+          `${period}|${start ?? ''}|${end ?? ''}|${tags.get(branchId)}`,
+          () => summarizeRange(branchId, startDate, endDate, false, signal)
+        ),
+      signal
+    );
+  } catch (error) {
+    return sendReportError(res, error);
+  }
 
   res.json({
-    totalRevenue,
-    waiterSales,
-    orderCount: todayOrders.length,
+    period,
+    ...report,
+    startDate: startDate.toISOString(),
+    endDate: endDate.toISOString(),
   });
 });
 
+// Daily report (/:period'dan önce tanımlı olmalı; yoksa 'daily' oraya düşer)
+app.get('/api/reports/daily', async (req, res) => {
+  const user = (req.session as any)?.user;
+  if (!user || user.role !== 'admin') {
+    return res.status(403).json({ error: 'Unauthorized' });
+  }
+
+  // Etiket /:period ile aynı sürümden türer ama gövde farklı olduğu için ayrı ad alanında
+  const branchId = validateBranchId(getBranchId(req));
+  const tag = reportVersionTag(branchId);
+  if (sendNotModified(req, res, `daily-report-${tag}`)) return;
+
+  const signal = requestAbortSignal(res);
+  let report: DailyReport;
+  try {
+    report = await getCachedReport(`daily-report|${tag}`, async (): Promise<DailyReport> => {
+      const today = currentBusinessDay();
+      const { totalRevenue, cancelledAmount, waiterSales, productCounts, paymentMethods } =
+        await summarizePaidOrdersInPool(
+          branchId,
+          new Date(dayStart(today)),
+          new Date(dayEnd(today)),
+          true,
+          signal
+        );
+
+      const topProducts = Object.values(productCounts)
+        .sort((a, b) => b.quantity - a.quantity)
+        .slice(0, 10);
+
+      return {
+        totalRevenue,
+        cancelledAmount,
+        waiterSales,
+        topProducts,
+        paymentMethods,
+      };
+    });
+  } catch (error) {
+    return sendReportError(res, error);
+  }
+
+  res.json(report);
+});
+
 // Günlük/Haftalık/Aylık rapor
-app.get('/api/reports/:period', (req, res) => {
+app.get('/api/reports/:period', async (req, res) => {
   const user = (req.session as any)?.user;
   if (!user || user.role !== 'admin') {
     return res.status(403).json({ error: 'Unauthorized' });
@@ -971,84 +1149,34 @@ app.get('/api/reports/:period', (req, res) => {
   }
 
   const branchId = validateBranchId(getBranchId(req));
-  const orders = readOrdersByBranch(branchId);
-  const completedOrders = readCompletedOrdersByBranch(branchId);
-  const allOrders = [...orders, ...completedOrders];
-
-  const now = new Date();
-
-  // 👉 Opsiyonel tarih aralığı (sadece weekly / monthly için)
   const { start, end } = req.query as { start?: string; end?: string };
-
-  let startDate: Date;
-  let endDate: Date;
-
-  if (start && end && (period === 'weekly' || period === 'monthly')) {
-    // Kullanıcının seçtiği aralık
-    startDate = new Date(start);
-    endDate = new Date(end);
-    endDate.setHours(23, 59, 59, 999);
-  } else {
-    // Eski varsayılan davranış
-    if (period === 'daily') {
-      startDate = new Date(
-        now.getFullYear(),
-        now.getMonth(),
-        now.getDate()
-      );
-    } else if (period === 'weekly') {
-      const dayOfWeek = now.getDay();
-      startDate = new Date(now);
-      startDate.setDate(now.getDate() - dayOfWeek);
-      startDate.setHours(0, 0, 0, 0);
-    } else {
-      startDate = new Date(now.getFullYear(), now.getMonth(), 1);
-    }
-    endDate = now;
+  const range = periodRange(period, start, end);
+  if (!range) {
+    return res.status(400).json({ error: 'Geçersiz tarih aralığı (YYYY-MM-DD)' });
   }
+  const { startDate, endDate } = range;
 
-  const filteredOrders = allOrders.filter((order) => {
-    const orderDate = new Date(order.createdAt);
-    return (
-      orderDate >= startDate &&
-      orderDate <= endDate &&
-      order.isPaid &&
-      order.payment
-    );
-  });
-
-  let totalRevenue = 0;
-  const waiterSales: Record<string, { name: string; sales: number }> = {};
-  const paymentMethods = { cash: 0, card: 0 };
+  const tag = reportVersionTag(branchId);
+  if (sendNotModified(req, res, tag)) return;
 
-  filteredOrders.forEach((order) => {
-    if (order.payment) {
-      totalRevenue += order.payment.finalAmount;
-
-      if (order.payment.method === 'cash') {
-        paymentMethods.cash += order.payment.finalAmount;
-      } else {
-        paymentMethods.card += order.payment.finalAmount;
-      }
-
-      if (order.waiterId && order.waiterName) {
-        if (!waiterSales[order.waiterId]) {
-          waiterSales[order.waiterId] = {
-            name: order.waiterName,
-            sales: 0,
-          };
-        }
-        waiterSales[order.waiterId].sales += order.payment.finalAmount;
-      }
-    }
-  });
+  // Geçmiş günler günlük özetlerden, bugün anlık toplamlardan birleştirilir
+  const signal = requestAbortSignal(res);
+  let summary: DailySummary;
+  try {
+    summary = await getCachedReport(`${period}|${start ?? ''}|${end ?? ''}|${tag}`, () =>
+      summarizeRange(branchId, startDate, endDate, false, signal)
+    );
+  } catch (error) {
+    return sendReportError(res, error);
+  }
+  const { totalRevenue, waiterSales, paymentMethods, orderCount } = summary;
 
   res.json({
     period,
     totalRevenue,
     waiterSales,
     paymentMethods,
-    orderCount: filteredOrders.length,
+    orderCount,
     startDate: startDate.toISOString(),
     endDate: endDate.toISOString(),
   });
@@ -1068,125 +1196,97 @@ app.post('/api/reports/clear-range', (req, res) => {
     return res.status(400).json({ error: 'start ve end zorunlu (YYYY-MM-DD)' });
   }
 
-  const startDate = new Date(start);
-  const endDate = new Date(end);
-  endDate.setHours(23, 59, 59, 999);
+  const range = dayRange(start, end);
+  if (!range) {
+    return res.status(400).json({ error: 'Geçersiz tarih aralığı (YYYY-MM-DD)' });
+  }
+  const { startDate, endDate } = range;
 
-  const todayStr = new Date().toISOString().split('T')[0];
+  const todayStr = currentBusinessDay();
 
   const branchId = validateBranchId(getBranchId(req));
-  let orders = readOrdersByBranch(branchId);
-  let completedOrders = readCompletedOrdersByBranch(branchId);
-
-  const isInRangeAndNotToday = (createdAt: string) => {
-    const d = new Date(createdAt);
-    const dateStr = createdAt.split('T')[0];
-    return d >= startDate && d <= endDate && dateStr !== todayStr;
-  };
-
-  const beforeOrdersLen = orders.length;
-  const beforeCompletedLen = completedOrders.length;
-
-  orders = orders.filter((o) => !isInRangeAndNotToday(o.createdAt));
-  completedOrders = completedOrders.filter(
-    (o) => !isInRangeAndNotToday(o.createdAt)
+  const { removedOrders, removedCompletedOrders } = clearOrdersBetween(
+    branchId,
+    startDate,
+    endDate,
+    todayStr
   );
-
-  writeOrdersByBranch(branchId, orders);
-  writeCompletedOrdersByBranch(branchId, completedOrders);
+  removeAnalyticsBetween(branchId, startDate, endDate, todayStr);
 
   res.json({
     success: true,
-    removedOrders: beforeOrdersLen - orders.length,
-    removedCompletedOrders: beforeCompletedLen - completedOrders.length,
+    removedOrders,
+    removedCompletedOrders,
   });
 });
 
-// Daily report
-app.get('/api/reports/daily', (req, res) => {
+// Muhasebe için ham sipariş/ödeme dışa aktarımı (kalem başına bir satır).
+// GET /api/admin/export?format=csv|ndjson&start=YYYY-MM-DD&end=YYYY-MM-DD&branch=<id,id|all>
+// Satırlar okundukça yazılır (chunked); istemci yavaş okursa okuma da bekler.
+app.get('/api/admin/export', async (req, res) => {
   const user = (req.session as any)?.user;
   if (!user || user.role !== 'admin') {
     return res.status(403).json({ error: 'Unauthorized' });
   }
 
-  const branchId = validateBranchId(getBranchId(req));
-  const orders = readOrdersByBranch(branchId);
-  const completedOrders = readCompletedOrdersByBranch(branchId);
-  const allOrders = [...orders, ...completedOrders];
-  const today = new Date().toISOString().split('T')[0];
-
-  const todayOrders = allOrders.filter(
-    (order) =>
-      order.createdAt.startsWith(today) &&
-      order.isPaid &&
-      order.payment
-  );
-
-  let totalRevenue = 0;
-  let cancelledAmount = 0;
-  const waiterSales: Record<string, { name: string; sales: number }> =
-    {};
-  const productCounts: Record<
-    string,
-    { name: string; quantity: number; revenue: number }
-  > = {};
-  const paymentMethods = { cash: 0, card: 0 };
-
-  todayOrders.forEach((order) => {
-    if (order.payment) {
-      if (order.payment.method === 'cash') {
-        paymentMethods.cash += order.payment.finalAmount;
-      } else {
-        paymentMethods.card += order.payment.finalAmount;
-      }
+  const { format = 'csv', start, end, branch } = req.query as {
+    format?: string;
+    start?: string;
+    end?: string;
+    branch?: string;
+  };
+  if (!isExportFormat(format)) {
+    return res.status(400).json({ error: 'Geçersiz format (csv, ndjson)' });
+  }
+  if (!start || !end) {
+    return res.status(400).json({ error: 'start ve end zorunlu (YYYY-MM-DD)' });
+  }
+  const range = dayRange(start, end);
+  if (!range) {
+    return res.status(400).json({ error: 'Geçersiz tarih aralığı (YYYY-MM-DD)' });
+  }
+  const { startDate, endDate } = range;
 
-      totalRevenue += order.payment.finalAmount;
-
-      if (order.waiterId && order.waiterName) {
-        if (!waiterSales[order.waiterId]) {
-          waiterSales[order.waiterId] = {
-            name: order.waiterName,
-            sales: 0,
-          };
-        }
-        waiterSales[order.waiterId].sales +=
-          order.payment.finalAmount;
-      }
+  const branchIds = requestedBranchIds(req, branch, [getBranchId(req)]);
+  if (!branchIds) {
+    return res.status(403).json({ error: 'Bu şubeye erişim yok (önce şubeye geçiş yapın)' });
+  }
 
-      order.items.forEach((item) => {
-        if (item.status !== 'CANCELLED') {
-          const itemTotal = item.price * item.quantity;
-
-          if (!productCounts[item.menuItemId]) {
-            productCounts[item.menuItemId] = {
-              name: item.menuItemName,
-              quantity: 0,
-              revenue: 0,
-            };
-          }
-          productCounts[item.menuItemId].quantity +=
-            item.quantity;
-          productCounts[item.menuItemId].revenue += itemTotal;
-        } else {
-          cancelledAmount += item.price * item.quantity;
-        }
-      });
+  function* orders() {
+    for (const branchId of branchIds) {
+      yield* streamPaidOrdersBetween(branchId, startDate, endDate);
     }
-  });
+  }
 
-  const topProducts = Object.values(productCounts)
-    .sort((a, b) => b.quantity - a.quantity)
-    .slice(0, 10);
+  res.setHeader(
+    'Content-Type',
+    format === 'csv' ? 'text/csv; charset=utf-8' : 'application/x-ndjson; charset=utf-8'
+  );
+  res.setHeader('Content-Disposition', `attachment; filename="siparisler_${start}_${end}.${format}"`);
+  try {
+    await pipeline(createExportStream(orders(), format), res);
+  } catch (error: any) {
+    // İstemci indirmeyi yarıda bıraktıysa hata değil
+    if (error?.code !== 'ERR_STREAM_PREMATURE_CLOSE') {
+      console.error('Dışa aktarma başarısız:', error);
+      res.destroy();
+    }
+  }
+});
 
-  const report: DailyReport = {
-    totalRevenue,
-    cancelledAmount,
-    waiterSales,
-    topProducts,
-    paymentMethods,
-  };
+// Sunucu metrikleri (kalıcılık katmanı vb.)
+app.get('/api/admin/metrics', (req, res) => {
+  const user = (req.session as any)?.user;
+  if (!user || user.role !== 'admin') {
+    return res.status(403).json({ error: 'Unauthorized' });
+  }
 
-  res.json(report);
+  res.json({
+    persistence: getPersistenceMetrics(),
+    reportCache: getReportCacheMetrics(),
+    reportWorkers: getReportPoolMetrics(),
+    websocket: getWebSocketMetrics(),
+  });
 });
 
 // Serve static files in production (AFTER all API routes)
@@ -1203,10 +1303,40 @@ if (NODE_ENV === 'production') {
   });
 }
 
+// Veriler dosyalardan bir kez yüklenir, sonrasında bellekten okunur
+initDataStore();
+startDataStoreMaintenance();
+// Rapor sütunları her şube için ilk raporda tüm ödenmiş siparişlerden kurulur
+initAnalytics((branchId) =>
+  streamPaidOrdersBetween(branchId, new Date(0), new Date('9999-12-31T23:59:59.999Z'))
+);
+// Kapanmış günlerin rapor özetleri (eksikler geçmişten doldurulur)
+startDailyRollups();
+// Kopan tabletlerin bağlantıları heartbeat ile temizlenir
+startHeartbeat();
+
 server.listen(PORT, () => {
   console.log(`🚀 Server running on port ${PORT}`);
   console.log(`📦 Environment: ${NODE_ENV}`);
   if (NODE_ENV === 'production') {
     console.log(`📁 Serving static files from: ${CLIENT_BUILD_PATH}`);
   }
-});
\ No newline at end of file
+});
+
+// Kapanışta bekleyen yazmaları diske aktar
+async function shutdown(signal: string) {
+  console.log(`${signal} alındı, bekleyen yazmalar diske aktarılıyor...`);
+  server.close();
+  try {
+    flushDailyRollups();
+    await closeReportPool();
+    await flushDataStore();
+  } catch (error) {
+    console.error('Kapanışta veriler yazılamadı:', error);
+    process.exit(1);
+  }
+  process.exit(0);
+}
+
+process.on('SIGTERM', () => void shutdown('SIGTERM'));
+process.on('SIGINT', () => void shutdown('SIGINT'));
\ No newline at end of file
@@ -0,0 +1,589 @@
+import { appendFileSync, existsSync, mkdirSync, readdirSync, readFileSync, renameSync, writeFileSync } from 'fs';
+import { join } from 'path';
+import type { Order } from './types.js';
+import { currentBusinessDay } from './businessDay.js';
+import { archiveDay, createOrderArchive, type OrderArchive } from './orderArchive.js';
+import { decodeOrders, encodeOrders } from './orderCodec.js';
+import { createOrderIndex, type ItemRef, type OrderIndex } from './orderIndex.js';
+import { createOrderJournal, type OrderJournal, type OrderMutation } from './orderJournal.js';
+import { commitPending, flush, scheduleWrite } from './persistence.js';
+import type { Collection, CollectionRows, DailyRollup, StorageBackend } from './storageBackend.js';
+
+export const DEFAULT_BRANCH = 'default';
+const BRANCH_ID_PATTERN = /^[A-Za-z0-9_-]+$/;
+
+const COMPACTION_INTERVAL_MS = 30 * 1000;
+
+// Şube bazlı bellek içi durum. Her şubenin verisi data/<branchId>/ altında
+// ayrı dosyalarda tutulur; bir şubenin yazması diğerlerinin dosyalarına dokunmaz.
+// Geçmiş siparişler bellekte değil, data/<branchId>/archive/ altındaki gün
+// segmentlerinde tutulur (orderArchive.ts).
+type StateCollection = Exclude<Collection, 'completedOrders'>;
+type BranchState = { [C in StateCollection]: CollectionRows[C][] };
+
+const collectionFiles: Record<Collection, string> = {
+  users: 'users.json',
+  menu: 'menu.json',
+  orders: 'orders.json',
+  completedOrders: 'completed-orders.json',
+};
+
+const collections = Object.keys(collectionFiles) as Collection[];
+
+export function isValidBranchId(branchId: string): boolean {
+  return BRANCH_ID_PATTERN.test(branchId);
+}
+
+function rowBranchId(row: { branchId?: string }): string {
+  return row.branchId || DEFAULT_BRANCH;
+}
+
+// Dosya yoksa boş liste; bozuksa hata fırlatılır. Bozuk dosyayı [] saymak
+// bir sonraki yazmada günün tüm verisini silerdi.
+function readJsonFile<T>(path: string): T[] {
+  let data: string;
+  try {
+    data = readFileSync(path, 'utf-8');
+  } catch (error: any) {
+    if (error.code === 'ENOENT') return [];
+    throw error;
+  }
+  try {
+    return JSON.parse(data);
+  } catch (error) {
+    throw new Error(`Veri dosyası okunamadı (bozuk JSON): ${path}`);
+  }
+}
+
+// orders.json sıkıştırılmış biçimde (orderCodec.ts) veya eski sipariş dizisi olabilir
+function readOrdersFile(path: string): Order[] {
+  return decodeOrders(readJsonFile<Order>(path));
+}
+
+export function createJsonBackend(dataDir: string): StorageBackend {
+  const branchStates = new Map<string, BranchState>();
+  const orderJournals = new Map<string, OrderJournal>();
+  const branchCompactions = new Map<string, Promise<void>>();
+  const archives = new Map<string, OrderArchive>();
+  const orderIndexes = new Map<string, OrderIndex>();
+  const rollups = new Map<string, Map<string, DailyRollup>>();
+  let loaded = false;
+
+  function branchDir(branchId: string): string {
+    // branchId istekten geliyor; dosya yolu olarak kullanmadan önce doğrula
+    if (!isValidBranchId(branchId)) {
+      throw new Error(`Invalid branchId: ${branchId}`);
+    }
+    return join(dataDir, branchId);
+  }
+
+  function getBranchState(branchId: string): BranchState {
+    let state = branchStates.get(branchId);
+    if (!state) {
+      state = { users: [], menu: [], orders: [] };
+      branchStates.set(branchId, state);
+    }
+    return state;
+  }
+
+  function getOrderJournal(branchId: string): OrderJournal {
+    let journal = orderJournals.get(branchId);
+    if (!journal) {
+      const dir = branchDir(branchId);
+      mkdirSync(dir, { recursive: true });
+      journal = createOrderJournal(join(dir, 'orders.journal'));
+      orderJournals.set(branchId, journal);
+    }
+    return journal;
+  }
+
+  function getOrderIndex(branchId: string): OrderIndex {
+    let index = orderIndexes.get(branchId);
+    if (!index) {
+      index = createOrderIndex();
+      orderIndexes.set(branchId, index);
+    }
+    return index;
+  }
+
+  // Aktif sipariş listesi topluca değiştiğinde indeksler yeniden kurulur
+  function setOrders(branchId: string, orders: Order[]): void {
+    getBranchState(branchId).orders = orders;
+    getOrderIndex(branchId).rebuild(orders);
+  }
+
+  function getArchive(branchId: string): OrderArchive {
+    let archive = archives.get(branchId);
+    if (!archive) {
+      archive = createOrderArchive(join(branchDir(branchId), 'archive'));
+      archives.set(branchId, archive);
+    }
+    return archive;
+  }
+
+  // Verilen kayıtları branchId'ye göre gruplayıp ilgili koleksiyona yerleştir
+  function distribute<C extends StateCollection>(collection: C, rows: CollectionRows[C][]): void {
+    branchStates.forEach((state) => {
+      state[collection] = [];
+    });
+    rows.forEach((row) => {
+      getBranchState(rowBranchId(row))[collection].push(row);
+    });
+    if (collection === 'orders') {
+      branchStates.forEach((state, branchId) => getOrderIndex(branchId).rebuild(state.orders));
+    }
+  }
+
+  // Yüklenecek şubeler: branches.json, varsayılan şube ve diskte klasörü olan şubeler
+  function listBranchIds(): string[] {
+    const branches = readJsonFile<{ id: string }>(join(dataDir, 'branches.json'));
+    const ids = new Set<string>([DEFAULT_BRANCH, ...branches.map((b) => b.id)]);
+    if (existsSync(dataDir)) {
+      readdirSync(dataDir, { withFileTypes: true }).forEach((entry) => {
+        if (entry.isDirectory()) {
+          ids.add(entry.name);
+        }
+      });
+    }
+    return [...ids].filter(isValidBranchId);
+  }
+
+  // Tek seferlik geçiş: eski global data/*.json dosyalarını şube klasörlerine böl.
+  // Geçişten sonra eski dosyalar *.migrated olarak saklanır, böylece tekrar çalışmaz.
+  function migrateToBranchShards(): string[] {
+    const migrated: string[] = [];
+    collections.forEach((collection) => {
+      const legacyPath = join(dataDir, collectionFiles[collection]);
+      if (!existsSync(legacyPath)) return;
+
+      // Bozuk dosya sessizce boş kabul edilirse veri kaybolur; geçişi durdur
+      const rows: Array<{ branchId?: string }> = JSON.parse(readFileSync(legacyPath, 'utf-8'));
+      const grouped = new Map<string, unknown[]>();
+      rows.forEach((row) => {
+        const id = rowBranchId(row);
+        if (!grouped.has(id)) grouped.set(id, []);
+        grouped.get(id)!.push(row);
+      });
+      grouped.forEach((branchRows, branchId) => {
+        const dir = branchDir(branchId);
+        mkdirSync(dir, { recursive: true });
+        writeFileSync(join(dir, collectionFiles[collection]), JSON.stringify(branchRows, null, 2));
+      });
+
+      renameSync(legacyPath, `${legacyPath}.migrated`);
+      migrated.push(collectionFiles[collection]);
+    });
+
+    // Eski global günlükteki kayıtlar şube günlüklerine aktarılır
+    const legacyJournal = createOrderJournal(join(dataDir, 'orders.journal'));
+    if (legacyJournal.beginCompaction()) {
+      legacyJournal.readAll().forEach((mutation) => {
+        const dir = branchDir(mutation.branchId);
+        mkdirSync(dir, { recursive: true });
+        appendFileSync(join(dir, 'orders.journal'), JSON.stringify(mutation) + '\n');
+      });
+      legacyJournal.finishCompaction();
+      migrated.push('orders.journal');
+    }
+
+    if (migrated.length > 0) {
+      console.log(`Veri dosyaları şube klasörlerine taşındı: ${migrated.join(', ')}`);
+    }
+    return migrated;
+  }
+
+  // Tek seferlik geçiş: şubenin completed-orders.json dosyası gün segmentlerine
+  // bölünür. Dosya, segmentler diske yazıldıktan sonra *.migrated olarak saklanır;
+  // arada çökme olursa geçiş tekrarlanır ve arşiv aynı kayıtları ikinci kez eklemez.
+  function migrateCompletedOrders(branchId: string): void {
+    const legacyPath = join(branchDir(branchId), collectionFiles.completedOrders);
+    if (!existsSync(legacyPath)) return;
+    getArchive(branchId).add('completed', readJsonFile<Order>(legacyPath));
+    commitPending()
+      .then(() => {
+        renameSync(legacyPath, `${legacyPath}.migrated`);
+        console.log(`Geçmiş siparişler arşiv segmentlerine taşındı (şube ${branchId})`);
+      })
+      .catch((error) => {
+        console.error(`Geçmiş siparişler arşive taşınamadı (şube ${branchId}):`, error);
+      });
+  }
+
+  function ensureLoaded(): void {
+    if (loaded) return;
+    loaded = true;
+    migrateToBranchShards();
+    listBranchIds().forEach((branchId) => {
+      const state = getBranchState(branchId);
+      const dir = branchDir(branchId);
+      state.users = readJsonFile(join(dir, collectionFiles.users));
+      state.menu = readJsonFile(join(dir, collectionFiles.menu));
+      state.orders = readOrdersFile(join(dir, collectionFiles.orders));
+      getOrderIndex(branchId).rebuild(state.orders);
+      migrateCompletedOrders(branchId);
+      // Anlık görüntünün üzerine günlükte kalan değişiklikleri uygula
+      getOrderJournal(branchId).readAll().forEach(applyMutation);
+    });
+  }
+
+  // Dosya içeriği commit anında serileştirilir; aynı pencerede yapılan
+  // değişiklikler tek yazmada toplanır. Siparişler sıkıştırılmış biçimde, elle
+  // düzenlenebilen kullanıcı ve menü dosyaları girintili yazılır.
+  function writeShard(branchId: string, collection: StateCollection): Promise<void> {
+    const dir = branchDir(branchId);
+    mkdirSync(dir, { recursive: true });
+    return scheduleWrite(join(dir, collectionFiles[collection]), () =>
+      collection === 'orders'
+        ? encodeOrders(branchId, branchStates.get(branchId)?.orders ?? [])
+        : JSON.stringify(branchStates.get(branchId)?.[collection] ?? [], null, 2)
+    );
+  }
+
+  // Şubenin günlüğünü kendi orders.json dosyasına katla.
+  // Aynı şube için sıkıştırmalar sırayla çalışır.
+  function compactBranchJournal(branchId: string): Promise<void> {
+    const previous = branchCompactions.get(branchId) ?? Promise.resolve();
+    const next = previous.then(async () => {
+      const journal = getOrderJournal(branchId);
+      // Tampondaki günlük satırları eski dosyaya yazılmadan adı değiştirilmemeli.
+      // Bekleyen arşiv segmentleri de burada yazılır: orders.json'dan çıkan bir
+      // sipariş arşivde bulunmadan diske inmez.
+      await commitPending();
+      journal.beginCompaction();
+      await writeShard(branchId, 'orders');
+      journal.finishCompaction();
+    });
+    branchCompactions.set(
+      branchId,
+      next.catch((error) => {
+        console.error(`Sipariş günlüğü sıkıştırılamadı (şube ${branchId}):`, error);
+      })
+    );
+    return next;
+  }
+
+  // Önceki günlerden kalan ödenmiş siparişler aktif listeden 'paid' arşivine alınır;
+  // böylece orders.json ve bellekteki liste yalnızca günün siparişleriyle sınırlı kalır.
+  function archivePaidOrders(): void {
+    const today = currentBusinessDay();
+    branchStates.forEach((state, branchId) => {
+      const settled = state.orders.filter((order) => order.isPaid && archiveDay(order) < today);
+      if (settled.length === 0) return;
+      getArchive(branchId).add('paid', settled);
+      const index = getOrderIndex(branchId);
+      settled.forEach((order) => index.remove(order));
+      const archived = new Set(settled);
+      state.orders = state.orders.filter((order) => !archived.has(order));
+      compactBranchJournal(branchId).catch(() => {});
+    });
+  }
+
+  async function compactOrderJournals(): Promise<void> {
+    const work: Promise<void>[] = [];
+    orderJournals.forEach((journal, branchId) => {
+      if (journal.pendingCount() > 0) {
+        work.push(compactBranchJournal(branchId));
+      }
+    });
+    await Promise.all(work);
+  }
+
+  // Write-through: bellek güncellendikten sonra yalnızca o şubenin dosyası yazılır.
+  // Sipariş koleksiyonlarının tam yazımı şubenin günlüğünü de sıkıştırır.
+  function persist(branchId: string, collection: StateCollection): void {
+    if (collection === 'orders') {
+      compactBranchJournal(branchId).catch(() => {});
+      return;
+    }
+    writeShard(branchId, collection);
+  }
+
+  // data/<branchId>/rollups.json; türetilmiş veri olduğu için girintisiz yazılır
+  function getRollups(branchId: string): Map<string, DailyRollup> {
+    let branchRollups = rollups.get(branchId);
+    if (!branchRollups) {
+      const rows = readJsonFile<DailyRollup>(join(branchDir(branchId), 'rollups.json'));
+      branchRollups = new Map(rows.map((rollup) => [rollup.day, rollup]));
+      rollups.set(branchId, branchRollups);
+    }
+    return branchRollups;
+  }
+
+  function findOrder(branchId: string, orderId: string): Order | undefined {
+    return orderIndexes.get(branchId)?.getOrder(orderId);
+  }
+
+  function findOrderItem(branchId: string, orderId: string, itemId: string): ItemRef | undefined {
+    const ref = orderIndexes.get(branchId)?.getItem(itemId);
+    return ref?.order.id === orderId ? ref : undefined;
+  }
+
+  // Günlük kayıtlarını belleğe uygular. Yeniden oynatma sırasında aynı kayıt
+  // anlık görüntüde zaten yer alıyor olabilir, bu yüzden her işlem idempotenttir.
+  function applyMutation(mutation: OrderMutation): void {
+    switch (mutation.op) {
+      case 'created': {
+        const state = getBranchState(mutation.branchId);
+        const archive = getArchive(mutation.branchId);
+        const known =
+          findOrder(mutation.branchId, mutation.order.id) ||
+          archive.has('completed', mutation.order) ||
+          archive.has('paid', mutation.order);
+        if (!known) {
+          state.orders.push(mutation.order);
+          getOrderIndex(mutation.branchId).add(mutation.order);
+        }
+        break;
+      }
+      case 'itemStatus': {
+        const item = findOrderItem(mutation.branchId, mutation.orderId, mutation.itemId)?.item;
+        if (item) {
+          item.status = mutation.status;
+          if (mutation.cancelledReason) {
+            item.cancelledReason = mutation.cancelledReason;
+          }
+        }
+        break;
+      }
+      case 'tableMoved': {
+        const order = findOrder(mutation.branchId, mutation.orderId);
+        if (order) {
+          getOrderIndex(mutation.branchId).moveTable(order, mutation.tableNumber);
+        }
+        break;
+      }
+      case 'paid': {
+        mutation.orderIds.forEach((orderId) => {
+          const order = findOrder(mutation.branchId, orderId);
+          if (order) {
+            order.payment = mutation.payment;
+            order.isPaid = true;
+            getOrderIndex(mutation.branchId).markPaid(order);
+          }
+        });
+        break;
+      }
+      case 'completed': {
+        const state = getBranchState(mutation.branchId);
+        const index = getOrderIndex(mutation.branchId);
+        const emptied = new Set<Order>();
+        mutation.moves.forEach(({ orderId, itemIds }) => {
+          const order = findOrder(mutation.branchId, orderId);
+          if (!order) return;
+          const moved = order.items.filter((item) => itemIds.includes(item.id));
+          if (moved.length === 0) return;
+          getArchive(mutation.branchId).add('completed', [
+            { ...order, items: moved, completedAt: mutation.completedAt } as Order,
+          ]);
+          index.removeItems(order, itemIds);
+          order.items = order.items.filter((item) => !itemIds.includes(item.id));
+          if (order.items.length === 0) {
+            index.remove(order);
+            emptied.add(order);
+          }
+        });
+        if (emptied.size > 0) {
+          state.orders = state.orders.filter((order) => !emptied.has(order));
+        }
+        break;
+      }
+    }
+  }
+
+  // Aktif siparişler + yalnızca aralıkla kesişen 'paid' segmentleri. Geçmişe taşınan
+  // kalemler ödenmemiş siparişlerin anlık görüntüsü olduğu için rapora girmez.
+  function* streamPaidOrders(branchId: string, start: Date, end: Date): Generator<Order> {
+    ensureLoaded();
+    const index = orderIndexes.get(branchId);
+    if (!index) return;
+    const live = index
+      .between(start.getTime(), end.getTime())
+      .filter((order) => order.isPaid && !!order.payment);
+    yield* live;
+    // Arşivlendikten sonra çökme olursa sipariş iki yerde de bulunabilir
+    const liveIds = new Set(live.map((order) => order.id));
+    for (const order of getArchive(branchId).streamBetween('paid', start, end)) {
+      if (!liveIds.has(order.id)) yield order;
+    }
+  }
+
+  // Tekil sipariş değişiklikleri: tüm dosyayı yeniden yazmak yerine günlüğe eklenir
+  function recordMutation(mutation: OrderMutation): void {
+    ensureLoaded();
+    const journal = getOrderJournal(mutation.branchId);
+    applyMutation(mutation);
+    void journal.append(mutation);
+  }
+
+  return {
+    name: 'json',
+
+    init() {
+      ensureLoaded();
+    },
+
+    read(collection, branchId) {
+      ensureLoaded();
+      if (collection === 'completedOrders') {
+        const branchIds = branchId !== undefined ? [branchId] : [...branchStates.keys()];
+        return branchIds.flatMap((id) => getArchive(id).readAll('completed')) as any[];
+      }
+      const stateCollection = collection as StateCollection;
+      if (branchId !== undefined) {
+        // Çağıranlar diziyi değiştirebilsin diye kopya döndür
+        return [...(branchStates.get(branchId)?.[stateCollection] ?? [])] as any[];
+      }
+      const all: any[] = [];
+      branchStates.forEach((state) => {
+        all.push(...state[stateCollection]);
+      });
+      return all;
+    },
+
+    write(collection, rows, branchId) {
+      ensureLoaded();
+      if (collection === 'completedOrders') {
+        // Yalnızca değişen gün segmentleri yazılır; boşalan segmentler silinir
+        const grouped = new Map<string, Order[]>();
+        if (branchId !== undefined) {
+          grouped.set(branchId, rows as Order[]);
+        } else {
+          branchStates.forEach((_, id) => grouped.set(id, []));
+          (rows as Order[]).forEach((row) => {
+            const id = rowBranchId(row);
+            if (!grouped.has(id)) grouped.set(id, []);
+            grouped.get(id)!.push(row);
+          });
+        }
+        grouped.forEach((branchRows, id) => getArchive(id).replace('completed', branchRows));
+        return;
+      }
+      const stateCollection = collection as StateCollection;
+      if (branchId !== undefined) {
+        branchDir(branchId);
+        if (stateCollection === 'orders') {
+          setOrders(branchId, [...rows] as Order[]);
+        } else {
+          getBranchState(branchId)[stateCollection] = [...rows] as any[];
+        }
+        persist(branchId, stateCollection);
+        return;
+      }
+      distribute(stateCollection, rows as any[]);
+      branchStates.forEach((_, id) => persist(id, stateCollection));
+    },
+
+    appendOrder(branchId, order) {
+      recordMutation({ op: 'created', branchId, order });
+    },
+
+    updateOrderItemStatus(branchId, orderId, itemId, status, cancelledReason) {
+      recordMutation({
+        op: 'itemStatus',
+        branchId,
+        orderId,
+        itemId,
+        status,
+        ...(status === 'CANCELLED' && cancelledReason ? { cancelledReason } : {}),
+      });
+    },
+
+    moveOrderTable(branchId, orderId, tableNumber) {
+      recordMutation({ op: 'tableMoved', branchId, orderId, tableNumber });
+    },
+
+    markOrdersPaid(branchId, orderIds, payment) {
+      recordMutation({ op: 'paid', branchId, orderIds, payment });
+    },
+
+    moveItemsToCompleted(branchId, moves, completedAt) {
+      if (moves.length === 0) return;
+      recordMutation({ op: 'completed', branchId, moves, completedAt });
+    },
+
+    findOrder(branchId, orderId) {
+      ensureLoaded();
+      return findOrder(branchId, orderId);
+    },
+
+    findOrderItem(branchId, orderId, itemId) {
+      ensureLoaded();
+      return findOrderItem(branchId, orderId, itemId);
+    },
+
+    findUnpaidOrdersByTable(branchId, tableNumber) {
+      ensureLoaded();
+      return orderIndexes.get(branchId)?.unpaidByTable(tableNumber) ?? [];
+    },
+
+    findPaidOrdersBetween(branchId, start, end) {
+      return [...streamPaidOrders(branchId, start, end)];
+    },
+
+    streamPaidOrdersBetween(branchId, start, end) {
+      return streamPaidOrders(branchId, start, end);
+    },
+
+    clearRange(branchId, start, end, keepDay) {
+      ensureLoaded();
+      const state = getBranchState(branchId);
+      const index = getOrderIndex(branchId);
+      // Aralığın sınırları zaman indeksinde ikili aramayla bulunur
+      const removed = index
+        .between(start.getTime(), end.getTime())
+        .filter((order) => archiveDay(order) !== keepDay);
+      const removedLive = removed.length;
+      if (removedLive > 0) {
+        removed.forEach((order) => index.remove(order));
+        const removedSet = new Set(removed);
+        state.orders = state.orders.filter((order) => !removedSet.has(order));
+        persist(branchId, 'orders');
+      }
+      const archive = getArchive(branchId);
+      return {
+        removedOrders: removedLive + archive.removeBetween('paid', start, end, keepDay),
+        removedCompletedOrders: archive.removeBetween('completed', start, end, keepDay),
+      };
+    },
+
+    readDailyRollups(branchId) {
+      return [...getRollups(branchId).values()];
+    },
+
+    saveDailyRollups(branchId, changed, removedDays) {
+      const branchRollups = getRollups(branchId);
+      changed.forEach((rollup) => branchRollups.set(rollup.day, rollup));
+      removedDays.forEach((day) => branchRollups.delete(day));
+      const dir = branchDir(branchId);
+      mkdirSync(dir, { recursive: true });
+      scheduleWrite(join(dir, 'rollups.json'), () =>
+        JSON.stringify([...branchRollups.values()].sort((a, b) => a.day.localeCompare(b.day)))
+      );
+    },
+
+    verifyIndexes() {
+      ensureLoaded();
+      const problems: string[] = [];
+      branchStates.forEach((state, branchId) => {
+        getOrderIndex(branchId)
+          .verify(state.orders)
+          .forEach((problem) => problems.push(`şube ${branchId}: ${problem}`));
+      });
+      return problems;
+    },
+
+    startMaintenance() {
+      const timer = setInterval(() => {
+        archivePaidOrders();
+        compactOrderJournals().catch(() => {});
+      }, COMPACTION_INTERVAL_MS);
+      timer.unref();
+    },
+
+    // Bekleyen sıkıştırmaları ve yazmaları tamamla (kapanış ve testler için)
+    async flush() {
+      await Promise.all(branchCompactions.values());
+      await flush();
+    },
+  };
+}
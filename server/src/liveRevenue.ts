@@ -0,0 +1,94 @@
+import type { Order, OrderItem, OrderStatus } from './types.js';
+import { summarizePaidOrders } from './analytics.js';
+import { currentBusinessDay, dayEnd, dayStart } from './businessDay.js';
+
+// Şube başına, iş günü (businessDay.ts) başına güncel ciro toplamları. Ödeme ve kalem
+// iptallerinde O(1) güncellenir; /api/reports/live bunları hesaplamadan döndürür.
+// Gün değiştiğinde veya şube ilk kez sorulduğunda analiz deposundan bir kez kurulur.
+export interface LiveRevenue {
+  businessDay: string;
+  totalRevenue: number;
+  orderCount: number;
+  waiterSales: Record<string, { name: string; sales: number }>;
+  paymentMethods: { cash: number; card: number };
+  cancelledAmount: number;
+}
+
+const liveTotals = new Map<string, LiveRevenue>();
+
+function seed(branchId: string, businessDay: string): LiveRevenue {
+  const { totalRevenue, orderCount, waiterSales, paymentMethods, cancelledAmount } = summarizePaidOrders(
+    branchId,
+    new Date(dayStart(businessDay)),
+    new Date(dayEnd(businessDay)),
+    true
+  );
+  const totals = { businessDay, totalRevenue, orderCount, waiterSales, paymentMethods, cancelledAmount };
+  liveTotals.set(branchId, totals);
+  return totals;
+}
+
+// Bugünün toplamları yoksa (veya gün değiştiyse) null
+function currentTotals(branchId: string): LiveRevenue | null {
+  const totals = liveTotals.get(branchId);
+  return totals && totals.businessDay === currentBusinessDay() ? totals : null;
+}
+
+export function getLiveRevenue(branchId: string): LiveRevenue {
+  return currentTotals(branchId) ?? seed(branchId, currentBusinessDay());
+}
+
+// Metin öneki (startsWith) iş günü UTC değilse yanlış olur; epoch-ms iş gününün
+// sınırlarıyla karşılaştırılır
+function createdOnDay(order: Order, businessDay: string): boolean {
+  const createdAt = Date.parse(order.createdAt);
+  return createdAt >= dayStart(businessDay) && createdAt <= dayEnd(businessDay);
+}
+
+function itemAmount(item: OrderItem): number {
+  return item.price * item.quantity;
+}
+
+// recordPaidOrders (analytics) sonrasında çağrılmalı: toplamlar henüz kurulmamışsa
+// analiz deposundan kurulur ve bu siparişler zaten dahil olur.
+export function recordLivePayment(branchId: string, orders: Order[]): LiveRevenue {
+  const totals = currentTotals(branchId);
+  if (!totals) return getLiveRevenue(branchId);
+
+  orders.forEach((order) => {
+    if (!order.payment || !createdOnDay(order, totals.businessDay)) return;
+    const amount = order.payment.finalAmount;
+    totals.totalRevenue += amount;
+    totals.orderCount++;
+    if (order.payment.method === 'cash') totals.paymentMethods.cash += amount;
+    else totals.paymentMethods.card += amount;
+    if (order.waiterId && order.waiterName) {
+      if (!totals.waiterSales[order.waiterId]) {
+        totals.waiterSales[order.waiterId] = { name: order.waiterName, sales: 0 };
+      }
+      totals.waiterSales[order.waiterId].sales += amount;
+    }
+    order.items.forEach((item) => {
+      if (item.status === 'CANCELLED') totals.cancelledAmount += itemAmount(item);
+    });
+  });
+  return totals;
+}
+
+// Ödenmiş bir siparişin kalemi iptal edildiğinde (veya iptali geri alındığında).
+// Toplam değişmediyse null döner.
+export function recordLiveItemStatus(
+  branchId: string,
+  order: Order,
+  item: OrderItem,
+  previousStatus: OrderStatus,
+  status: OrderStatus
+): LiveRevenue | null {
+  const totals = currentTotals(branchId);
+  if (!totals || !order.isPaid || !createdOnDay(order, totals.businessDay)) return null;
+  const wasCancelled = previousStatus === 'CANCELLED';
+  const isCancelled = status === 'CANCELLED';
+  if (wasCancelled === isCancelled) return null;
+  totals.cancelledAmount += isCancelled ? itemAmount(item) : -itemAmount(item);
+  return totals;
+}
@@ -0,0 +1,37 @@
+import { closeSync, openSync, readSync } from 'fs';
+import { StringDecoder } from 'string_decoder';
+
+// Satır başına bir JSON kaydı (NDJSON). Dosya sabit boyutlu parçalar halinde
+// okunur; bellekte aynı anda yalnızca bir parça ve o anki satır bulunur.
+const CHUNK_SIZE = 64 * 1024;
+
+export function toNdjson(rows: unknown[]): string {
+  return rows.map((row) => JSON.stringify(row)).join('\n') + (rows.length > 0 ? '\n' : '');
+}
+
+export function* readNdjsonLines(path: string): Generator<string> {
+  let fd: number;
+  try {
+    fd = openSync(path, 'r');
+  } catch (error: any) {
+    if (error.code === 'ENOENT') return;
+    throw error;
+  }
+  try {
+    const buffer = Buffer.alloc(CHUNK_SIZE);
+    const decoder = new StringDecoder('utf8');
+    let rest = '';
+    let bytesRead: number;
+    while ((bytesRead = readSync(fd, buffer, 0, CHUNK_SIZE, null)) > 0) {
+      const lines = (rest + decoder.write(buffer.subarray(0, bytesRead))).split('\n');
+      rest = lines.pop()!;
+      for (const line of lines) {
+        if (line.trim()) yield line;
+      }
+    }
+    rest += decoder.end();
+    if (rest.trim()) yield rest;
+  } finally {
+    closeSync(fd);
+  }
+}
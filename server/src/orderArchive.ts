@@ -0,0 +1,248 @@
+import { existsSync, mkdirSync, readdirSync, readFileSync, unlinkSync, writeFileSync } from 'fs';
+import { join } from 'path';
+import type { Order } from './types.js';
+import { addDays, dayEnd, dayOf, dayStart } from './businessDay.js';
+import { readNdjsonLines } from './ndjson.js';
+import { decodeOrderLines, encodeOrderLines } from './orderCodec.js';
+import { scheduleDelete, scheduleWrite } from './persistence.js';
+
+// Gün bazlı sipariş arşivi: data/<branchId>/archive/<tür>/YYYY-MM-DD.ndjson.
+// 'completed' mutfak/bar'ın geçmişe taşıdığı kalemler, 'paid' ise aktif listeden
+// çıkan ödenmiş siparişlerdir. Segmentler ihtiyaç oldukça yüklenir; her segmentin
+// kayıt sayısı manifest.json'da tutulur, böylece silme işlemi dosyayı açmadan yapılır.
+// Segmentler başlık satırı ve satır başına bir sipariş içerir (orderCodec.ts);
+// raporlar onları satır satır okur.
+export type ArchiveKind = 'paid' | 'completed';
+
+const SEGMENT_CACHE_SIZE = 64;
+const SEGMENT_FILE_PATTERN = /^(\d{4}-\d{2}-\d{2})\.ndjson$/;
+const LEGACY_SEGMENT_PATTERN = /^(\d{4}-\d{2}-\d{2})\.json$/;
+
+type Manifest = Record<ArchiveKind, Record<string, number>>;
+
+export interface OrderArchive {
+  // Aynı kayıt (id + completedAt) ikinci kez eklenmez
+  add(kind: ArchiveKind, orders: Order[]): void;
+  // Siparişin gününe ait segmentte aynı id var mı
+  has(kind: ArchiveKind, order: Order): boolean;
+  readAll(kind: ArchiveKind): Order[];
+  // Aralıkla kesişen segmentleri önbelleğe almadan kayıt kayıt okur
+  streamBetween(kind: ArchiveKind, start: Date, end: Date): Generator<Order>;
+  replace(kind: ArchiveKind, orders: Order[]): void;
+  // keepDay gününe ait kayıtlar korunur; silinen kayıt sayısını döndürür
+  removeBetween(kind: ArchiveKind, start: Date, end: Date, keepDay: string): number;
+}
+
+// createdAt'in iş günü (businessDay.ts); segment anahtarı
+export function archiveDay(order: Order): string {
+  return dayOf(Date.parse(order.createdAt));
+}
+
+// Segmentin kapsayabileceği zaman aralığı. BUSINESS_TZ sonradan değiştirilirse eski
+// segmentler eski gün anahtarlarıyla kalır; saat farkı bir günü aşmadığı için
+// komşu günler de dahil edilir.
+function segmentStart(day: string): number {
+  return dayStart(addDays(day, -1));
+}
+
+function segmentEnd(day: string): number {
+  return dayEnd(addDays(day, 1));
+}
+
+// createdAt her zaman toISOString() biçiminde; kayıt başına Date oluşturmak
+// yerine ISO metinleri karşılaştırılır
+function inRange(order: Order, startIso: string, endIso: string): boolean {
+  return order.createdAt >= startIso && order.createdAt <= endIso;
+}
+
+// Aynı kayıt iki kez arşivlenmesin (çökme sonrası yeniden oynatma için)
+function recordKey(order: Order): string {
+  return `${order.id}|${(order as any).completedAt ?? ''}`;
+}
+
+function groupByDay(orders: Order[]): Map<string, Order[]> {
+  const groups = new Map<string, Order[]>();
+  orders.forEach((order) => {
+    const day = archiveDay(order);
+    if (!groups.has(day)) groups.set(day, []);
+    groups.get(day)!.push(order);
+  });
+  return groups;
+}
+
+function streamSegment(path: string): Generator<Order> {
+  return decodeOrderLines(readNdjsonLines(path), path);
+}
+
+function readSegment(path: string): Order[] {
+  return [...streamSegment(path)];
+}
+
+// Önceki sürümün JSON dizisi segmentlerini NDJSON'a çevir
+function convertLegacySegments(kindDir: string): void {
+  readdirSync(kindDir).forEach((file) => {
+    const match = LEGACY_SEGMENT_PATTERN.exec(file);
+    if (!match) return;
+    const legacyPath = join(kindDir, file);
+    const rows: Order[] = JSON.parse(readFileSync(legacyPath, 'utf-8'));
+    writeFileSync(join(kindDir, `${match[1]}.ndjson`), encodeOrderLines(rows));
+    unlinkSync(legacyPath);
+  });
+}
+
+export function createOrderArchive(dir: string): OrderArchive {
+  const manifestPath = join(dir, 'manifest.json');
+  const cache = new Map<string, Order[]>();
+  // Diske yazılmayı bekleyen segmentler önbellekten atılmaz
+  const pendingWrites = new Map<string, number>();
+  const manifest = loadManifest();
+
+  function segmentPath(kind: ArchiveKind, day: string): string {
+    return join(dir, kind, `${day}.ndjson`);
+  }
+
+  // Manifest yoksa (ilk çalıştırma) segmentler taranarak yeniden oluşturulur
+  function loadManifest(): Manifest {
+    (['paid', 'completed'] as ArchiveKind[]).forEach((kind) => {
+      const kindDir = join(dir, kind);
+      if (existsSync(kindDir)) convertLegacySegments(kindDir);
+    });
+    if (existsSync(manifestPath)) {
+      try {
+        return JSON.parse(readFileSync(manifestPath, 'utf-8'));
+      } catch (error) {
+        console.error(`Arşiv manifesti bozuk, yeniden oluşturuluyor: ${manifestPath}`);
+      }
+    }
+    const rebuilt: Manifest = { paid: {}, completed: {} };
+    (Object.keys(rebuilt) as ArchiveKind[]).forEach((kind) => {
+      const kindDir = join(dir, kind);
+      if (!existsSync(kindDir)) return;
+      readdirSync(kindDir).forEach((file) => {
+        const match = SEGMENT_FILE_PATTERN.exec(file);
+        if (match) {
+          rebuilt[kind][match[1]] = readSegment(join(kindDir, file)).length;
+        }
+      });
+    });
+    return rebuilt;
+  }
+
+  function days(kind: ArchiveKind): string[] {
+    return Object.keys(manifest[kind]).sort();
+  }
+
+  function overlappingDays(kind: ArchiveKind, start: Date, end: Date): string[] {
+    return days(kind).filter((day) => segmentEnd(day) >= start.getTime() && segmentStart(day) <= end.getTime());
+  }
+
+  function load(kind: ArchiveKind, day: string): Order[] {
+    const key = `${kind}/${day}`;
+    let rows = cache.get(key);
+    if (rows) {
+      // LRU: son kullanılanı sona taşı
+      cache.delete(key);
+      cache.set(key, rows);
+      return rows;
+    }
+    rows = manifest[kind][day] !== undefined ? readSegment(segmentPath(kind, day)) : [];
+    cache.set(key, rows);
+    for (const cachedKey of cache.keys()) {
+      if (cache.size <= SEGMENT_CACHE_SIZE) break;
+      if (!pendingWrites.has(cachedKey)) cache.delete(cachedKey);
+    }
+    return rows;
+  }
+
+  function persistSegment(kind: ArchiveKind, day: string, rows: Order[]): void {
+    const key = `${kind}/${day}`;
+    const path = segmentPath(kind, day);
+    cache.set(key, rows);
+    pendingWrites.set(key, (pendingWrites.get(key) ?? 0) + 1);
+
+    let write: Promise<void>;
+    if (rows.length === 0) {
+      delete manifest[kind][day];
+      write = scheduleDelete(path);
+    } else {
+      mkdirSync(join(dir, kind), { recursive: true });
+      manifest[kind][day] = rows.length;
+      write = scheduleWrite(path, () => encodeOrderLines(cache.get(key) ?? []));
+    }
+    write
+      .catch(() => {})
+      .finally(() => {
+        const remaining = (pendingWrites.get(key) ?? 1) - 1;
+        if (remaining > 0) pendingWrites.set(key, remaining);
+        else pendingWrites.delete(key);
+      });
+
+    mkdirSync(dir, { recursive: true });
+    scheduleWrite(manifestPath, () => JSON.stringify(manifest, null, 2));
+  }
+
+  return {
+    add(kind, orders) {
+      groupByDay(orders).forEach((dayOrders, day) => {
+        const rows = load(kind, day);
+        const known = new Set(rows.map(recordKey));
+        const fresh = dayOrders.filter((order) => !known.has(recordKey(order)));
+        if (fresh.length > 0) {
+          persistSegment(kind, day, [...rows, ...fresh]);
+        }
+      });
+    },
+
+    has(kind, order) {
+      return load(kind, archiveDay(order)).some((row) => row.id === order.id);
+    },
+
+    readAll(kind) {
+      return days(kind).flatMap((day) => load(kind, day));
+    },
+
+    // Yalnızca aralıkla kesişen segmentler açılır. Önbellekteki (ve diske yazılmayı
+    // bekleyen) segmentler bellekten, diğerleri dosyadan satır satır okunur.
+    *streamBetween(kind, start, end) {
+      const startIso = start.toISOString();
+      const endIso = end.toISOString();
+      for (const day of overlappingDays(kind, start, end)) {
+        const rows = cache.get(`${kind}/${day}`) ?? streamSegment(segmentPath(kind, day));
+        for (const order of rows) {
+          if (inRange(order, startIso, endIso)) yield order;
+        }
+      }
+    },
+
+    replace(kind, orders) {
+      const groups = groupByDay(orders);
+      days(kind).forEach((day) => {
+        if (!groups.has(day)) persistSegment(kind, day, []);
+      });
+      groups.forEach((rows, day) => persistSegment(kind, day, rows));
+    },
+
+    // Tamamen aralıkta kalan segmentler açılmadan silinir; sınır günleri ve keepDay'e
+    // komşu segmentler kayıt kayıt filtrelenir
+    removeBetween(kind, start, end, keepDay) {
+      const startIso = start.toISOString();
+      const endIso = end.toISOString();
+      let removed = 0;
+      overlappingDays(kind, start, end).forEach((day) => {
+        const nearKeepDay = day >= addDays(keepDay, -1) && day <= addDays(keepDay, 1);
+        if (!nearKeepDay && segmentStart(day) >= start.getTime() && segmentEnd(day) <= end.getTime()) {
+          removed += manifest[kind][day];
+          persistSegment(kind, day, []);
+          return;
+        }
+        const rows = load(kind, day);
+        const kept = rows.filter((order) => !inRange(order, startIso, endIso) || archiveDay(order) === keepDay);
+        if (kept.length !== rows.length) {
+          removed += rows.length - kept.length;
+          persistSegment(kind, day, kept);
+        }
+      });
+      return removed;
+    },
+  };
+}
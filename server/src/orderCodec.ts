@@ -0,0 +1,288 @@
+import type { Order, OrderItem, Payment } from './types.js';
+
+// Siparişlerin diskteki sıkıştırılmış biçimi (orders.json ve arşiv segmentleri).
+// Girinti yok; branchId kapsayıcıya taşınır; durum, kategori ve ödeme yöntemi
+// metinleri ile garson/kasiyer ve menü ürünü adları sözlükle sayıya çevrilir.
+// Siparişler anahtar adları tekrar etmesin diye sabit sıralı dizilerdir:
+//   sipariş: [id, createdAt, personel, masa, toplam, ödendi, ödeme, kalemler, ek?]
+//   kalem:   [id, menü, adet, fiyat, kategori, durum, iptalNedeni?, ek?]
+//   ödeme:   [yöntem, tutar, indirim, ödenen, paidAt, kasiyer, ek?]
+// "ek", bu alanların dışında kalan (completedAt gibi) veya kapsayıcının branchId'sinden
+// farklı olan alanları taşır; çözümlenen nesneler yazılanlarla aynıdır.
+// Eski biçimler (sipariş dizisi / satır başına sipariş) okunurken tanınır.
+export const ORDER_FORMAT = 'orders/1';
+
+interface OrderHeader {
+  format: typeof ORDER_FORMAT;
+  branchId: string;
+  statuses: string[];
+  categories: string[];
+  methods: string[];
+  // [id, ad]
+  staff: Array<[string, string]>;
+  menu: Array<[string, string]>;
+}
+
+type Extra = Record<string, unknown>;
+// Sözlükte olmayan değer (ör. boş) olduğu gibi yazılır
+type Code = number | string | null;
+type EncodedPayment = [Code, number, number | null, number, string, Code, Extra?];
+type EncodedItem = [string, Code, number, number, Code, Code, (string | null)?, Extra?];
+type EncodedOrder = [
+  string,
+  string,
+  Code,
+  number | null,
+  number,
+  0 | 1,
+  EncodedPayment | null,
+  EncodedItem[],
+  Extra?,
+];
+
+const ORDER_FIELDS = new Set([
+  'id',
+  'waiterId',
+  'waiterName',
+  'tableNumber',
+  'items',
+  'createdAt',
+  'totalAmount',
+  'payment',
+  'isPaid',
+  'branchId',
+]);
+const ITEM_FIELDS = new Set([
+  'id',
+  'menuItemId',
+  'menuItemName',
+  'quantity',
+  'price',
+  'category',
+  'status',
+  'cancelledReason',
+  'branchId',
+]);
+const PAYMENT_FIELDS = new Set(['method', 'amount', 'discount', 'finalAmount', 'paidAt', 'cashierId', 'cashierName']);
+
+function extraFields(row: object, known: Set<string>, branchId?: string): Extra | undefined {
+  let extra: Extra | undefined;
+  for (const key in row) {
+    const value = (row as Extra)[key];
+    if (value === undefined || (known.has(key) && (key !== 'branchId' || value === branchId))) continue;
+    (extra ??= {})[key] = value;
+  }
+  return extra;
+}
+
+interface Dictionary {
+  codes: Map<string, number>;
+  values: string[];
+}
+
+function createDictionary(): Dictionary {
+  return { codes: new Map(), values: [] };
+}
+
+function encodeValue(dictionary: Dictionary, value: string | undefined): Code {
+  if (typeof value !== 'string') return value ?? null;
+  let code = dictionary.codes.get(value);
+  if (code === undefined) {
+    code = dictionary.values.length;
+    dictionary.codes.set(value, code);
+    dictionary.values.push(value);
+  }
+  return code;
+}
+
+// Personel ve menü: id ile ad birlikte kodlanır (aynı id'nin adı değişmişse ayrı kod)
+interface PairDictionary {
+  codes: Map<string, Map<string, number>>;
+  pairs: Array<[string, string]>;
+}
+
+function createPairDictionary(): PairDictionary {
+  return { codes: new Map(), pairs: [] };
+}
+
+function encodePair(dictionary: PairDictionary, id: string, name: string): number {
+  let names = dictionary.codes.get(id);
+  if (!names) {
+    names = new Map();
+    dictionary.codes.set(id, names);
+  }
+  let code = names.get(name);
+  if (code === undefined) {
+    code = dictionary.pairs.length;
+    names.set(name, code);
+    dictionary.pairs.push([id, name]);
+  }
+  return code;
+}
+
+function createEncoder(branchId: string) {
+  const statuses = createDictionary();
+  const categories = createDictionary();
+  const methods = createDictionary();
+  const staff = createPairDictionary();
+  const menu = createPairDictionary();
+
+  function encodePayment(payment: Payment): EncodedPayment {
+    const encoded: EncodedPayment = [
+      encodeValue(methods, payment.method),
+      payment.amount,
+      payment.discount ?? null,
+      payment.finalAmount,
+      payment.paidAt,
+      encodePair(staff, payment.cashierId, payment.cashierName),
+    ];
+    const extra = extraFields(payment, PAYMENT_FIELDS);
+    if (extra) encoded.push(extra);
+    return encoded;
+  }
+
+  function encodeItem(item: OrderItem): EncodedItem {
+    const encoded: EncodedItem = [
+      item.id,
+      encodePair(menu, item.menuItemId, item.menuItemName),
+      item.quantity,
+      item.price,
+      encodeValue(categories, item.category),
+      encodeValue(statuses, item.status),
+    ];
+    const extra = extraFields(item, ITEM_FIELDS, branchId);
+    if (item.cancelledReason !== undefined || extra) encoded.push(item.cancelledReason ?? null);
+    if (extra) encoded.push(extra);
+    return encoded;
+  }
+
+  return {
+    encode(order: Order): EncodedOrder {
+      const encoded: EncodedOrder = [
+        order.id,
+        order.createdAt,
+        encodePair(staff, order.waiterId, order.waiterName),
+        order.tableNumber ?? null,
+        order.totalAmount,
+        order.isPaid ? 1 : 0,
+        order.payment ? encodePayment(order.payment) : null,
+        order.items.map(encodeItem),
+      ];
+      const extra = extraFields(order, ORDER_FIELDS, branchId);
+      if (extra) encoded.push(extra);
+      return encoded;
+    },
+
+    header(): OrderHeader {
+      return {
+        format: ORDER_FORMAT,
+        branchId,
+        statuses: statuses.values,
+        categories: categories.values,
+        methods: methods.values,
+        staff: staff.pairs,
+        menu: menu.pairs,
+      };
+    },
+  };
+}
+
+function createDecoder(header: OrderHeader) {
+  const { branchId, statuses, categories, methods, staff, menu } = header;
+  const lookup = (values: string[], code: Code): any => (typeof code === 'number' ? values[code] : code);
+
+  function decodePayment(encoded: EncodedPayment): Payment {
+    const [method, amount, discount, finalAmount, paidAt, cashier, extra] = encoded;
+    const [cashierId, cashierName] = staff[cashier as number];
+    const payment: Payment = { method: lookup(methods, method), amount, finalAmount, paidAt, cashierId, cashierName };
+    if (discount !== null) payment.discount = discount;
+    if (extra) Object.assign(payment, extra);
+    return payment;
+  }
+
+  function decodeItem(encoded: EncodedItem): OrderItem {
+    const [id, menuCode, quantity, price, category, status, cancelledReason, extra] = encoded;
+    const [menuItemId, menuItemName] = menu[menuCode as number];
+    const item: OrderItem = {
+      id,
+      menuItemId,
+      menuItemName,
+      quantity,
+      price,
+      category: lookup(categories, category),
+      status: lookup(statuses, status),
+      branchId,
+    };
+    if (cancelledReason != null) item.cancelledReason = cancelledReason;
+    if (extra) Object.assign(item, extra);
+    return item;
+  }
+
+  return (encoded: EncodedOrder): Order => {
+    const [id, createdAt, waiter, tableNumber, totalAmount, isPaid, payment, items, extra] = encoded;
+    const [waiterId, waiterName] = staff[waiter as number];
+    const order: Order = {
+      id,
+      waiterId,
+      waiterName,
+      items: items.map(decodeItem),
+      createdAt,
+      totalAmount,
+      isPaid: isPaid === 1,
+      branchId,
+    };
+    if (tableNumber !== null) order.tableNumber = tableNumber;
+    if (payment) order.payment = decodePayment(payment);
+    if (extra) Object.assign(order, extra);
+    return order;
+  };
+}
+
+function isHeader(value: unknown): value is OrderHeader {
+  return !!value && (value as OrderHeader).format === ORDER_FORMAT;
+}
+
+// orders.json: { ...başlık, orders: [...] }
+export function encodeOrders(branchId: string, orders: Order[]): string {
+  const encoder = createEncoder(branchId);
+  const rows = orders.map(encoder.encode);
+  return JSON.stringify({ ...encoder.header(), orders: rows });
+}
+
+// JSON.parse edilmiş orders.json içeriği; eski biçimde (Order[]) olduğu gibi döner
+export function decodeOrders(data: unknown): Order[] {
+  if (Array.isArray(data)) return data;
+  if (!isHeader(data)) throw new Error('Bilinmeyen sipariş dosyası biçimi');
+  return ((data as unknown as { orders: EncodedOrder[] }).orders ?? []).map(createDecoder(data));
+}
+
+// Arşiv segmenti: ilk satır başlık, sonraki her satır bir sipariş. Segmentteki
+// siparişlerin şubesi aynıdır; branchId ilk siparişten alınır.
+export function encodeOrderLines(orders: Order[]): string {
+  if (orders.length === 0) return '';
+  const encoder = createEncoder(orders[0].branchId);
+  const rows = orders.map((order) => JSON.stringify(encoder.encode(order)));
+  return `${JSON.stringify(encoder.header())}\n${rows.join('\n')}\n`;
+}
+
+// Satırlar okundukça çözülür; başlıksız (eski) segmentlerde her satır bir Order'dır
+export function* decodeOrderLines(lines: Iterable<string>, source: string): Generator<Order> {
+  let decode: ((encoded: EncodedOrder) => Order) | null = null;
+  let first = true;
+  for (const line of lines) {
+    let value: any;
+    try {
+      value = JSON.parse(line);
+    } catch (error) {
+      throw new Error(`Bozuk NDJSON satırı: ${source}`);
+    }
+    if (first) {
+      first = false;
+      if (isHeader(value)) {
+        decode = createDecoder(value);
+        continue;
+      }
+    }
+    yield decode ? decode(value) : value;
+  }
+}
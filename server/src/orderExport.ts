@@ -0,0 +1,114 @@
+import { Readable } from 'stream';
+import type { Order, OrderItem } from './types.js';
+
+// Muhasebe dışa aktarımı: sipariş kalemi başına bir satır (sipariş ve ödeme alanları
+// her satırda tekrarlanır). Satırlar siparişler okundukça üretilir; Readable.from
+// istemci okumadıkça üretimi durdurur, bu yüzden veri seti bellekte toplanmaz.
+export type ExportFormat = 'csv' | 'ndjson';
+
+const CHUNK_SIZE = 64 * 1024;
+
+const COLUMNS = [
+  'branchId',
+  'orderId',
+  'createdAt',
+  'tableNumber',
+  'waiterId',
+  'waiterName',
+  'orderTotal',
+  'itemId',
+  'menuItemId',
+  'menuItemName',
+  'category',
+  'quantity',
+  'price',
+  'lineTotal',
+  'itemStatus',
+  'cancelledReason',
+  'paymentMethod',
+  'paymentAmount',
+  'discount',
+  'finalAmount',
+  'paidAt',
+  'cashierId',
+  'cashierName',
+] as const;
+
+type ExportRow = Record<(typeof COLUMNS)[number], string | number | null>;
+
+export function isExportFormat(format: unknown): format is ExportFormat {
+  return format === 'csv' || format === 'ndjson';
+}
+
+// Kalemi kalmamış sipariş (kalemleri geçmiş siparişlere taşınmış) ödemesi
+// kaybolmasın diye kalem alanları boş tek satırla yazılır
+function exportRow(order: Order, item: OrderItem | null): ExportRow {
+  const payment = order.payment;
+  return {
+    branchId: order.branchId,
+    orderId: order.id,
+    createdAt: order.createdAt,
+    tableNumber: order.tableNumber ?? null,
+    waiterId: order.waiterId,
+    waiterName: order.waiterName,
+    orderTotal: order.totalAmount,
+    itemId: item?.id ?? null,
+    menuItemId: item?.menuItemId ?? null,
+    menuItemName: item?.menuItemName ?? null,
+    category: item?.category ?? null,
+    quantity: item?.quantity ?? null,
+    price: item?.price ?? null,
+    lineTotal: item ? item.price * item.quantity : null,
+    itemStatus: item?.status ?? null,
+    cancelledReason: item?.cancelledReason ?? null,
+    paymentMethod: payment?.method ?? null,
+    paymentAmount: payment?.amount ?? null,
+    discount: payment?.discount ?? null,
+    finalAmount: payment?.finalAmount ?? null,
+    paidAt: payment?.paidAt ?? null,
+    cashierId: payment?.cashierId ?? null,
+    cashierName: payment?.cashierName ?? null,
+  };
+}
+
+// RFC 4180: virgül, tırnak veya satır sonu içeren alanlar tırnak içine alınır
+function csvField(value: string | number | null): string {
+  if (value === null) return '';
+  const text = String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+function* exportLines(orders: Iterable<Order>, format: ExportFormat): Generator<string> {
+  if (format === 'csv') {
+    // BOM: Excel Türkçe karakterleri UTF-8 olarak okusun
+    yield `\uFEFF${COLUMNS.join(',')}\r\n`;
+  }
+  for (const order of orders) {
+    const items: Array<OrderItem | null> = order.items.length > 0 ? order.items : [null];
+    for (const item of items) {
+      const row = exportRow(order, item);
+      yield format === 'csv'
+        ? `${COLUMNS.map((column) => csvField(row[column])).join(',')}\r\n`
+        : `${JSON.stringify(row)}\n`;
+    }
+  }
+}
+
+// Satırlar ~64KB'lık parçalar halinde yazılır (satır başına ayrı write yerine)
+function* chunked(lines: Iterable<string>): Generator<string> {
+  let chunk = '';
+  for (const line of lines) {
+    chunk += line;
+    if (chunk.length >= CHUNK_SIZE) {
+      yield chunk;
+      chunk = '';
+    }
+  }
+  if (chunk) yield chunk;
+}
+
+// pipeline(createExportStream(...), res) ile kullanılır: istemci bağlantıyı kapatırsa
+// akış yok edilir ve kaynak generator'ların finally blokları (dosya kapatma) çalışır
+export function createExportStream(orders: Iterable<Order>, format: ExportFormat): Readable {
+  return Readable.from(chunked(exportLines(orders, format)), { objectMode: false });
+}
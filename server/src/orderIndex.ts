@@ -0,0 +1,221 @@
+import type { Order, OrderItem } from './types.js';
+
+// Bir şubenin aktif siparişleri için ikincil hash indeksleri. JSON arka ucu her
+// mutasyonda indeksleri de günceller; böylece sipariş/kalem/masa aramaları listeyi
+// taramadan yapılır. verify() indekslerin veriden sapmadığını kontrol eder.
+// Zaman indeksi siparişleri createdAt'in epoch-ms değerine göre sıralı tutar; aralık
+// sorguları sınırları ikili aramayla bulur, sipariş başına tarih ayrıştırılmaz.
+export interface ItemRef {
+  order: Order;
+  item: OrderItem;
+}
+
+export interface OrderIndex {
+  add(order: Order): void;
+  remove(order: Order): void;
+  rebuild(orders: Order[]): void;
+  getOrder(orderId: string): Order | undefined;
+  getItem(itemId: string): ItemRef | undefined;
+  unpaidByTable(tableNumber: number): Order[];
+  // createdAt'i [startMs, endMs] aralığındaki siparişler, zaman sırasıyla
+  between(startMs: number, endMs: number): Order[];
+  // Sipariş alanları değişmeden önce/sonra çağrılır
+  moveTable(order: Order, tableNumber: number): void;
+  markPaid(order: Order): void;
+  removeItems(order: Order, itemIds: string[]): void;
+  // Boş liste: indeksler tutarlı
+  verify(orders: Order[]): string[];
+}
+
+export function createOrderIndex(): OrderIndex {
+  const byId = new Map<string, Order>();
+  const byItemId = new Map<string, ItemRef>();
+  const unpaidTables = new Map<number, Set<Order>>();
+  // times[i], byTime[i] siparişinin createdAt değeri (epoch-ms); eşit zamanlar ekleme sırasında
+  let times: number[] = [];
+  let byTime: Order[] = [];
+
+  // times içinde değeri time'dan küçük olmayan (strict: büyük olan) ilk konum
+  function bound(time: number, strict: boolean): number {
+    let low = 0;
+    let high = times.length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      if (times[middle] < time || (strict && times[middle] === time)) low = middle + 1;
+      else high = middle;
+    }
+    return low;
+  }
+
+  // Siparişler çoğunlukla zaman sırasıyla gelir; bu durumda ekleme sona yapılır
+  function addToTime(order: Order): void {
+    const time = Date.parse(order.createdAt);
+    if (times.length === 0 || times[times.length - 1] <= time) {
+      times.push(time);
+      byTime.push(order);
+      return;
+    }
+    const at = bound(time, true);
+    times.splice(at, 0, time);
+    byTime.splice(at, 0, order);
+  }
+
+  function removeFromTime(order: Order): void {
+    const time = Date.parse(order.createdAt);
+    for (let at = bound(time, false); at < times.length && times[at] === time; at++) {
+      if (byTime[at] === order) {
+        times.splice(at, 1);
+        byTime.splice(at, 1);
+        return;
+      }
+    }
+  }
+
+  function addToTable(order: Order): void {
+    if (order.isPaid || order.tableNumber === undefined) return;
+    let bucket = unpaidTables.get(order.tableNumber);
+    if (!bucket) {
+      bucket = new Set();
+      unpaidTables.set(order.tableNumber, bucket);
+    }
+    bucket.add(order);
+  }
+
+  function removeFromTable(order: Order): void {
+    if (order.tableNumber === undefined) return;
+    const bucket = unpaidTables.get(order.tableNumber);
+    if (!bucket) return;
+    bucket.delete(order);
+    if (bucket.size === 0) unpaidTables.delete(order.tableNumber);
+  }
+
+  function addToMaps(order: Order): void {
+    byId.set(order.id, order);
+    order.items.forEach((item) => byItemId.set(item.id, { order, item }));
+    addToTable(order);
+  }
+
+  function add(order: Order): void {
+    addToMaps(order);
+    addToTime(order);
+  }
+
+  return {
+    add,
+
+    remove(order) {
+      if (byId.get(order.id) !== order) return;
+      byId.delete(order.id);
+      order.items.forEach((item) => {
+        if (byItemId.get(item.id)?.order === order) byItemId.delete(item.id);
+      });
+      removeFromTable(order);
+      removeFromTime(order);
+    },
+
+    // Zaman indeksi tek sıralamayla kurulur (sıra dışı eklemelerin kaydırmaları yerine)
+    rebuild(orders) {
+      byId.clear();
+      byItemId.clear();
+      unpaidTables.clear();
+      orders.forEach(addToMaps);
+      const entries = orders.map((order, position) => ({ order, position, time: Date.parse(order.createdAt) }));
+      entries.sort((a, b) => a.time - b.time || a.position - b.position);
+      times = entries.map((entry) => entry.time);
+      byTime = entries.map((entry) => entry.order);
+    },
+
+    getOrder(orderId) {
+      return byId.get(orderId);
+    },
+
+    getItem(itemId) {
+      return byItemId.get(itemId);
+    },
+
+    unpaidByTable(tableNumber) {
+      return [...(unpaidTables.get(tableNumber) ?? [])];
+    },
+
+    between(startMs, endMs) {
+      return byTime.slice(bound(startMs, false), bound(endMs, true));
+    },
+
+    moveTable(order, tableNumber) {
+      removeFromTable(order);
+      order.tableNumber = tableNumber;
+      addToTable(order);
+    },
+
+    markPaid(order) {
+      removeFromTable(order);
+    },
+
+    removeItems(order, itemIds) {
+      itemIds.forEach((itemId) => {
+        if (byItemId.get(itemId)?.order === order) byItemId.delete(itemId);
+      });
+    },
+
+    verify(orders) {
+      const problems: string[] = [];
+      let itemCount = 0;
+      let unpaidCount = 0;
+
+      orders.forEach((order) => {
+        if (byId.get(order.id) !== order) {
+          problems.push(`order ${order.id}: orderId indeksinde yok`);
+        }
+        order.items.forEach((item) => {
+          itemCount++;
+          const ref = byItemId.get(item.id);
+          if (ref?.order !== order || ref.item !== item) {
+            problems.push(`item ${item.id}: itemId indeksi order ${order.id} kalemini göstermiyor`);
+          }
+        });
+        if (!order.isPaid && order.tableNumber !== undefined) {
+          unpaidCount++;
+          if (!unpaidTables.get(order.tableNumber)?.has(order)) {
+            problems.push(`order ${order.id}: masa ${order.tableNumber} indeksinde yok`);
+          }
+        }
+      });
+
+      if (byId.size !== orders.length) {
+        problems.push(`orderId indeksinde ${byId.size} kayıt var, ${orders.length} bekleniyordu`);
+      }
+      if (byItemId.size !== itemCount) {
+        problems.push(`itemId indeksinde ${byItemId.size} kayıt var, ${itemCount} bekleniyordu`);
+      }
+      let indexedUnpaid = 0;
+      unpaidTables.forEach((bucket, tableNumber) => {
+        bucket.forEach((order) => {
+          indexedUnpaid++;
+          if (order.isPaid || order.tableNumber !== tableNumber) {
+            problems.push(`order ${order.id}: masa ${tableNumber} indeksinde yanlış yerde`);
+          }
+        });
+      });
+      if (indexedUnpaid !== unpaidCount) {
+        problems.push(`masa indeksinde ${indexedUnpaid} sipariş var, ${unpaidCount} bekleniyordu`);
+      }
+
+      if (byTime.length !== orders.length) {
+        problems.push(`zaman indeksinde ${byTime.length} sipariş var, ${orders.length} bekleniyordu`);
+      }
+      byTime.forEach((order, at) => {
+        if (byId.get(order.id) !== order) {
+          problems.push(`order ${order.id}: zaman indeksinde ama aktif listede yok`);
+        }
+        if (times[at] !== Date.parse(order.createdAt)) {
+          problems.push(`order ${order.id}: zaman indeksindeki createdAt eşleşmiyor`);
+        }
+        if (at > 0 && times[at - 1] > times[at]) {
+          problems.push(`order ${order.id}: zaman indeksi sıralı değil`);
+        }
+      });
+
+      return problems;
+    },
+  };
+}
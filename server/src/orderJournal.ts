@@ -0,0 +1,91 @@
+import { existsSync, readFileSync, renameSync, unlinkSync } from 'fs';
+import type { Order, OrderStatus, Payment } from './types.js';
+import { scheduleAppend } from './persistence.js';
+
+// Sipariş değişikliklerinin append-only günlüğü. Her kayıt tek satır JSON'dur;
+// periyodik sıkıştırma (compaction) günlüğü orders.json / completed-orders.json
+// anlık görüntüsüne katlar ve günlüğü sıfırlar. Eklemeler persistence katmanında
+// grup commit ile toplanır; dosya adı değiştirme/silme işlemleri senkrondur.
+export type OrderMutation =
+  | { op: 'created'; branchId: string; order: Order }
+  | {
+      op: 'itemStatus';
+      branchId: string;
+      orderId: string;
+      itemId: string;
+      status: OrderStatus;
+      cancelledReason?: string;
+    }
+  | { op: 'tableMoved'; branchId: string; orderId: string; tableNumber: number }
+  | { op: 'paid'; branchId: string; orderIds: string[]; payment: Payment }
+  | {
+      op: 'completed';
+      branchId: string;
+      moves: Array<{ orderId: string; itemIds: string[] }>;
+      completedAt: string;
+    };
+
+export interface OrderJournal {
+  path: string;
+  append(mutation: OrderMutation): Promise<void>;
+  readAll(): OrderMutation[];
+  pendingCount(): number;
+  beginCompaction(): boolean;
+  finishCompaction(): void;
+}
+
+function parseLines(path: string): OrderMutation[] {
+  if (!existsSync(path)) return [];
+  const records: OrderMutation[] = [];
+  const lines = readFileSync(path, 'utf-8').split('\n');
+  for (const line of lines) {
+    if (!line.trim()) continue;
+    try {
+      records.push(JSON.parse(line));
+    } catch (error) {
+      // Çökme anında yarım kalmış son satır; sonrasını okumaya gerek yok
+      console.error(`Bozuk günlük satırı atlandı (${path})`);
+      break;
+    }
+  }
+  return records;
+}
+
+export function createOrderJournal(path: string): OrderJournal {
+  const compactingPath = `${path}.compacting`;
+  let pending = parseLines(compactingPath).length + parseLines(path).length;
+
+  return {
+    path,
+
+    append(mutation) {
+      pending++;
+      return scheduleAppend(path, JSON.stringify(mutation));
+    },
+
+    // Başlangıçta yeniden oynatılacak kayıtlar: önce yarım kalmış sıkıştırma, sonra güncel günlük
+    readAll() {
+      return [...parseLines(compactingPath), ...parseLines(path)];
+    },
+
+    pendingCount() {
+      return pending;
+    },
+
+    // Günlüğü kenara al; bu noktadan sonraki kayıtlar yeni dosyaya yazılır
+    beginCompaction() {
+      if (existsSync(compactingPath)) return true;
+      if (!existsSync(path)) return false;
+      renameSync(path, compactingPath);
+      pending = 0;
+      return true;
+    },
+
+    // Anlık görüntü diske yazıldıktan sonra çağrılır
+    finishCompaction() {
+      if (existsSync(compactingPath)) {
+        unlinkSync(compactingPath);
+      }
+    },
+  };
+}
@@ -0,0 +1,242 @@
+import { open, rename, unlink } from 'fs/promises';
+import { dirname } from 'path';
+
+// Asenkron grup commit katmanı. Kısa bir pencere içinde yapılan tüm değişiklikler
+// dosya başına tek yazmada toplanır. Tam dosya yazmaları geçici dosyaya yazılıp
+// fsync edildikten sonra atomik olarak yerine taşınır; yarım dosya oluşmaz.
+const COMMIT_WINDOW_MS = Number(process.env.PERSIST_COMMIT_WINDOW_MS) || 10;
+
+interface Waiter {
+  resolve: () => void;
+  reject: (error: unknown) => void;
+}
+
+interface PendingWrite {
+  // null: dosya silinecek
+  serialize: (() => string) | null;
+  waiters: Waiter[];
+}
+
+interface PendingAppend {
+  lines: string[];
+  waiters: Waiter[];
+}
+
+export interface PersistenceMetrics {
+  commits: number;
+  failedFiles: number;
+  pendingMutations: number;
+  lastBatchSize: number;
+  avgBatchSize: number;
+  maxBatchSize: number;
+  lastCommitMs: number;
+  avgCommitMs: number;
+  maxCommitMs: number;
+}
+
+let pendingWrites = new Map<string, PendingWrite>();
+let pendingAppends = new Map<string, PendingAppend>();
+let pendingMutations = 0;
+let timer: NodeJS.Timeout | null = null;
+let commitChain: Promise<void> = Promise.resolve();
+
+const stats = {
+  commits: 0,
+  failedFiles: 0,
+  totalBatchSize: 0,
+  lastBatchSize: 0,
+  maxBatchSize: 0,
+  totalCommitMs: 0,
+  lastCommitMs: 0,
+  maxCommitMs: 0,
+};
+
+function track(waiters: Waiter[]): Promise<void> {
+  const promise = new Promise<void>((resolve, reject) => {
+    waiters.push({ resolve, reject });
+  });
+  // Sonucu beklemeyen çağıranlar için işlenmemiş hata oluşmasın
+  promise.catch(() => {});
+  return promise;
+}
+
+function scheduleCommit(): void {
+  pendingMutations++;
+  if (!timer) {
+    timer = setTimeout(() => {
+      timer = null;
+      enqueueCommit();
+    }, COMMIT_WINDOW_MS);
+  }
+}
+
+function enqueueCommit(): void {
+  commitChain = commitChain.then(commitBatch);
+}
+
+async function fsyncDir(path: string): Promise<void> {
+  // Rename işleminin kalıcı olması için klasör de fsync edilir (desteklenmeyen sistemlerde atlanır)
+  try {
+    const handle = await open(dirname(path), 'r');
+    try {
+      await handle.sync();
+    } finally {
+      await handle.close();
+    }
+  } catch (error) {
+    // yoksay
+  }
+}
+
+async function writeAtomic(path: string, content: string): Promise<void> {
+  const tmpPath = `${path}.tmp`;
+  const handle = await open(tmpPath, 'w');
+  try {
+    await handle.writeFile(content);
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+  await rename(tmpPath, path);
+  await fsyncDir(path);
+}
+
+async function removeFile(path: string): Promise<void> {
+  try {
+    await unlink(path);
+  } catch (error: any) {
+    if (error.code !== 'ENOENT') throw error;
+  }
+  await fsyncDir(path);
+}
+
+async function appendDurable(path: string, lines: string[]): Promise<void> {
+  const handle = await open(path, 'a');
+  try {
+    await handle.writeFile(lines.join('\n') + '\n');
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+}
+
+async function settle(path: string, waiters: Waiter[], work: Promise<void>): Promise<void> {
+  try {
+    await work;
+    waiters.forEach((w) => w.resolve());
+  } catch (error) {
+    stats.failedFiles++;
+    console.error(`Dosya yazılamadı: ${path}`, error);
+    waiters.forEach((w) => w.reject(error));
+  }
+}
+
+async function commitBatch(): Promise<void> {
+  const writes = pendingWrites;
+  const appends = pendingAppends;
+  const batchSize = pendingMutations;
+  pendingWrites = new Map();
+  pendingAppends = new Map();
+  pendingMutations = 0;
+
+  if (writes.size === 0 && appends.size === 0) return;
+
+  const startedAt = performance.now();
+  const work: Promise<void>[] = [];
+  appends.forEach((pending, path) => {
+    work.push(settle(path, pending.waiters, appendDurable(path, pending.lines)));
+  });
+  writes.forEach((pending, path) => {
+    if (pending.serialize === null) {
+      work.push(settle(path, pending.waiters, removeFile(path)));
+      return;
+    }
+    // Serileştirme commit anında yapılır; pencere içindeki son durum yazılır
+    let content: string;
+    try {
+      content = pending.serialize();
+    } catch (error) {
+      work.push(settle(path, pending.waiters, Promise.reject(error)));
+      return;
+    }
+    work.push(settle(path, pending.waiters, writeAtomic(path, content)));
+  });
+  await Promise.all(work);
+
+  const elapsed = performance.now() - startedAt;
+  stats.commits++;
+  stats.lastBatchSize = batchSize;
+  stats.totalBatchSize += batchSize;
+  stats.maxBatchSize = Math.max(stats.maxBatchSize, batchSize);
+  stats.lastCommitMs = elapsed;
+  stats.totalCommitMs += elapsed;
+  stats.maxCommitMs = Math.max(stats.maxCommitMs, elapsed);
+}
+
+// Dosyanın tamamını yeniden yaz. Aynı pencerede aynı dosya için gelen
+// istekler birleştirilir ve serialize yalnızca bir kez çağrılır.
+export function scheduleWrite(path: string, serialize: (() => string) | null): Promise<void> {
+  let pending = pendingWrites.get(path);
+  if (!pending) {
+    pending = { serialize, waiters: [] };
+    pendingWrites.set(path, pending);
+  } else {
+    pending.serialize = serialize;
+  }
+  scheduleCommit();
+  return track(pending.waiters);
+}
+
+// Dosyayı sil; aynı pencerede bekleyen yazmanın yerini alır
+export function scheduleDelete(path: string): Promise<void> {
+  return scheduleWrite(path, null);
+}
+
+// Dosyanın sonuna satır ekle (günlük kayıtları için)
+export function scheduleAppend(path: string, line: string): Promise<void> {
+  let pending = pendingAppends.get(path);
+  if (!pending) {
+    pending = { lines: [], waiters: [] };
+    pendingAppends.set(path, pending);
+  }
+  pending.lines.push(line);
+  scheduleCommit();
+  return track(pending.waiters);
+}
+
+// Şu ana kadar gelen değişiklikleri pencereyi beklemeden commit et
+export function commitPending(): Promise<void> {
+  if (timer) {
+    clearTimeout(timer);
+    timer = null;
+  }
+  enqueueCommit();
+  return commitChain;
+}
+
+// Bekleyen tüm değişiklikleri hemen diske yaz (kapanış ve testler için)
+export async function flush(): Promise<void> {
+  while (timer || pendingWrites.size > 0 || pendingAppends.size > 0) {
+    if (timer) {
+      clearTimeout(timer);
+      timer = null;
+    }
+    enqueueCommit();
+    await commitChain;
+  }
+  await commitChain;
+}
+
+export function getPersistenceMetrics(): PersistenceMetrics {
+  return {
+    commits: stats.commits,
+    failedFiles: stats.failedFiles,
+    pendingMutations,
+    lastBatchSize: stats.lastBatchSize,
+    avgBatchSize: stats.commits ? stats.totalBatchSize / stats.commits : 0,
+    maxBatchSize: stats.maxBatchSize,
+    lastCommitMs: stats.lastCommitMs,
+    avgCommitMs: stats.commits ? stats.totalCommitMs / stats.commits : 0,
+    maxCommitMs: stats.maxCommitMs,
+  };
+}
@@ -0,0 +1,65 @@
+// Rapor sonuçları için sınırlı LRU önbellek. Anahtar (şube, uç nokta, aralık, iş günü,
+// veri sürümü) içerir; sipariş değişikliği sürümü artırdığında eski kayıtlar bir daha
+// eşleşmez ve LRU sırasında kendiliğinden düşer. Map ekleme sırası LRU sırasıdır.
+const MAX_ENTRIES = Number(process.env.REPORT_CACHE_MAX_ENTRIES) || 500;
+
+export interface ReportCacheMetrics {
+  entries: number;
+  maxEntries: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  notModified: number;
+}
+
+const entries = new Map<string, unknown>();
+const stats = {
+  hits: 0,
+  misses: 0,
+  evictions: 0,
+  notModified: 0,
+};
+
+function lookup(key: string): { value: unknown } | null {
+  if (!entries.has(key)) {
+    stats.misses++;
+    return null;
+  }
+  const value = entries.get(key);
+  // En son kullanılan sona taşınır
+  entries.delete(key);
+  entries.set(key, value);
+  stats.hits++;
+  return { value };
+}
+
+function store(key: string, value: unknown): void {
+  entries.set(key, value);
+  if (entries.size > MAX_ENTRIES) {
+    entries.delete(entries.keys().next().value as string);
+    stats.evictions++;
+  }
+}
+
+// Hesaplama işçide yapılabildiği için asenkron. Yalnızca tamamlanan sonuç saklanır:
+// bekleyen bir iş başka bir isteğin iptaliyle birlikte düşmesin diye paylaşılmaz.
+export async function getCachedReport<T>(key: string, compute: () => Promise<T>): Promise<T> {
+  const cached = lookup(key);
+  if (cached) return cached.value as T;
+  const value = await compute();
+  store(key, value);
+  return value;
+}
+
+// İstemci aynı sürümü zaten tutuyorsa (If-None-Match) rapor hiç hesaplanmadan 304 döner
+export function recordNotModified(): void {
+  stats.notModified++;
+}
+
+export function getReportCacheMetrics(): ReportCacheMetrics {
+  return {
+    entries: entries.size,
+    maxEntries: MAX_ENTRIES,
+    ...stats,
+  };
+}
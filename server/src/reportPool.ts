@@ -0,0 +1,59 @@
+import { availableParallelism } from 'os';
+import { snapshotColumns, type DailySummary } from './analytics.js';
+import { summarizeColumns } from './columnScan.js';
+import { createWorkerPool, type WorkerPool, type WorkerPoolMetrics } from './workerPool.js';
+
+// Rapor taramalarını ana iş parçacığından alan işçi havuzu. Uzun bir tarama sürerken
+// sipariş oluşturma ve WebSocket yayınları beklemez. Küçük şubelerde tarama mesaj
+// gönderme maliyetinden ucuz olduğu için doğrudan burada yapılır.
+const REPORT_WORKERS =
+  Number(process.env.REPORT_WORKERS) || Math.max(1, Math.min(4, availableParallelism() - 1));
+const REPORT_QUEUE_LIMIT = Number(process.env.REPORT_QUEUE_LIMIT) || 32;
+const REPORT_JOB_TIMEOUT_MS = Number(process.env.REPORT_JOB_TIMEOUT_MS) || 30 * 1000;
+const REPORT_INLINE_ROWS = Number(process.env.REPORT_INLINE_ROWS) || 50000;
+
+// Geliştirmede (tsx) kaynak .ts, derlenmiş sürümde .js dosyası çalışır
+const workerFile = new URL(
+  import.meta.url.endsWith('.ts') ? './reportWorker.ts' : './reportWorker.js',
+  import.meta.url
+);
+
+let pool: WorkerPool | null = null;
+
+function getPool(): WorkerPool {
+  if (!pool) {
+    pool = createWorkerPool(workerFile, {
+      size: REPORT_WORKERS,
+      maxQueue: REPORT_QUEUE_LIMIT,
+      timeoutMs: REPORT_JOB_TIMEOUT_MS,
+    });
+  }
+  return pool;
+}
+
+// summarizePaidOrders'ın işçide çalışan hali. signal iptal edilirse (istemci gitti)
+// iş kuyruktan çıkarılır veya işçisi sonlandırılır.
+export function summarizePaidOrdersInPool(
+  branchId: string,
+  start: Date,
+  end: Date,
+  withProducts = false,
+  signal?: AbortSignal
+): Promise<DailySummary> {
+  const columns = snapshotColumns(branchId);
+  const startMs = start.getTime();
+  const endMs = end.getTime();
+  if (columns.rowCount < REPORT_INLINE_ROWS) {
+    return Promise.resolve(summarizeColumns(columns, startMs, endMs, withProducts));
+  }
+  return getPool().run<DailySummary>('summarize', { columns, startMs, endMs, withProducts }, signal);
+}
+
+export function getReportPoolMetrics(): WorkerPoolMetrics | null {
+  return pool ? pool.metrics() : null;
+}
+
+export async function closeReportPool(): Promise<void> {
+  await pool?.close();
+  pool = null;
+}
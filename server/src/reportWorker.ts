@@ -0,0 +1,26 @@
+import { parentPort } from 'worker_threads';
+import { summarizeColumns, type ColumnSnapshot } from './columnScan.js';
+
+// Rapor işçisi (reportPool.ts tarafından başlatılır). Yalnızca sütun taraması
+// yapar; veri deposuna veya sunucu durumuna erişmez.
+interface SummarizeJob {
+  columns: ColumnSnapshot;
+  startMs: number;
+  endMs: number;
+  withProducts: boolean;
+}
+
+const tasks: Record<string, (payload: any) => unknown> = {
+  summarize: ({ columns, startMs, endMs, withProducts }: SummarizeJob) =>
+    summarizeColumns(columns, startMs, endMs, withProducts),
+};
+
+parentPort!.on('message', ({ id, task, payload }: { id: number; task: string; payload: unknown }) => {
+  try {
+    const handler = tasks[task];
+    if (!handler) throw new Error(`Bilinmeyen iş: ${task}`);
+    parentPort!.postMessage({ id, result: handler(payload) });
+  } catch (error: any) {
+    parentPort!.postMessage({ id, error: error?.message ?? String(error) });
+  }
+});
@@ -0,0 +1,6 @@
+export interface RevenueSummary {
+  totalRevenue: number;
+  waiterSales: Record<string, { name: string; sales: number }>;
+  paymentMethods: { cash: number; card: number };
+  orderCount: number;
+}
@@ -0,0 +1,596 @@
+import { createRequire } from 'module';
+import type { User, MenuItem, Order, OrderItem, Payment } from './types.js';
+import type { Collection, CollectionRows, DailyRollup, StorageBackend } from './storageBackend.js';
+import { DAY_MS, dayEnd, dayStart, isDay } from './businessDay.js';
+
+const require = createRequire(import.meta.url);
+
+// better-sqlite3 opsiyonel bir bağımlılıktır (npm install --no-save better-sqlite3@^11.8.1);
+// yalnızca STORAGE_BACKEND=sqlite seçildiğinde yüklenir. Kullanılan API'nin tipleri:
+interface SqliteStatement {
+  run(...params: unknown[]): { changes: number; lastInsertRowid: number | bigint };
+  get(...params: unknown[]): unknown;
+  all(...params: unknown[]): unknown[];
+}
+
+interface SqliteDatabase {
+  prepare(sql: string): SqliteStatement;
+  exec(sql: string): void;
+  pragma(sql: string): unknown;
+  transaction(fn: () => void): () => void;
+}
+
+// Gömülü SQLite deposu. Siparişler, kalemler, ödemeler ve menü ilişkisel
+// tablolarda tutulur; şube, masa, ödeme durumu ve createdAt üzerinde indeks vardır.
+
+const SCHEMA = `
+CREATE TABLE IF NOT EXISTS users (
+  branch_id TEXT NOT NULL,
+  id TEXT NOT NULL,
+  username TEXT NOT NULL,
+  role TEXT NOT NULL,
+  pin TEXT,
+  position INTEGER NOT NULL,
+  PRIMARY KEY (branch_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_users_pin ON users (pin);
+
+CREATE TABLE IF NOT EXISTS menu_items (
+  branch_id TEXT NOT NULL,
+  id TEXT NOT NULL,
+  name TEXT NOT NULL,
+  price REAL NOT NULL,
+  category TEXT NOT NULL,
+  menu_category TEXT,
+  extras TEXT,
+  position INTEGER NOT NULL,
+  PRIMARY KEY (branch_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS menu_campaign_items (
+  branch_id TEXT NOT NULL,
+  menu_item_id TEXT NOT NULL,
+  position INTEGER NOT NULL,
+  item_id TEXT NOT NULL,
+  name TEXT NOT NULL,
+  category TEXT NOT NULL,
+  PRIMARY KEY (branch_id, menu_item_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+  payment_id INTEGER PRIMARY KEY,
+  method TEXT NOT NULL,
+  amount REAL NOT NULL,
+  discount REAL,
+  final_amount REAL NOT NULL,
+  paid_at TEXT NOT NULL,
+  cashier_id TEXT NOT NULL,
+  cashier_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+  row_id INTEGER PRIMARY KEY,
+  id TEXT NOT NULL,
+  branch_id TEXT NOT NULL,
+  archived INTEGER NOT NULL DEFAULT 0,
+  waiter_id TEXT NOT NULL,
+  waiter_name TEXT NOT NULL,
+  table_number INTEGER,
+  created_at TEXT NOT NULL,
+  total_amount REAL NOT NULL,
+  is_paid INTEGER NOT NULL DEFAULT 0,
+  payment_id INTEGER REFERENCES payments (payment_id),
+  completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_orders_branch_id ON orders (branch_id, archived, id);
+CREATE INDEX IF NOT EXISTS idx_orders_table ON orders (branch_id, table_number, is_paid) WHERE archived = 0;
+CREATE INDEX IF NOT EXISTS idx_orders_paid_created ON orders (branch_id, is_paid, created_at);
+
+CREATE TABLE IF NOT EXISTS order_items (
+  item_row INTEGER PRIMARY KEY,
+  order_row INTEGER NOT NULL REFERENCES orders (row_id) ON DELETE CASCADE,
+  id TEXT NOT NULL,
+  menu_item_id TEXT NOT NULL,
+  menu_item_name TEXT NOT NULL,
+  quantity REAL NOT NULL,
+  price REAL NOT NULL,
+  category TEXT NOT NULL,
+  status TEXT NOT NULL,
+  cancelled_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_row);
+
+CREATE TABLE IF NOT EXISTS daily_rollups (
+  branch_id TEXT NOT NULL,
+  day TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  PRIMARY KEY (branch_id, day)
+);
+`;
+
+function openDatabase(path: string): SqliteDatabase {
+  let Database: new (path: string) => SqliteDatabase;
+  try {
+    Database = require('better-sqlite3');
+  } catch (error) {
+    throw new Error(
+      "STORAGE_BACKEND=sqlite için opsiyonel 'better-sqlite3' paketi kurulu olmalı (server klasöründe: npm install --no-save better-sqlite3@^11.8.1)"
+    );
+  }
+  return new Database(path);
+}
+
+function rowToOrder(row: any, items: OrderItem[]): Order {
+  const order: Order = {
+    id: row.id,
+    waiterId: row.waiter_id,
+    waiterName: row.waiter_name,
+    ...(row.table_number !== null ? { tableNumber: row.table_number } : {}),
+    items,
+    createdAt: row.created_at,
+    totalAmount: row.total_amount,
+    isPaid: row.is_paid === 1,
+    branchId: row.branch_id,
+  };
+  if (row.payment_id !== null) {
+    order.payment = {
+      method: row.method,
+      amount: row.amount,
+      ...(row.discount !== null ? { discount: row.discount } : {}),
+      finalAmount: row.final_amount,
+      paidAt: row.paid_at,
+      cashierId: row.cashier_id,
+      cashierName: row.cashier_name,
+    };
+  }
+  if (row.completed_at !== null) {
+    (order as any).completedAt = row.completed_at;
+  }
+  return order;
+}
+
+function rowToItem(row: any): OrderItem {
+  return {
+    id: row.id,
+    menuItemId: row.menu_item_id,
+    menuItemName: row.menu_item_name,
+    quantity: row.quantity,
+    price: row.price,
+    category: row.category,
+    status: row.status,
+    ...(row.cancelled_reason !== null ? { cancelledReason: row.cancelled_reason } : {}),
+    branchId: row.branch_id,
+  };
+}
+
+export function createSqliteBackend(path: string): StorageBackend {
+  let db: SqliteDatabase | null = null;
+  const statements = new Map<string, SqliteStatement>();
+
+  function database(): SqliteDatabase {
+    if (!db) {
+      db = openDatabase(path);
+      db.pragma('journal_mode = WAL');
+      db.pragma('synchronous = NORMAL');
+      db.pragma('foreign_keys = ON');
+      db.exec(SCHEMA);
+    }
+    return db;
+  }
+
+  // Hazırlanmış sorgular bir kez derlenip tekrar kullanılır
+  function stmt(sql: string): SqliteStatement {
+    let statement = statements.get(sql);
+    if (!statement) {
+      statement = database().prepare(sql);
+      statements.set(sql, statement);
+    }
+    return statement;
+  }
+
+  function selectOrders(where: string, params: unknown[]): Order[] {
+    const rows = stmt(
+      `SELECT o.*, p.method, p.amount, p.discount, p.final_amount, p.paid_at, p.cashier_id, p.cashier_name
+       FROM orders o LEFT JOIN payments p ON p.payment_id = o.payment_id
+       WHERE ${where} ORDER BY o.row_id`
+    ).all(...params) as any[];
+    if (rows.length === 0) return [];
+
+    const itemRows = stmt(
+      `SELECT i.*, o.branch_id FROM order_items i JOIN orders o ON o.row_id = i.order_row
+       WHERE ${where} ORDER BY i.item_row`
+    ).all(...params) as any[];
+    const itemsByOrder = new Map<number, OrderItem[]>();
+    itemRows.forEach((row) => {
+      let items = itemsByOrder.get(row.order_row);
+      if (!items) {
+        items = [];
+        itemsByOrder.set(row.order_row, items);
+      }
+      items.push(rowToItem(row));
+    });
+    return rows.map((row) => rowToOrder(row, itemsByOrder.get(row.row_id) ?? []));
+  }
+
+  function insertPayment(payment: Payment): number {
+    const result = stmt(
+      `INSERT INTO payments (method, amount, discount, final_amount, paid_at, cashier_id, cashier_name)
+       VALUES (?, ?, ?, ?, ?, ?, ?)`
+    ).run(
+      payment.method,
+      payment.amount,
+      payment.discount ?? null,
+      payment.finalAmount,
+      payment.paidAt,
+      payment.cashierId,
+      payment.cashierName
+    );
+    return Number(result.lastInsertRowid);
+  }
+
+  function insertItems(orderRow: number, items: OrderItem[]): void {
+    const insert = stmt(
+      `INSERT INTO order_items (order_row, id, menu_item_id, menu_item_name, quantity, price, category, status, cancelled_reason)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`
+    );
+    items.forEach((item) => {
+      insert.run(
+        orderRow,
+        item.id,
+        item.menuItemId,
+        item.menuItemName,
+        item.quantity,
+        item.price,
+        item.category,
+        item.status,
+        item.cancelledReason ?? null
+      );
+    });
+  }
+
+  // Aynı ödeme nesnesini paylaşan siparişler tek ödeme satırına bağlanır
+  function insertOrder(order: Order, archived: boolean, paymentIds?: Map<Payment, number>): void {
+    let paymentId: number | null = null;
+    if (order.payment) {
+      paymentId = paymentIds?.get(order.payment) ?? insertPayment(order.payment);
+      paymentIds?.set(order.payment, paymentId);
+    }
+    const result = stmt(
+      `INSERT INTO orders (id, branch_id, archived, waiter_id, waiter_name, table_number, created_at, total_amount, is_paid, payment_id, completed_at)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`
+    ).run(
+      order.id,
+      order.branchId,
+      archived ? 1 : 0,
+      order.waiterId,
+      order.waiterName,
+      order.tableNumber ?? null,
+      order.createdAt,
+      order.totalAmount,
+      order.isPaid ? 1 : 0,
+      paymentId,
+      (order as any).completedAt ?? null
+    );
+    insertItems(Number(result.lastInsertRowid), order.items);
+  }
+
+  function selectLiveOrder(branchId: string, orderId: string): Order | undefined {
+    return selectOrders('o.branch_id = ? AND o.archived = 0 AND o.id = ?', [branchId, orderId])[0];
+  }
+
+  function selectPaidOrders(branchId: string, startIso: string, endIso: string): Order[] {
+    return selectOrders(
+      'o.branch_id = ? AND o.is_paid = 1 AND o.payment_id IS NOT NULL AND o.created_at BETWEEN ? AND ?',
+      [branchId, startIso, endIso]
+    );
+  }
+
+  function deleteOrphanPayments(): void {
+    stmt(
+      `DELETE FROM payments WHERE payment_id NOT IN (SELECT payment_id FROM orders WHERE payment_id IS NOT NULL)`
+    ).run();
+  }
+
+  function readUsers(branchId?: string): User[] {
+    const rows = (
+      branchId === undefined
+        ? stmt('SELECT * FROM users ORDER BY branch_id, position').all()
+        : stmt('SELECT * FROM users WHERE branch_id = ? ORDER BY position').all(branchId)
+    ) as any[];
+    return rows.map((row) => ({
+      id: row.id,
+      username: row.username,
+      role: row.role,
+      pin: row.pin,
+      branchId: row.branch_id,
+    }));
+  }
+
+  function readMenu(branchId?: string): MenuItem[] {
+    const rows = (
+      branchId === undefined
+        ? stmt('SELECT * FROM menu_items ORDER BY branch_id, position').all()
+        : stmt('SELECT * FROM menu_items WHERE branch_id = ? ORDER BY position').all(branchId)
+    ) as any[];
+    const campaignRows = (
+      branchId === undefined
+        ? stmt('SELECT * FROM menu_campaign_items ORDER BY position').all()
+        : stmt('SELECT * FROM menu_campaign_items WHERE branch_id = ? ORDER BY position').all(branchId)
+    ) as any[];
+    const campaignItems = new Map<string, MenuItem['items']>();
+    campaignRows.forEach((row) => {
+      const key = `${row.branch_id}\u0000${row.menu_item_id}`;
+      if (!campaignItems.has(key)) campaignItems.set(key, []);
+      campaignItems.get(key)!.push({ id: row.item_id, name: row.name, category: row.category });
+    });
+    return rows.map((row) => {
+      const item: any = {
+        id: row.id,
+        name: row.name,
+        price: row.price,
+        category: row.category,
+        ...(row.menu_category !== null ? { menuCategory: row.menu_category } : {}),
+        branchId: row.branch_id,
+      };
+      const items = campaignItems.get(`${row.branch_id}\u0000${row.id}`);
+      if (items) item.items = items;
+      if (row.extras !== null) item.extras = row.extras;
+      return item as MenuItem;
+    });
+  }
+
+  function writeUsers(rows: User[], branchId?: string): void {
+    if (branchId === undefined) stmt('DELETE FROM users').run();
+    else stmt('DELETE FROM users WHERE branch_id = ?').run(branchId);
+    const insert = stmt(
+      'INSERT INTO users (branch_id, id, username, role, pin, position) VALUES (?, ?, ?, ?, ?, ?)'
+    );
+    rows.forEach((user, position) => {
+      insert.run(branchId ?? user.branchId ?? 'default', user.id, user.username, user.role, user.pin ?? null, position);
+    });
+  }
+
+  function writeMenu(rows: MenuItem[], branchId?: string): void {
+    if (branchId === undefined) {
+      stmt('DELETE FROM menu_items').run();
+      stmt('DELETE FROM menu_campaign_items').run();
+    } else {
+      stmt('DELETE FROM menu_items WHERE branch_id = ?').run(branchId);
+      stmt('DELETE FROM menu_campaign_items WHERE branch_id = ?').run(branchId);
+    }
+    const insert = stmt(
+      `INSERT INTO menu_items (branch_id, id, name, price, category, menu_category, extras, position)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?)`
+    );
+    const insertCampaignItem = stmt(
+      `INSERT INTO menu_campaign_items (branch_id, menu_item_id, position, item_id, name, category)
+       VALUES (?, ?, ?, ?, ?, ?)`
+    );
+    rows.forEach((item, position) => {
+      const rowBranch = branchId ?? item.branchId ?? 'default';
+      insert.run(
+        rowBranch,
+        item.id,
+        item.name,
+        item.price,
+        item.category,
+        item.menuCategory ?? null,
+        (item as any).extras ?? null,
+        position
+      );
+      (item.items ?? []).forEach((campaignItem, index) => {
+        insertCampaignItem.run(rowBranch, item.id, index, campaignItem.id, campaignItem.name, campaignItem.category);
+      });
+    });
+  }
+
+  function writeOrders(rows: Order[], archived: boolean, branchId?: string): void {
+    if (branchId === undefined) stmt('DELETE FROM orders WHERE archived = ?').run(archived ? 1 : 0);
+    else stmt('DELETE FROM orders WHERE archived = ? AND branch_id = ?').run(archived ? 1 : 0, branchId);
+    const paymentIds = new Map<Payment, number>();
+    rows.forEach((order) => insertOrder(order, archived, paymentIds));
+    deleteOrphanPayments();
+  }
+
+  function liveOrderRow(branchId: string, orderId: string): number | undefined {
+    const row = stmt('SELECT row_id FROM orders WHERE branch_id = ? AND archived = 0 AND id = ?').get(
+      branchId,
+      orderId
+    ) as { row_id: number } | undefined;
+    return row?.row_id;
+  }
+
+  function transaction(fn: () => void): void {
+    database().transaction(fn)();
+  }
+
+  return {
+    name: 'sqlite',
+
+    init() {
+      database();
+    },
+
+    read(collection, branchId) {
+      switch (collection as Collection) {
+        case 'users':
+          return readUsers(branchId) as CollectionRows[typeof collection][];
+        case 'menu':
+          return readMenu(branchId) as CollectionRows[typeof collection][];
+        case 'orders':
+        case 'completedOrders': {
+          const archived = collection === 'completedOrders' ? 1 : 0;
+          const orders =
+            branchId === undefined
+              ? selectOrders('o.archived = ?', [archived])
+              : selectOrders('o.archived = ? AND o.branch_id = ?', [archived, branchId]);
+          return orders as CollectionRows[typeof collection][];
+        }
+      }
+      return [];
+    },
+
+    write(collection, rows, branchId) {
+      transaction(() => {
+        switch (collection as Collection) {
+          case 'users':
+            writeUsers(rows as User[], branchId);
+            break;
+          case 'menu':
+            writeMenu(rows as MenuItem[], branchId);
+            break;
+          case 'orders':
+            writeOrders(rows as Order[], false, branchId);
+            break;
+          case 'completedOrders':
+            writeOrders(rows as Order[], true, branchId);
+            break;
+        }
+      });
+    },
+
+    appendOrder(_branchId, order) {
+      transaction(() => insertOrder(order, false));
+    },
+
+    updateOrderItemStatus(branchId, orderId, itemId, status, cancelledReason) {
+      const orderRow = liveOrderRow(branchId, orderId);
+      if (orderRow === undefined) return;
+      stmt(
+        `UPDATE order_items SET status = ?, cancelled_reason = COALESCE(?, cancelled_reason)
+         WHERE order_row = ? AND id = ?`
+      ).run(status, status === 'CANCELLED' && cancelledReason ? cancelledReason : null, orderRow, itemId);
+    },
+
+    moveOrderTable(branchId, orderId, tableNumber) {
+      stmt('UPDATE orders SET table_number = ? WHERE branch_id = ? AND archived = 0 AND id = ?').run(
+        tableNumber,
+        branchId,
+        orderId
+      );
+    },
+
+    markOrdersPaid(branchId, orderIds, payment) {
+      transaction(() => {
+        const paymentId = insertPayment(payment);
+        const update = stmt(
+          'UPDATE orders SET is_paid = 1, payment_id = ? WHERE branch_id = ? AND archived = 0 AND id = ?'
+        );
+        orderIds.forEach((orderId) => update.run(paymentId, branchId, orderId));
+      });
+    },
+
+    moveItemsToCompleted(branchId, moves, completedAt) {
+      if (moves.length === 0) return;
+      transaction(() => {
+        moves.forEach(({ orderId, itemIds }) => {
+          const orderRow = liveOrderRow(branchId, orderId);
+          if (orderRow === undefined || itemIds.length === 0) return;
+          const copy = stmt(
+            `INSERT INTO orders (id, branch_id, archived, waiter_id, waiter_name, table_number, created_at, total_amount, is_paid, payment_id, completed_at)
+             SELECT id, branch_id, 1, waiter_id, waiter_name, table_number, created_at, total_amount, is_paid, payment_id, ?
+             FROM orders WHERE row_id = ?`
+          ).run(completedAt, orderRow);
+          const moveItem = stmt('UPDATE order_items SET order_row = ? WHERE order_row = ? AND id = ?');
+          itemIds.forEach((itemId) => moveItem.run(Number(copy.lastInsertRowid), orderRow, itemId));
+        });
+        stmt(
+          `DELETE FROM orders WHERE branch_id = ? AND archived = 0
+           AND NOT EXISTS (SELECT 1 FROM order_items i WHERE i.order_row = orders.row_id)`
+        ).run(branchId);
+      });
+    },
+
+    findOrder(branchId, orderId) {
+      return selectLiveOrder(branchId, orderId);
+    },
+
+    findOrderItem(branchId, orderId, itemId) {
+      const order = selectLiveOrder(branchId, orderId);
+      const item = order?.items.find((i) => i.id === itemId);
+      return order && item ? { order, item } : undefined;
+    },
+
+    findUnpaidOrdersByTable(branchId, tableNumber) {
+      return selectOrders('o.branch_id = ? AND o.archived = 0 AND o.table_number = ? AND o.is_paid = 0', [
+        branchId,
+        tableNumber,
+      ]);
+    },
+
+    findPaidOrdersBetween(branchId, start, end) {
+      return selectPaidOrders(branchId, start.toISOString(), end.toISOString());
+    },
+
+    // Aralık günlük dilimler halinde sorgulanır; bellekte en fazla bir günün siparişi olur
+    *streamPaidOrdersBetween(branchId, start, end) {
+      // Dilimler yalnızca verinin bulunduğu aralıkta oluşturulur (tüm geçmiş istenebilir)
+      const bounds = stmt(
+        `SELECT MIN(created_at) AS first, MAX(created_at) AS last FROM orders
+         WHERE branch_id = ? AND is_paid = 1 AND created_at BETWEEN ? AND ?`
+      ).get(branchId, start.toISOString(), end.toISOString()) as { first: string | null; last: string | null };
+      if (!bounds.first || !bounds.last) return;
+      const last = Date.parse(bounds.last);
+      for (let sliceStart = Date.parse(bounds.first); sliceStart <= last; sliceStart += DAY_MS) {
+        const sliceEnd = Math.min(sliceStart + DAY_MS - 1, last);
+        yield* selectPaidOrders(branchId, new Date(sliceStart).toISOString(), new Date(sliceEnd).toISOString());
+      }
+    },
+
+    clearRange(branchId, start, end, keepDay) {
+      const removed = { removedOrders: 0, removedCompletedOrders: 0 };
+      transaction(() => {
+        // Kalemler ON DELETE CASCADE ile silinir
+        const remove = stmt(
+          `DELETE FROM orders WHERE branch_id = ? AND archived = ? AND created_at BETWEEN ? AND ?
+           AND (created_at < ? OR created_at > ?)`
+        );
+        // Geçerli bir keepDay yoksa ('' sınırları) hiçbir gün korunmaz
+        const keep = isDay(keepDay)
+          ? [new Date(dayStart(keepDay)).toISOString(), new Date(dayEnd(keepDay)).toISOString()]
+          : ['', ''];
+        const range = [start.toISOString(), end.toISOString(), ...keep];
+        removed.removedOrders = remove.run(branchId, 0, ...range).changes;
+        removed.removedCompletedOrders = remove.run(branchId, 1, ...range).changes;
+        deleteOrphanPayments();
+      });
+      return removed;
+    },
+
+    readDailyRollups(branchId) {
+      const rows = stmt('SELECT summary FROM daily_rollups WHERE branch_id = ? ORDER BY day').all(branchId) as Array<{
+        summary: string;
+      }>;
+      return rows.map((row) => JSON.parse(row.summary) as DailyRollup);
+    },
+
+    saveDailyRollups(branchId, rollups, removedDays) {
+      transaction(() => {
+        const upsert = stmt(
+          `INSERT INTO daily_rollups (branch_id, day, summary) VALUES (?, ?, ?)
+           ON CONFLICT (branch_id, day) DO UPDATE SET summary = excluded.summary`
+        );
+        rollups.forEach((rollup) => upsert.run(branchId, rollup.day, JSON.stringify(rollup)));
+        const remove = stmt('DELETE FROM daily_rollups WHERE branch_id = ? AND day = ?');
+        removedDays.forEach((day) => remove.run(branchId, day));
+      });
+    },
+
+    // SQLite indeksleri motor tarafından güncellenir; bütünlük kontrolü indeksleri de doğrular
+    verifyIndexes() {
+      const rows = database().pragma('integrity_check') as Array<{ integrity_check: string }>;
+      return rows.map((row) => row.integrity_check).filter((result) => result !== 'ok');
+    },
+
+    startMaintenance() {
+      const timer = setInterval(() => {
+        database().pragma('optimize');
+      }, 60 * 60 * 1000);
+      timer.unref();
+    },
+
+    async flush() {
+      database().pragma('wal_checkpoint(TRUNCATE)');
+    },
+  };
+}
@@ -0,0 +1,80 @@
+import type { User, MenuItem, Order, OrderStatus, Payment } from './types.js';
+import type { ItemRef } from './orderIndex.js';
+import type { DailySummary } from './analytics.js';
+
+// dataManager.ts'in arkasındaki depolama arayüzü. JSON (varsayılan) ve SQLite
+// uygulamaları aynı sözleşmeyi sağlar; seçim STORAGE_BACKEND ile yapılır.
+export interface CollectionRows {
+  users: User;
+  menu: MenuItem;
+  orders: Order;
+  completedOrders: Order;
+}
+
+export type Collection = keyof CollectionRows;
+
+export interface CompletedMove {
+  orderId: string;
+  itemIds: string[];
+}
+
+export interface ClearRangeResult {
+  removedOrders: number;
+  removedCompletedOrders: number;
+}
+
+// Bir şubenin bir iş gününe (businessDay.ts) ait ödenmiş sipariş özeti
+export interface DailyRollup extends DailySummary {
+  day: string;
+  // Gün kapandıktan sonra değişti, henüz yeniden hesaplanmadı
+  stale?: boolean;
+  // Hesaplandığı BUSINESS_TZ; yoksa UTC
+  timeZone?: string;
+}
+
+export interface StorageBackend {
+  readonly name: string;
+
+  init(): void;
+
+  // branchId verilmezse tüm şubeler
+  read<C extends Collection>(collection: C, branchId?: string): CollectionRows[C][];
+  // branchId verilmezse satırlar şubelerine dağıtılır ve tüm koleksiyon değiştirilir
+  write<C extends Collection>(collection: C, rows: CollectionRows[C][], branchId?: string): void;
+
+  // Tekil sipariş değişiklikleri
+  appendOrder(branchId: string, order: Order): void;
+  updateOrderItemStatus(
+    branchId: string,
+    orderId: string,
+    itemId: string,
+    status: OrderStatus,
+    cancelledReason?: string
+  ): void;
+  moveOrderTable(branchId: string, orderId: string, tableNumber: number): void;
+  markOrdersPaid(branchId: string, orderIds: string[], payment: Payment): void;
+  moveItemsToCompleted(branchId: string, moves: CompletedMove[], completedAt: string): void;
+
+  // Filtreleri depolamaya indiren sorgular
+  findOrder(branchId: string, orderId: string): Order | undefined;
+  findOrderItem(branchId: string, orderId: string, itemId: string): ItemRef | undefined;
+  findUnpaidOrdersByTable(branchId: string, tableNumber: number): Order[];
+  // Aktif + geçmiş siparişlerden createdAt aralığına düşen ödenmişler
+  findPaidOrdersBetween(branchId: string, start: Date, end: Date): Order[];
+  // Aynı sorgu, kayıt kayıt üretilir; uzun aralıklar belleğe topluca alınmaz
+  streamPaidOrdersBetween(branchId: string, start: Date, end: Date): Iterable<Order>;
+
+  // createdAt'i [start, end] aralığında olan aktif ve geçmiş siparişleri sil;
+  // keepDay (YYYY-MM-DD, iş günü) gününe ait olanlar korunur
+  clearRange(branchId: string, start: Date, end: Date, keepDay: string): ClearRangeResult;
+
+  // Günlük rollup'lar (dailyRollups.ts); kayıtlar gün bazında eklenir/değiştirilir/silinir
+  readDailyRollups(branchId: string): DailyRollup[];
+  saveDailyRollups(branchId: string, rollups: DailyRollup[], removedDays: string[]): void;
+
+  // İndekslerin veriyle tutarlılığını kontrol eder; boş liste: sorun yok
+  verifyIndexes(): string[];
+
+  startMaintenance(): void;
+  flush(): Promise<void>;
+}
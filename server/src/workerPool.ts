@@ -0,0 +1,196 @@
+import { Worker } from 'worker_threads';
+
+// Sabit boyutlu worker_threads havuzu. Her işçi aynı anda tek iş çalıştırır; boşta
+// işçi yoksa işler sınırlı bir kuyrukta bekler, kuyruk doluysa hemen reddedilir.
+// İş iptal edilirse (istemci bağlantıyı kapattı) veya süresi dolarsa: kuyruktaysa
+// çıkarılır, çalışıyorsa işçi sonlandırılıp yerine yenisi açılır (senkron bir
+// taramayı yarıda kesmenin tek yolu budur).
+// Hatalar `code` alanıyla ayırt edilir: QUEUE_FULL, TIMEOUT, ABORTED, WORKER_FAILED.
+
+export interface WorkerPoolOptions {
+  size: number;
+  maxQueue: number;
+  timeoutMs: number;
+}
+
+export interface WorkerPoolMetrics {
+  workers: number;
+  busy: number;
+  queued: number;
+  completed: number;
+  failed: number;
+  rejected: number;
+  timedOut: number;
+  cancelled: number;
+}
+
+export interface WorkerPool {
+  run<T>(task: string, payload: unknown, signal?: AbortSignal): Promise<T>;
+  metrics(): WorkerPoolMetrics;
+  close(): Promise<void>;
+}
+
+interface Job {
+  id: number;
+  task: string;
+  payload: unknown;
+  signal?: AbortSignal;
+  resolve: (value: any) => void;
+  reject: (error: unknown) => void;
+  timer?: NodeJS.Timeout;
+  onAbort?: () => void;
+}
+
+interface PoolWorker {
+  worker: Worker;
+  job: Job | null;
+}
+
+export function poolError(code: string, message: string): Error {
+  return Object.assign(new Error(message), { code });
+}
+
+export function createWorkerPool(workerFile: URL, options: WorkerPoolOptions): WorkerPool {
+  const workers: PoolWorker[] = [];
+  const queue: Job[] = [];
+  let nextJobId = 0;
+  let closed = false;
+  const stats = {
+    completed: 0,
+    failed: 0,
+    rejected: 0,
+    timedOut: 0,
+    cancelled: 0,
+  };
+
+  function finish(job: Job): void {
+    if (job.timer) clearTimeout(job.timer);
+    if (job.onAbort) job.signal?.removeEventListener('abort', job.onAbort);
+  }
+
+  function spawn(): PoolWorker {
+    const entry: PoolWorker = { worker: new Worker(workerFile), job: null };
+    // Havuz süreç kapanışını bekletmez
+    entry.worker.unref();
+
+    entry.worker.on('message', (message: { id: number; result?: unknown; error?: string }) => {
+      const job = entry.job;
+      if (!job || job.id !== message.id) return;
+      entry.job = null;
+      finish(job);
+      if (message.error !== undefined) {
+        stats.failed++;
+        job.reject(poolError('WORKER_FAILED', message.error));
+      } else {
+        stats.completed++;
+        job.resolve(message.result);
+      }
+      dispatch();
+    });
+
+    entry.worker.on('error', (error) => {
+      const job = entry.job;
+      entry.job = null;
+      if (job) {
+        finish(job);
+        stats.failed++;
+        job.reject(poolError('WORKER_FAILED', error.message));
+      }
+      replace(entry);
+    });
+
+    workers.push(entry);
+    return entry;
+  }
+
+  function replace(entry: PoolWorker): void {
+    const index = workers.indexOf(entry);
+    if (index === -1) return;
+    workers.splice(index, 1);
+    entry.worker.terminate().catch(() => {});
+    if (!closed) {
+      spawn();
+      dispatch();
+    }
+  }
+
+  // Çalışan bir iş süre aşımı veya iptalle bitirilirse işçisi sonlandırılır
+  function abandon(job: Job, error: Error): void {
+    finish(job);
+    const queued = queue.indexOf(job);
+    if (queued !== -1) {
+      queue.splice(queued, 1);
+    } else {
+      const entry = workers.find((candidate) => candidate.job === job);
+      if (entry) {
+        entry.job = null;
+        replace(entry);
+      }
+    }
+    job.reject(error);
+  }
+
+  function dispatch(): void {
+    while (queue.length > 0) {
+      let entry = workers.find((candidate) => candidate.job === null);
+      if (!entry && workers.length < options.size) entry = spawn();
+      if (!entry) return;
+      const job = queue.shift()!;
+      entry.job = job;
+      entry.worker.postMessage({ id: job.id, task: job.task, payload: job.payload });
+    }
+  }
+
+  return {
+    run<T>(task: string, payload: unknown, signal?: AbortSignal): Promise<T> {
+      if (closed) {
+        return Promise.reject(poolError('WORKER_FAILED', 'İşçi havuzu kapatıldı'));
+      }
+      if (signal?.aborted) {
+        stats.cancelled++;
+        return Promise.reject(poolError('ABORTED', 'İş iptal edildi'));
+      }
+      const busy = workers.filter((entry) => entry.job !== null).length;
+      if (busy >= options.size && queue.length >= options.maxQueue) {
+        stats.rejected++;
+        return Promise.reject(poolError('QUEUE_FULL', 'İş kuyruğu dolu'));
+      }
+
+      return new Promise<T>((resolve, reject) => {
+        const job: Job = { id: nextJobId++, task, payload, signal, resolve, reject };
+        job.timer = setTimeout(() => {
+          stats.timedOut++;
+          abandon(job, poolError('TIMEOUT', `İş ${options.timeoutMs} ms içinde bitmedi`));
+        }, options.timeoutMs);
+        if (signal) {
+          job.onAbort = () => {
+            stats.cancelled++;
+            abandon(job, poolError('ABORTED', 'İş iptal edildi'));
+          };
+          signal.addEventListener('abort', job.onAbort, { once: true });
+        }
+        queue.push(job);
+        dispatch();
+      });
+    },
+
+    metrics() {
+      return {
+        workers: workers.length,
+        busy: workers.filter((entry) => entry.job !== null).length,
+        queued: queue.length,
+        ...stats,
+      };
+    },
+
+    async close() {
+      closed = true;
+      const pending = [...queue.splice(0), ...workers.flatMap((entry) => (entry.job ? [entry.job] : []))];
+      pending.forEach((job) => {
+        finish(job);
+        job.reject(poolError('ABORTED', 'İşçi havuzu kapatıldı'));
+      });
+      await Promise.all(workers.splice(0).map((entry) => entry.worker.terminate()));
+    },
+  };
+}
@@ -0,0 +1,381 @@
+import {
+  EVENT_EPOCH,
+  type EventData,
+  type LoggedEvent,
+  appendEvent,
+  currentSeq,
+  eventsSince,
+  loggedBranches,
+} from './eventLog.js';
+import type { Order } from './types.js';
+
+// WebSocket abonelikleri: şube -> konu -> soket kümesi. Bir olay yalnızca ilgili şubenin
+// ilgili konusuna abone soketlere gider; her olayda tüm bağlantılar taranmaz.
+// Konular oturumdaki rolden (upgrade anında) belirlenir, istemci seçemez.
+// Olaylar hemen gönderilmez: şube başına biriktirilir ve aynı tikte (veya WS_COALESCE_MS
+// penceresinde) yayımlananlar soket başına tek çerçevede gider. Aynı siparişin eski
+// güncellemesi, yenisi aynı çerçeveye girecekse atlanır.
+const COALESCE_MS = Number(process.env.WS_COALESCE_MS) || 0;
+// Canlılık: her aralıkta ping; önceki ping'e pong gelmemiş soket kapatılır (Wi-Fi'dan
+// düşen tabletler temiz kapanış göndermez)
+const HEARTBEAT_MS = Number(process.env.WS_HEARTBEAT_MS) || 30_000;
+// Gönderim tamponu bu sınırı aşan sokete çerçeve yazılmaz; tampon boşalınca kaçırdığı
+// olaylar (eski sipariş güncellemeleri atlanarak) toplu gönderilir. Bu kadar süre
+// boşalmayan yavaş istemci kapatılır; yeniden bağlanınca tekrar/RESYNC ile devam eder.
+const HIGH_WATER_BYTES = Number(process.env.WS_HIGH_WATER_BYTES) || 1024 * 1024;
+const SLOW_CONSUMER_MS = Number(process.env.WS_SLOW_CONSUMER_MS) || 60_000;
+
+export type Topic =
+  | 'orders' // tüm siparişler (garson)
+  | 'orders-kitchen' // mutfak kalemi olan siparişler
+  | 'orders-bar' // bar kalemi olan siparişler
+  | 'tables' // masa toplamları (kasa)
+  | 'payments'
+  | 'menu'
+  | 'reports' // anlık ciro (yalnızca admin)
+  | 'users';
+
+export const TOPICS: Topic[] = ['orders', 'orders-kitchen', 'orders-bar', 'tables', 'payments', 'menu', 'reports', 'users'];
+// Sipariş listesini topluca etkileyen olaylar (gün sonu, tamamlananlara taşıma)
+export const ORDER_TOPICS: Topic[] = ['orders', 'orders-kitchen', 'orders-bar', 'tables'];
+
+const ROLE_TOPICS: Record<string, Topic[]> = {
+  admin: ['reports', 'users'],
+  waiter: ['orders', 'payments', 'menu'],
+  cashier: ['tables', 'payments'],
+  kitchen: ['orders-kitchen'],
+  bar: ['orders-bar'],
+};
+// Rolü tanınmayan oturumlar şubenin genel olaylarını alır
+const ANONYMOUS_TOPICS: Topic[] = ['orders', 'payments', 'menu'];
+
+export function topicsForRole(role?: string): Topic[] {
+  return (role && ROLE_TOPICS[role]) || ANONYMOUS_TOPICS;
+}
+
+// NEW_ORDER / ORDER_UPDATED: mutfak ve bar yalnızca kendi kalemi olan siparişte uyanır
+export function orderTopics(order: Order): Topic[] {
+  const topics: Topic[] = ['orders', 'tables'];
+  if (order.items.some((item) => item.category === 'kitchen')) topics.push('orders-kitchen');
+  if (order.items.some((item) => item.category === 'bar')) topics.push('orders-bar');
+  return topics;
+}
+
+export interface TopicMetrics {
+  subscribers: number;
+  events: number;
+  deliveries: number;
+}
+
+export interface WebSocketMetrics {
+  connected: number;
+  // Şu an gönderimi bekletilen istemciler; pong vermediği / yavaş kaldığı için kapatılanlar
+  throttled: number;
+  reaped: number;
+  slowDisconnects: number;
+  throttledFrames: number;
+  // Yeniden bağlanmada tampondan gönderilen olaylar / anlık görüntüye yönlendirilen istemciler
+  replayed: number;
+  resyncs: number;
+  // Gönderilen çerçeveler ve baytları; yenisi geldiği için atlanan olaylar
+  frames: number;
+  bytes: number;
+  superseded: number;
+  topics: Record<Topic, TopicMetrics>;
+}
+
+interface Subscription {
+  branchId: string;
+  topics: Topic[];
+  // Bu seq'e kadarki olaylar gönderildi (veya SYNC/tekrar ile karşılandı)
+  after: number;
+  // Son ping'den beri pong geldi mi
+  alive: boolean;
+  // Gönderim tamponu sınırı ilk aştığında; boşalınca null
+  throttledSince: number | null;
+}
+
+// Bekleyen olay; aynı anahtarlı (sipariş) yeni olay geldiğinde ortak konularda atlanır
+interface PendingEvent {
+  event: LoggedEvent;
+  superseded: Set<Topic> | null;
+}
+
+interface Frame {
+  text: string;
+  bytes: number;
+  topics: Topic[];
+}
+
+const branches = new Map<string, Map<Topic, Set<any>>>();
+const subscriptions = new Map<any, Subscription>();
+const stats = Object.fromEntries(TOPICS.map((topic) => [topic, { events: 0, deliveries: 0 }])) as Record<
+  Topic,
+  { events: number; deliveries: number }
+>;
+const resumeStats = { replayed: 0, resyncs: 0 };
+const frameStats = { frames: 0, bytes: 0, superseded: 0 };
+const connectionStats = { reaped: 0, slowDisconnects: 0, throttledFrames: 0 };
+const pending = new Map<string, PendingEvent[]>();
+let flushTimer: ReturnType<typeof setTimeout> | ReturnType<typeof setImmediate> | null = null;
+
+export function subscribe(socket: any, branchId: string, topics: Topic[]): void {
+  unsubscribe(socket);
+  let branch = branches.get(branchId);
+  if (!branch) {
+    branch = new Map();
+    branches.set(branchId, branch);
+  }
+  for (const topic of topics) {
+    let sockets = branch.get(topic);
+    if (!sockets) {
+      sockets = new Set();
+      branch.set(topic, sockets);
+    }
+    sockets.add(socket);
+  }
+  subscriptions.set(socket, { branchId, topics, after: currentSeq(branchId), alive: true, throttledSince: null });
+}
+
+export function unsubscribe(socket: any): void {
+  const subscription = subscriptions.get(socket);
+  if (!subscription) return;
+  subscriptions.delete(socket);
+  const branch = branches.get(subscription.branchId)!;
+  for (const topic of subscription.topics) {
+    const sockets = branch.get(topic)!;
+    sockets.delete(socket);
+    if (sockets.size === 0) branch.delete(topic);
+  }
+  if (branch.size === 0) branches.delete(subscription.branchId);
+}
+
+// Olay şubenin tekrar tamponuna yazılır (seq ile) ve konu başına bir kez serileştirilir;
+// gönderim bir sonraki boşaltmada yapılır. key verilirse (ör. sipariş id'si) aynı
+// anahtarlı bekleyen eski olay, ortak konularda bu olayla değiştirilir.
+export function publish(branchId: string, topics: Topic | Topic[], data: EventData, key?: string): void {
+  const list = typeof topics === 'string' ? [topics] : topics;
+  const event = appendEvent(branchId, list, data, key);
+  list.forEach((topic) => stats[topic].events++);
+  if (!branches.has(branchId)) return;
+
+  let queue = pending.get(branchId);
+  if (!queue) {
+    queue = [];
+    pending.set(branchId, queue);
+  }
+  if (key !== undefined) {
+    for (const earlier of queue) {
+      if (earlier.event.key !== key) continue;
+      for (const topic of list) {
+        if (earlier.event.messages.has(topic) && !earlier.superseded?.has(topic)) {
+          (earlier.superseded ??= new Set()).add(topic);
+          frameStats.superseded++;
+        }
+      }
+    }
+  }
+  queue.push({ event, superseded: null });
+  scheduleFlush();
+}
+
+function scheduleFlush(): void {
+  if (flushTimer) return;
+  flushTimer = COALESCE_MS > 0 ? setTimeout(flushEvents, COALESCE_MS) : setImmediate(flushEvents);
+}
+
+// Soketin konularına düşen bekleyen olaylar; tek olay olduğu gibi, birden fazlası
+// {"type":"BATCH","events":[...]} olarak gider (mesajlar yeniden serileştirilmez).
+// Aynı sokete birden fazla konuyla yayımlanan olay bir kez gider.
+function buildFrame(queue: PendingEvent[], topics: Topic[], after: number): Frame | null {
+  const messages: string[] = [];
+  const sent: Topic[] = [];
+  for (const { event, superseded } of queue) {
+    if (event.seq <= after) continue;
+    const topic = topics.find((subscribed) => event.messages.has(subscribed) && !superseded?.has(subscribed));
+    if (!topic) continue;
+    messages.push(event.messages.get(topic)!);
+    sent.push(topic);
+  }
+  if (messages.length === 0) return null;
+  const text = batchText(messages);
+  return { text, bytes: Buffer.byteLength(text), topics: sent };
+}
+
+function batchText(messages: string[]): string {
+  return messages.length === 1 ? messages[0] : `{"type":"BATCH","events":[${messages.join(',')}]}`;
+}
+
+// Bekleyen olayları gönderir. Çerçeve aynı konu kümesine (aynı role) sahip soketler için
+// bir kez kurulur; bu tikte abone olan soket yalnızca aboneliğinden sonraki olayları alır.
+export function flushEvents(): void {
+  if (flushTimer) {
+    if (COALESCE_MS > 0) clearTimeout(flushTimer as ReturnType<typeof setTimeout>);
+    else clearImmediate(flushTimer as ReturnType<typeof setImmediate>);
+    flushTimer = null;
+  }
+  pending.forEach((queue, branchId) => {
+    const branch = branches.get(branchId);
+    if (!branch) return;
+    const firstSeq = queue[0].event.seq;
+    const lastSeq = queue[queue.length - 1].event.seq;
+    const frames = new Map<Topic[], Frame | null>();
+    const visited = new Set<any>();
+    branch.forEach((sockets) => {
+      for (const socket of sockets) {
+        if (visited.has(socket)) continue;
+        visited.add(socket);
+        if (socket.readyState !== 1) continue;
+        const subscription = subscriptions.get(socket)!;
+        if (!writable(socket, subscription)) continue;
+        if (subscription.throttledSince !== null) {
+          // Tampon boşaldı: bekletilen olaylar bu çerçeveyle birlikte gönderilir
+          catchUp(socket, subscription);
+          continue;
+        }
+        const { topics, after } = subscription;
+        let frame: Frame | null | undefined;
+        if (after >= firstSeq) {
+          frame = buildFrame(queue, topics, after);
+        } else {
+          frame = frames.get(topics);
+          if (frame === undefined) {
+            frame = buildFrame(queue, topics, 0);
+            frames.set(topics, frame);
+          }
+        }
+        subscription.after = lastSeq;
+        if (!frame) continue;
+        socket.send(frame.text);
+        frameStats.frames++;
+        frameStats.bytes += frame.bytes;
+        frame.topics.forEach((topic) => stats[topic].deliveries++);
+      }
+    });
+  });
+  pending.clear();
+}
+
+// Tüm şubelere (eski otomatik gün sonu); her şube kendi seq'ini alır
+export function publishAll(topics: Topic[], data: EventData): void {
+  new Set([...branches.keys(), ...loggedBranches()]).forEach((branchId) => publish(branchId, topics, data));
+}
+
+export interface ResumeCursor {
+  epoch?: string;
+  since?: number;
+}
+
+// Abonelikten hemen sonra (aynı tikte) çağrılır: kaçırılan olaylar sırayla ve ardından
+// SYNC ile güncel konum bildirilir. Konum bu çalıştırmaya ait değilse veya
+// tampondan düşmüşse RESYNC gönderilir; istemci listelerini yeniden çeker.
+export function resume(socket: any, branchId: string, topics: Topic[], cursor: ResumeCursor): void {
+  if (cursor.since === undefined) {
+    socket.send(JSON.stringify({ type: 'SYNC', epoch: EVENT_EPOCH, seq: currentSeq(branchId) }));
+    return;
+  }
+  const missed = cursor.epoch === EVENT_EPOCH ? eventsSince(branchId, cursor.since) : null;
+  sendMissed(socket, branchId, topics, missed);
+}
+
+// Kaçırılan olaylar ve SYNC tek çerçevede. Aynı siparişin birden fazla güncellemesinden
+// yalnızca sonuncusu gider (her olay siparişin o anki halinin tamamını taşır).
+function sendMissed(socket: any, branchId: string, topics: Topic[], missed: LoggedEvent[] | null): void {
+  const seq = currentSeq(branchId);
+  if (!missed) {
+    resumeStats.resyncs++;
+    socket.send(JSON.stringify({ type: 'RESYNC', epoch: EVENT_EPOCH, seq }));
+    return;
+  }
+  const messages: string[] = [];
+  const seenKeys = new Set<string>();
+  for (let i = missed.length - 1; i >= 0; i--) {
+    const event = missed[i];
+    const topic = topics.find((subscribed) => event.messages.has(subscribed));
+    if (!topic) continue;
+    if (event.key !== undefined) {
+      if (seenKeys.has(event.key)) continue;
+      seenKeys.add(event.key);
+    }
+    messages.push(event.messages.get(topic)!);
+  }
+  messages.reverse();
+  resumeStats.replayed += messages.length;
+  messages.push(JSON.stringify({ type: 'SYNC', epoch: EVENT_EPOCH, seq }));
+  socket.send(batchText(messages));
+}
+
+// Gönderim tamponu sınırın altındaysa true. Üstündeyse çerçeve yazılmaz; sınır
+// SLOW_CONSUMER_MS boyunca aşılı kalırsa istemci kapatılır.
+function writable(socket: any, subscription: Subscription): boolean {
+  if (socket.bufferedAmount <= HIGH_WATER_BYTES) return true;
+  const now = Date.now();
+  subscription.throttledSince ??= now;
+  connectionStats.throttledFrames++;
+  if (now - subscription.throttledSince >= SLOW_CONSUMER_MS) {
+    connectionStats.slowDisconnects++;
+    drop(socket);
+  }
+  return false;
+}
+
+function catchUp(socket: any, subscription: Subscription): void {
+  const { branchId, topics, after } = subscription;
+  subscription.throttledSince = null;
+  subscription.after = currentSeq(branchId);
+  sendMissed(socket, branchId, topics, eventsSince(branchId, after));
+}
+
+function drop(socket: any): void {
+  unsubscribe(socket);
+  socket.terminate();
+}
+
+export function markAlive(socket: any): void {
+  const subscription = subscriptions.get(socket);
+  if (subscription) subscription.alive = true;
+}
+
+// Pong vermeyen soketler kapatılır, diğerlerine ping atılır. Bekletilen ve tamponu
+// boşalmış istemciler yeni olay beklemeden yakalanır.
+function checkConnections(): void {
+  subscriptions.forEach((subscription, socket) => {
+    if (!subscription.alive) {
+      connectionStats.reaped++;
+      drop(socket);
+      return;
+    }
+    if (subscription.throttledSince !== null && writable(socket, subscription)) {
+      catchUp(socket, subscription);
+    }
+    if (!subscriptions.has(socket)) return;
+    subscription.alive = false;
+    socket.ping();
+  });
+}
+
+export function startHeartbeat(): void {
+  const timer = setInterval(checkConnections, HEARTBEAT_MS);
+  timer.unref();
+}
+
+export function getWebSocketMetrics(): WebSocketMetrics {
+  const topics = {} as Record<Topic, TopicMetrics>;
+  for (const topic of TOPICS) {
+    let subscribers = 0;
+    branches.forEach((branch) => (subscribers += branch.get(topic)?.size ?? 0));
+    topics[topic] = { subscribers, ...stats[topic] };
+  }
+  let throttled = 0;
+  subscriptions.forEach((subscription) => {
+    if (subscription.throttledSince !== null) throttled++;
+  });
+  return {
+    connected: subscriptions.size,
+    throttled,
+    ...connectionStats,
+    ...resumeStats,
+    ...frameStats,
+    topics,
+  };
+}